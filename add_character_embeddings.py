@@ -6,6 +6,7 @@ from logger import configure_logging, get_logger
 db = ChromaDBHelper()
 chunk_size = 100
 overlap_size = 50
+batch_size = 64
 fields_to_chunk = [MetadataCategory.KNOWLEDGE, MetadataCategory.PAST, MetadataCategory.RELATIONS]
 
 configure_logging()
@@ -26,24 +27,18 @@ def create_chunks(text: str, chunk_size: int, overlap_size: int):
 def create_id(index: int, faction: Faction, category: MetadataCategory, name: str):
     return "f-" + faction.value + "_n-" + name + "c-" + category.value + "-" + str(index)
 
-def add_embedding(index: int, value: str, name: str, faction: Faction, category: MetadataCategory):
-    if value == "":
-        return
-
+def create_entry(index: int, value: str, name: str, faction: Faction, category: MetadataCategory):
     annotation = create_id(index, faction, category, name)
     metadata = Metadata(faction=faction, type=MetadataType.CHARACTER, category=category, name=name)
 
-    db.add_embedding(
-        annotation,
-        value,
-        metadata
-    )
+    return (annotation, value, metadata)
 
 def add_character_embeddings():
     with open('./data/character_data_cop.csv', mode ='r') as file:
         csvFile = csv.DictReader(file, delimiter=';')
 
         logger.info("Retrieved character data")
+        entries = []
 
         for character in csvFile:
             character_data = Character(**character) # type: ignore
@@ -57,10 +52,13 @@ def add_character_embeddings():
                 logger.info("Created chunks")
 
                 for (id, chunk) in enumerate(chunks):
-                    add_embedding(id, chunk, character_data.name, character_data.faction, field)
-                    logger.info("Chunk %s added", id)
+                    if chunk != "":
+                        entries.append(create_entry(id, chunk, character_data.name, character_data.faction, field))
+
+            logger.info("%s chunks queued", character_data.name)
 
-            logger.info("%s embeddings done", character_data.name)
+        db.add_embeddings(entries, batch_size=batch_size)
+        logger.info("%s character embeddings done", len(entries))
 
 def main():
     add_character_embeddings()
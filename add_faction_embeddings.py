@@ -6,6 +6,7 @@ from logger import configure_logging, get_logger
 db = ChromaDBHelper()
 chunk_size = 100
 overlap_size = 50
+batch_size = 64
 fields_to_chunk: list[MetadataCategory] = [MetadataCategory.LORE]
 
 configure_logging()
@@ -26,24 +27,18 @@ def create_chunks(text: str, chunk_size: int, overlap_size: int):
 def create_id(index: int, faction: Faction, category: MetadataCategory):
         return "f-" + faction.value + "_type-" + category.value + "-" + str(index)
 
-def add_embedding(index: int, value: str, faction: Faction, category: MetadataCategory):
-    if value == "":
-        return
-
+def create_entry(index: int, value: str, faction: Faction, category: MetadataCategory):
     annotation = create_id(index, faction, category)
     metadata = Metadata(faction=faction, type=MetadataType.FACTION, category=category)
 
-    db.add_embedding(
-        annotation,
-        value,
-        metadata,
-    )
+    return (annotation, value, metadata)
 
 def add_faction_embeddings():
     with open('./data/faction_data/faction_data.csv', mode ='r') as file:
         csvFile = csv.DictReader(file, delimiter=';')
 
         logger.info("Retrieved faction data")
+        entries = []
 
         for faction in csvFile:
             faction_data = FactionData(**faction) # type: ignore
@@ -57,10 +52,13 @@ def add_faction_embeddings():
                 logger.info("Created chunks")
 
                 for (id, chunk) in enumerate(chunks):
-                    add_embedding(id, chunk, faction_data.faction, field)
-                    logger.info("Chunk %s added", id)
+                    if chunk != "":
+                        entries.append(create_entry(id, chunk, faction_data.faction, field))
+
+            logger.info("%s chunks queued", faction_data.faction)
 
-            logger.info("%s embeddings done", faction_data.faction)
+        db.add_embeddings(entries, batch_size=batch_size)
+        logger.info("%s faction embeddings done", len(entries))
 
 def main():
     add_faction_embeddings()
@@ -3,9 +3,14 @@ from ai.providers import (
     ChatCompletionResult,
     NormalizedToolCall,
     NormalizedToolFunction,
+    create_async_chat_provider,
+    create_async_embedding_provider,
+    create_async_text_generation_provider,
     create_chat_provider,
     create_embedding_provider,
     create_text_generation_provider,
+    get_chat_provider,
+    get_embedding_provider,
 )
 
 __all__ = [
@@ -13,8 +18,13 @@ __all__ = [
     "ChatCompletionResult",
     "NormalizedToolCall",
     "NormalizedToolFunction",
+    "create_async_chat_provider",
+    "create_async_embedding_provider",
+    "create_async_text_generation_provider",
     "create_chat_provider",
     "create_embedding_provider",
     "create_text_generation_provider",
     "get_ai_settings",
+    "get_chat_provider",
+    "get_embedding_provider",
 ]
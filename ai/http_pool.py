@@ -0,0 +1,61 @@
+from threading import Lock
+from urllib.parse import urlsplit
+
+import httpx
+
+from ai.settings import RoleProviderConfig
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_clients: dict[tuple[str, int, int, int], httpx.Client] = {}
+_clients_lock = Lock()
+
+
+def build_http_timeout(config: RoleProviderConfig) -> httpx.Timeout:
+    return httpx.Timeout(
+        float(config.timeout_seconds),
+        connect=float(config.connect_timeout_seconds),
+    )
+
+
+def build_http_limits(config: RoleProviderConfig) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.pool_size,
+        max_keepalive_connections=config.pool_size,
+    )
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def get_http_client(config: RoleProviderConfig) -> httpx.Client:
+    """Return the process-wide keep-alive client for the config's origin, pool size and timeouts."""
+    key = (
+        _origin(config.base_url),
+        config.pool_size,
+        config.connect_timeout_seconds,
+        config.timeout_seconds,
+    )
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.debug("Creating pooled HTTP client for %s (pool_size=%s)", key[0], config.pool_size)
+            client = httpx.Client(
+                timeout=build_http_timeout(config),
+                limits=build_http_limits(config),
+            )
+            _clients[key] = client
+        return client
+
+
+def close_http_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        client.close()
@@ -2,19 +2,22 @@ import inspect
 import json
 import os
 from dataclasses import dataclass
-from typing import Any, Protocol
-from urllib import request
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterable, Iterator, Protocol
 
+import httpx
 import ollama
 
+from ai.http_pool import build_http_limits, build_http_timeout, get_http_client
 from ai.settings import RoleProviderConfig
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 try:
-    from huggingface_hub import InferenceClient
+    from huggingface_hub import AsyncInferenceClient, InferenceClient
 except ImportError:  # pragma: no cover - exercised only when dependency is missing at runtime
+    AsyncInferenceClient = None  # type: ignore[assignment]
     InferenceClient = None  # type: ignore[assignment]
 
 
@@ -33,23 +36,53 @@ class NormalizedToolCall:
 class ChatCompletionResult:
     content: str
     tool_calls: list[NormalizedToolCall]
+    # Token usage as reported by the backend; None when it does not report the figure.
+    prompt_tokens: int | None = None
+    cached_prompt_tokens: int | None = None
 
 
 class ChatProvider(Protocol):
     def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
         ...
 
+    def chat_stream(self, messages: list[dict[str, Any]]) -> Iterator[str]:
+        ...
+
 
 class EmbeddingProvider(Protocol):
     def embed(self, text: str) -> list[list[float]]:
         ...
 
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        ...
+
 
 class TextGenerationProvider(Protocol):
     def generate(self, prompt: str) -> str:
         ...
 
 
+class AsyncChatProvider(Protocol):
+    async def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
+        ...
+
+    def chat_stream(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+        ...
+
+
+class AsyncEmbeddingProvider(Protocol):
+    async def embed(self, text: str) -> list[list[float]]:
+        ...
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        ...
+
+
+class AsyncTextGenerationProvider(Protocol):
+    async def generate(self, prompt: str) -> str:
+        ...
+
+
 def _normalize_tool_calls(raw_tool_calls: Any) -> list[NormalizedToolCall]:
     if raw_tool_calls is None:
         return []
@@ -160,6 +193,148 @@ def _coerce_embedding_payload(embedding: Any) -> list[float]:
     return []
 
 
+def _coerce_embedding_rows(embedding: Any, expected_rows: int) -> list[list[float]] | None:
+    if hasattr(embedding, "tolist"):
+        embedding = embedding.tolist()
+
+    if not isinstance(embedding, list) or len(embedding) != expected_rows:
+        return None
+
+    rows: list[list[float]] = []
+    for row in embedding:
+        if not isinstance(row, list) or any(not isinstance(value, (int, float)) for value in row):
+            return None
+        rows.append([float(value) for value in row])
+
+    return rows
+
+
+def _extract_choice_delta(chunk: Any) -> str:
+    choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+    if not choices:
+        return ""
+
+    choice = choices[0]
+    delta = choice.get("delta") if isinstance(choice, dict) else getattr(choice, "delta", None)
+    return _extract_message_content(delta)
+
+
+def _extract_ollama_stream_delta(chunk: Any) -> str:
+    message = chunk.get("message") if isinstance(chunk, dict) else getattr(chunk, "message", None)
+    return _extract_message_content(message)
+
+
+def _iter_sse_payloads(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        if data != "":
+            yield json.loads(data)
+
+
+def _parse_ollama_chat_result(result: Any) -> ChatCompletionResult:
+    message = result["message"] if isinstance(result, dict) else result.message
+
+    return ChatCompletionResult(
+        content=_extract_message_content(message),
+        tool_calls=_normalize_tool_calls(_extract_message_tool_calls(message)),
+    )
+
+
+def _parse_ollama_embedding_result(response: Any) -> list[list[float]]:
+    return response.embeddings if hasattr(response, "embeddings") else response["embeddings"]
+
+
+def _usage_field(container: Any, key: str) -> Any:
+    if container is None:
+        return None
+    return container.get(key) if isinstance(container, dict) else getattr(container, key, None)
+
+
+def _extract_prompt_usage(response: Any) -> tuple[int | None, int | None]:
+    """Reads prompt and cached-prompt token counts from an OpenAI-style usage block.
+
+    vLLM and hosted OpenAI-compatible servers report cache hits in usage.prompt_tokens_details;
+    llama.cpp's server reports them as timings.cache_n instead.
+    """
+    usage = _usage_field(response, "usage")
+    prompt_tokens = _usage_field(usage, "prompt_tokens")
+    cached_tokens = _usage_field(_usage_field(usage, "prompt_tokens_details"), "cached_tokens")
+    if cached_tokens is None:
+        cached_tokens = _usage_field(_usage_field(response, "timings"), "cache_n")
+
+    return (
+        prompt_tokens if isinstance(prompt_tokens, int) else None,
+        cached_tokens if isinstance(cached_tokens, int) else None,
+    )
+
+
+def _parse_openai_chat_response(response: dict[str, Any]) -> ChatCompletionResult:
+    choice = response.get("choices", [{}])[0]
+    message = choice.get("message", {})
+    prompt_tokens, cached_prompt_tokens = _extract_prompt_usage(response)
+
+    return ChatCompletionResult(
+        content=_extract_message_content(message),
+        tool_calls=_normalize_tool_calls(_extract_message_tool_calls(message)),
+        prompt_tokens=prompt_tokens,
+        cached_prompt_tokens=cached_prompt_tokens,
+    )
+
+
+def _parse_openai_embedding_response(response: dict[str, Any]) -> list[list[float]]:
+    if "data" in response:
+        # Batch responses carry an index per row; order by it rather than trusting the wire order.
+        data = sorted(response["data"], key=lambda item: item.get("index", 0))
+        return [item.get("embedding", []) for item in data]
+
+    if "embeddings" in response:
+        return response["embeddings"]
+
+    return []
+
+
+def _build_openai_chat_payload(config: RoleProviderConfig, messages: list[dict[str, Any]], tools: list[Any] | None) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "model": config.model,
+        "messages": messages,
+    }
+    if tools is not None:
+        payload["tools"] = _normalize_tool_definitions(tools)
+    return payload
+
+
+def _parse_hf_chat_result(result: Any) -> ChatCompletionResult:
+    message = getattr(result, "choices", [None])[0]
+    normalized_message = getattr(message, "message", None)
+    prompt_tokens, cached_prompt_tokens = _extract_prompt_usage(result)
+
+    return ChatCompletionResult(
+        content=_extract_message_content(normalized_message),
+        tool_calls=_normalize_tool_calls(_extract_message_tool_calls(normalized_message)),
+        prompt_tokens=prompt_tokens,
+        cached_prompt_tokens=cached_prompt_tokens,
+    )
+
+
+def _build_hf_client_kwargs(config: RoleProviderConfig) -> dict[str, Any]:
+    client_kwargs: dict[str, Any] = {
+        "timeout": float(config.timeout_seconds),
+    }
+    if config.hf_provider != "":
+        client_kwargs["provider"] = config.hf_provider
+    if config.base_url != "":
+        client_kwargs["base_url"] = config.base_url
+    api_key = _resolve_api_key(config)
+    if api_key != "":
+        client_kwargs["api_key"] = api_key
+
+    return client_kwargs
+
+
 class OllamaChatProvider:
     def __init__(self, config: RoleProviderConfig):
         self.config = config
@@ -173,12 +348,13 @@ class OllamaChatProvider:
             kwargs["tools"] = tools
 
         result = ollama.chat(**kwargs)
-        message = result["message"] if isinstance(result, dict) else result.message
+        return _parse_ollama_chat_result(result)
 
-        return ChatCompletionResult(
-            content=_extract_message_content(message),
-            tool_calls=_normalize_tool_calls(_extract_message_tool_calls(message)),
-        )
+    def chat_stream(self, messages: list[dict[str, Any]]) -> Iterator[str]:
+        for chunk in ollama.chat(model=self.config.model, messages=messages, stream=True):
+            delta = _extract_ollama_stream_delta(chunk)
+            if delta != "":
+                yield delta
 
 
 class OllamaEmbeddingProvider:
@@ -187,8 +363,14 @@ class OllamaEmbeddingProvider:
 
     def embed(self, text: str) -> list[list[float]]:
         response = ollama.embed(model=self.config.model, input=text)
-        embeddings = response.embeddings if hasattr(response, "embeddings") else response["embeddings"]
-        return embeddings
+        return _parse_ollama_embedding_result(response)
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
+
+        response = ollama.embed(model=self.config.model, input=texts)
+        return _parse_ollama_embedding_result(response)
 
 
 class OllamaTextGenerationProvider:
@@ -204,25 +386,20 @@ class OpenAICompatibleChatProvider:
         self.config = config
 
     def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
-        payload: dict[str, Any] = {
-            "model": self.config.model,
-            "messages": messages,
-        }
-        if tools is not None:
-            payload["tools"] = _normalize_tool_definitions(tools)
-
         response = _post_json(
             url=self.config.base_url,
-            payload=payload,
+            payload=_build_openai_chat_payload(self.config, messages, tools),
             config=self.config,
         )
-        choice = response.get("choices", [{}])[0]
-        message = choice.get("message", {})
+        return _parse_openai_chat_response(response)
 
-        return ChatCompletionResult(
-            content=_extract_message_content(message),
-            tool_calls=_normalize_tool_calls(_extract_message_tool_calls(message)),
-        )
+    def chat_stream(self, messages: list[dict[str, Any]]) -> Iterator[str]:
+        payload = _build_openai_chat_payload(self.config, messages, None)
+        payload["stream"] = True
+        for chunk in _stream_post_json(url=self.config.base_url, payload=payload, config=self.config):
+            delta = _extract_choice_delta(chunk)
+            if delta != "":
+                yield delta
 
 
 class OpenAICompatibleEmbeddingProvider:
@@ -238,14 +415,21 @@ class OpenAICompatibleEmbeddingProvider:
             },
             config=self.config,
         )
+        return _parse_openai_embedding_response(response)
 
-        if "data" in response:
-            return [item.get("embedding", []) for item in response["data"]]
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
 
-        if "embeddings" in response:
-            return response["embeddings"]
-
-        return []
+        response = _post_json(
+            url=self.config.base_url,
+            payload={
+                "model": self.config.model,
+                "input": texts,
+            },
+            config=self.config,
+        )
+        return _parse_openai_embedding_response(response)
 
 
 class OpenAICompatibleTextGenerationProvider:
@@ -269,18 +453,7 @@ class HuggingFaceInferenceProviderBase:
                 "Install it with `pip install huggingface_hub`."
             )
 
-        client_kwargs: dict[str, Any] = {
-            "timeout": float(self.config.timeout_seconds),
-        }
-        if self.config.hf_provider != "":
-            client_kwargs["provider"] = self.config.hf_provider
-        if self.config.base_url != "":
-            client_kwargs["base_url"] = self.config.base_url
-        api_key = _resolve_api_key(self.config)
-        if api_key != "":
-            client_kwargs["api_key"] = api_key
-
-        return InferenceClient(**client_kwargs)
+        return InferenceClient(**_build_hf_client_kwargs(self.config))
 
 
 class HuggingFaceChatProvider(HuggingFaceInferenceProviderBase):
@@ -299,49 +472,44 @@ class HuggingFaceChatProvider(HuggingFaceInferenceProviderBase):
             kwargs["tools"] = _normalize_tool_definitions(tools)
 
         result = self.client.chat_completion(**kwargs)
-        message = getattr(result, "choices", [None])[0]
-        normalized_message = getattr(message, "message", None)
-
-        return ChatCompletionResult(
-            content=_extract_message_content(normalized_message),
-            tool_calls=_normalize_tool_calls(_extract_message_tool_calls(normalized_message)),
-        )
-
-    def _text_generation_with_raw_response_logging(self, prompt: str) -> Any:
-        try:
-            import huggingface_hub.inference._client as hf_client_module
-        except ImportError:
-            hf_client_module = None
+        return _parse_hf_chat_result(result)
 
-        original_bytes_to_dict = getattr(hf_client_module, "_bytes_to_dict", None) if hf_client_module else None
-        if not callable(original_bytes_to_dict):
-            return self.client.text_generation(
-                prompt=prompt,
+    def chat_stream(self, messages: list[dict[str, Any]]) -> Iterator[str]:
+        if self.config.hf_provider == "featherless-ai":
+            stream = self.client.text_generation(
+                prompt=_flatten_messages_to_prompt(messages),
                 model=self.config.model,
                 max_new_tokens=500,
+                stream=True,
             )
+            for token in stream:
+                delta = token if isinstance(token, str) else str(getattr(getattr(token, "token", None), "text", ""))
+                if delta != "":
+                    yield delta
+            return
 
-        def logging_bytes_to_dict(raw_response: Any) -> dict[str, Any]:
-            try:
-                return original_bytes_to_dict(raw_response)
-            except json.JSONDecodeError:
-                logger.error(
-                    "Hugging Face text_generation returned invalid JSON. provider=%s model=%s raw_response=%r",
-                    self.config.hf_provider,
-                    self.config.model,
-                    _decode_raw_response(raw_response),
-                )
-                raise
+        for chunk in self.client.chat_completion(messages=messages, model=self.config.model, stream=True):
+            delta = _extract_choice_delta(chunk)
+            if delta != "":
+                yield delta
 
-        hf_client_module._bytes_to_dict = logging_bytes_to_dict
+    def _text_generation_with_raw_response_logging(self, prompt: str) -> Any:
+        # Providers are shared across threads, so the raw body is read from the decode error instead of
+        # patching huggingface_hub's module-level parser.
         try:
             return self.client.text_generation(
                 prompt=prompt,
                 model=self.config.model,
                 max_new_tokens=500,
             )
-        finally:
-            hf_client_module._bytes_to_dict = original_bytes_to_dict
+        except json.JSONDecodeError as error:
+            logger.error(
+                "Hugging Face text_generation returned invalid JSON. provider=%s model=%s raw_response=%r",
+                self.config.hf_provider,
+                self.config.model,
+                _decode_raw_response(error.doc),
+            )
+            raise
 
 
 class HuggingFaceEmbeddingProvider(HuggingFaceInferenceProviderBase):
@@ -352,6 +520,21 @@ class HuggingFaceEmbeddingProvider(HuggingFaceInferenceProviderBase):
         )
         return [_coerce_embedding_payload(embedding)]
 
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
+
+        embedding = self.client.feature_extraction(
+            text=texts,
+            model=self.config.model,
+        )
+        rows = _coerce_embedding_rows(embedding, len(texts))
+        if rows is not None:
+            return rows
+
+        # Some endpoints only accept a single input or return token-level output for lists.
+        return [self.embed(text)[0] for text in texts]
+
 
 class HuggingFaceTextGenerationProvider(HuggingFaceInferenceProviderBase):
     def generate(self, prompt: str) -> str:
@@ -364,6 +547,225 @@ class HuggingFaceTextGenerationProvider(HuggingFaceInferenceProviderBase):
         return _extract_message_content(message)
 
 
+class AsyncOllamaProviderBase:
+    def __init__(self, config: RoleProviderConfig):
+        self.config = config
+        self.client = ollama.AsyncClient(
+            host=config.base_url or None,
+            timeout=float(config.timeout_seconds),
+        )
+
+
+class AsyncOllamaChatProvider(AsyncOllamaProviderBase):
+    async def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
+        kwargs: dict[str, Any] = {
+            "model": self.config.model,
+            "messages": messages,
+        }
+        if tools is not None:
+            kwargs["tools"] = tools
+
+        result = await self.client.chat(**kwargs)
+        return _parse_ollama_chat_result(result)
+
+    async def chat_stream(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+        async for chunk in await self.client.chat(model=self.config.model, messages=messages, stream=True):
+            delta = _extract_ollama_stream_delta(chunk)
+            if delta != "":
+                yield delta
+
+
+class AsyncOllamaEmbeddingProvider(AsyncOllamaProviderBase):
+    async def embed(self, text: str) -> list[list[float]]:
+        response = await self.client.embed(model=self.config.model, input=text)
+        return _parse_ollama_embedding_result(response)
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
+
+        response = await self.client.embed(model=self.config.model, input=texts)
+        return _parse_ollama_embedding_result(response)
+
+
+class AsyncOllamaTextGenerationProvider(AsyncOllamaProviderBase):
+    async def generate(self, prompt: str) -> str:
+        result = await self.client.generate(model=self.config.model, prompt=prompt)
+        return result["response"]
+
+
+class AsyncOpenAICompatibleProviderBase:
+    def __init__(self, config: RoleProviderConfig):
+        self.config = config
+        # httpx.AsyncClient pools connections per event loop, so providers should not be shared across loops.
+        self.client = httpx.AsyncClient(
+            timeout=build_http_timeout(config),
+            limits=build_http_limits(config),
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class AsyncOpenAICompatibleChatProvider(AsyncOpenAICompatibleProviderBase):
+    async def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
+        response = await _async_post_json(
+            client=self.client,
+            url=self.config.base_url,
+            payload=_build_openai_chat_payload(self.config, messages, tools),
+            config=self.config,
+        )
+        return _parse_openai_chat_response(response)
+
+    async def chat_stream(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+        payload = _build_openai_chat_payload(self.config, messages, None)
+        payload["stream"] = True
+        async with self.client.stream(
+            "POST",
+            self.config.base_url,
+            content=json.dumps(payload).encode("utf-8"),
+            headers=_build_headers(self.config),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                for chunk in _iter_sse_payloads([line]):
+                    delta = _extract_choice_delta(chunk)
+                    if delta != "":
+                        yield delta
+
+
+class AsyncOpenAICompatibleEmbeddingProvider(AsyncOpenAICompatibleProviderBase):
+    async def embed(self, text: str) -> list[list[float]]:
+        response = await _async_post_json(
+            client=self.client,
+            url=self.config.base_url,
+            payload={
+                "model": self.config.model,
+                "input": text,
+            },
+            config=self.config,
+        )
+        return _parse_openai_embedding_response(response)
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
+
+        response = await _async_post_json(
+            client=self.client,
+            url=self.config.base_url,
+            payload={
+                "model": self.config.model,
+                "input": texts,
+            },
+            config=self.config,
+        )
+        return _parse_openai_embedding_response(response)
+
+
+class AsyncOpenAICompatibleTextGenerationProvider:
+    def __init__(self, config: RoleProviderConfig):
+        self.chat_provider = AsyncOpenAICompatibleChatProvider(config)
+
+    async def generate(self, prompt: str) -> str:
+        result = await self.chat_provider.chat(messages=[{"role": "user", "content": prompt}])
+        return result.content
+
+    async def aclose(self) -> None:
+        await self.chat_provider.aclose()
+
+
+class AsyncHuggingFaceInferenceProviderBase:
+    def __init__(self, config: RoleProviderConfig):
+        self.config = config
+        self.client = self._create_client()
+
+    def _create_client(self) -> Any:
+        if AsyncInferenceClient is None:
+            raise ImportError(
+                "huggingface_hub is required for provider='huggingface'. "
+                "Install it with `pip install huggingface_hub`."
+            )
+
+        return AsyncInferenceClient(**_build_hf_client_kwargs(self.config))
+
+
+class AsyncHuggingFaceChatProvider(AsyncHuggingFaceInferenceProviderBase):
+    async def chat(self, messages: list[dict[str, Any]], tools: list[Any] | None = None) -> ChatCompletionResult:
+        if self.config.hf_provider == "featherless-ai":
+            prompt = _flatten_messages_to_prompt(messages)
+            result = await self.client.text_generation(
+                prompt=prompt,
+                model=self.config.model,
+                max_new_tokens=500,
+            )
+            content = result if isinstance(result, str) else str(result)
+            return ChatCompletionResult(content=content, tool_calls=[])
+
+        kwargs: dict[str, Any] = {
+            "messages": messages,
+            "model": self.config.model,
+        }
+        if tools is not None:
+            kwargs["tools"] = _normalize_tool_definitions(tools)
+
+        result = await self.client.chat_completion(**kwargs)
+        return _parse_hf_chat_result(result)
+
+    async def chat_stream(self, messages: list[dict[str, Any]]) -> AsyncIterator[str]:
+        if self.config.hf_provider == "featherless-ai":
+            stream = await self.client.text_generation(
+                prompt=_flatten_messages_to_prompt(messages),
+                model=self.config.model,
+                max_new_tokens=500,
+                stream=True,
+            )
+            async for token in stream:
+                delta = token if isinstance(token, str) else str(getattr(getattr(token, "token", None), "text", ""))
+                if delta != "":
+                    yield delta
+            return
+
+        async for chunk in await self.client.chat_completion(messages=messages, model=self.config.model, stream=True):
+            delta = _extract_choice_delta(chunk)
+            if delta != "":
+                yield delta
+
+
+class AsyncHuggingFaceEmbeddingProvider(AsyncHuggingFaceInferenceProviderBase):
+    async def embed(self, text: str) -> list[list[float]]:
+        embedding = await self.client.feature_extraction(
+            text=text,
+            model=self.config.model,
+        )
+        return [_coerce_embedding_payload(embedding)]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if len(texts) == 0:
+            return []
+
+        embedding = await self.client.feature_extraction(
+            text=texts,
+            model=self.config.model,
+        )
+        rows = _coerce_embedding_rows(embedding, len(texts))
+        if rows is not None:
+            return rows
+
+        return [(await self.embed(text))[0] for text in texts]
+
+
+class AsyncHuggingFaceTextGenerationProvider(AsyncHuggingFaceInferenceProviderBase):
+    async def generate(self, prompt: str) -> str:
+        result = await self.client.chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.config.model,
+        )
+        message = getattr(getattr(result, "choices", [None])[0], "message", None)
+
+        return _extract_message_content(message)
+
+
 def _annotation_to_json_type(annotation: Any) -> str:
     if annotation in {int, float}:
         return "number"
@@ -424,16 +826,39 @@ def _build_headers(config: RoleProviderConfig) -> dict[str, str]:
 
 
 def _post_json(url: str, payload: dict[str, Any], config: RoleProviderConfig) -> dict[str, Any]:
-    body = json.dumps(payload).encode("utf-8")
-    req = request.Request(
-        url=url,
-        data=body,
+    response = get_http_client(config).post(
+        url,
+        content=json.dumps(payload).encode("utf-8"),
         headers=_build_headers(config),
-        method="POST",
     )
+    response.raise_for_status()
+    return json.loads(response.content.decode("utf-8"))
 
-    with request.urlopen(req, timeout=config.timeout_seconds) as response:
-        return json.loads(response.read().decode("utf-8"))
+
+def _stream_post_json(url: str, payload: dict[str, Any], config: RoleProviderConfig) -> Iterator[dict[str, Any]]:
+    with get_http_client(config).stream(
+        "POST",
+        url,
+        content=json.dumps(payload).encode("utf-8"),
+        headers=_build_headers(config),
+    ) as response:
+        response.raise_for_status()
+        yield from _iter_sse_payloads(response.iter_lines())
+
+
+async def _async_post_json(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: dict[str, Any],
+    config: RoleProviderConfig,
+) -> dict[str, Any]:
+    response = await client.post(
+        url,
+        content=json.dumps(payload).encode("utf-8"),
+        headers=_build_headers(config),
+    )
+    response.raise_for_status()
+    return json.loads(response.content.decode("utf-8"))
 
 
 def create_chat_provider(config: RoleProviderConfig) -> ChatProvider:
@@ -449,6 +874,17 @@ def create_chat_provider(config: RoleProviderConfig) -> ChatProvider:
     raise ValueError(f"Unsupported chat provider '{config.provider}'")
 
 
+@lru_cache(maxsize=None)
+def get_chat_provider(config: RoleProviderConfig) -> ChatProvider:
+    """Shared chat provider per role config; sync providers hold no per-conversation state."""
+    return create_chat_provider(config)
+
+
+@lru_cache(maxsize=None)
+def get_embedding_provider(config: RoleProviderConfig) -> EmbeddingProvider:
+    return create_embedding_provider(config)
+
+
 def create_embedding_provider(config: RoleProviderConfig) -> EmbeddingProvider:
     if config.provider == "ollama":
         return OllamaEmbeddingProvider(config)
@@ -473,3 +909,42 @@ def create_text_generation_provider(config: RoleProviderConfig) -> TextGeneratio
         return OpenAICompatibleTextGenerationProvider(config)
 
     raise ValueError(f"Unsupported text provider '{config.provider}'")
+
+
+def create_async_chat_provider(config: RoleProviderConfig) -> AsyncChatProvider:
+    if config.provider == "ollama":
+        return AsyncOllamaChatProvider(config)
+
+    if config.provider == "huggingface":
+        return AsyncHuggingFaceChatProvider(config)
+
+    if config.provider == "openai_compatible":
+        return AsyncOpenAICompatibleChatProvider(config)
+
+    raise ValueError(f"Unsupported chat provider '{config.provider}'")
+
+
+def create_async_embedding_provider(config: RoleProviderConfig) -> AsyncEmbeddingProvider:
+    if config.provider == "ollama":
+        return AsyncOllamaEmbeddingProvider(config)
+
+    if config.provider == "huggingface":
+        return AsyncHuggingFaceEmbeddingProvider(config)
+
+    if config.provider == "openai_compatible":
+        return AsyncOpenAICompatibleEmbeddingProvider(config)
+
+    raise ValueError(f"Unsupported embedding provider '{config.provider}'")
+
+
+def create_async_text_generation_provider(config: RoleProviderConfig) -> AsyncTextGenerationProvider:
+    if config.provider == "ollama":
+        return AsyncOllamaTextGenerationProvider(config)
+
+    if config.provider == "huggingface":
+        return AsyncHuggingFaceTextGenerationProvider(config)
+
+    if config.provider == "openai_compatible":
+        return AsyncOpenAICompatibleTextGenerationProvider(config)
+
+    raise ValueError(f"Unsupported text provider '{config.provider}'")
@@ -15,6 +15,10 @@ class RoleProviderConfig:
     base_url: str = ""
     api_key_env: str = ""
     timeout_seconds: int = 60
+    connect_timeout_seconds: int = 10
+    pool_size: int = 10
+    # Estimated prompt tokens a stage may send to this model; 0 means no limit.
+    max_prompt_tokens: int = 0
 
 
 @dataclass(frozen=True)
@@ -22,6 +26,84 @@ class LocalChromaConfig:
     path: str
     collection: str
     distance_space: str
+    # Answer character and faction metadata filters from an in-process index instead of Chroma scans.
+    # Off by default: the index only sees this process's writes, so it suits a single-writer server.
+    metadata_index: bool = False
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheConfig:
+    max_entries: int = 4096
+    path: str = ""
+
+
+DEFAULT_EMBEDDING_CACHE = EmbeddingCacheConfig()
+
+
+@dataclass(frozen=True)
+class FastPathConfig:
+    enabled: bool = False
+    reinterpret_min_confidence: float = 0.75
+    reinterpret_max_context_chars: int = 400
+    summary_max_context_chars: int = 600
+    summary_max_snippets: int = 3
+
+
+DEFAULT_FAST_PATH = FastPathConfig()
+
+
+@dataclass(frozen=True)
+class ConversationHistoryConfig:
+    max_recent_turns: int = 6
+    max_history_tokens: int = 2000
+    summary_max_chars: int = 1600
+    summary_line_chars: int = 160
+
+
+DEFAULT_HISTORY = ConversationHistoryConfig()
+
+
+@dataclass(frozen=True)
+class PromptBudgetConfig:
+    # (stage class name, max estimated prompt tokens) pairs; stages not listed only get the model limit.
+    stage_max_tokens: tuple[tuple[str, int], ...] = ()
+
+    def max_tokens_for(self, stage_name: str) -> int:
+        return dict(self.stage_max_tokens).get(stage_name, 0)
+
+
+DEFAULT_PROMPT_BUDGET = PromptBudgetConfig()
+
+
+@dataclass(frozen=True)
+class StateCacheConfig:
+    enabled: bool = True
+    # 0 keeps cached categories until this process writes to them; set it when other processes write too.
+    ttl_seconds: float = 0.0
+
+
+DEFAULT_STATE_CACHE = StateCacheConfig()
+
+
+@dataclass(frozen=True)
+class HybridSearchConfig:
+    enabled: bool = False
+    # BM25 hits taken per query before fusing them with the vector results.
+    lexical_results: int = 5
+    # Reciprocal rank fusion constant; larger values flatten the advantage of top ranks.
+    rrf_k: int = 60
+
+
+DEFAULT_HYBRID_SEARCH = HybridSearchConfig()
+
+# inline interleaves character data with per-turn fields; stable_prefix sends the character data as
+# one byte-identical system message so backends with prefix caching can reuse it across stages and turns.
+PROMPT_LAYOUTS = ("inline", "stable_prefix")
+
+# separate runs perception and gap analysis as two decision calls; combined asks for the perception
+# JSON and the retrieval tool calls in a single call, saving a decision call per turn. Every profile
+# uses separate; combined changes the prompt workflow, so it is opt-in through PERCEPTION_MODE.
+PERCEPTION_MODES = ("separate", "combined")
 
 
 @dataclass(frozen=True)
@@ -32,6 +114,14 @@ class AISettings:
     judge_llm: RoleProviderConfig
     embedding_model: RoleProviderConfig
     chroma: LocalChromaConfig
+    embedding_cache: EmbeddingCacheConfig = DEFAULT_EMBEDDING_CACHE
+    fast_path: FastPathConfig = DEFAULT_FAST_PATH
+    history: ConversationHistoryConfig = DEFAULT_HISTORY
+    prompt_budget: PromptBudgetConfig = DEFAULT_PROMPT_BUDGET
+    state_cache: StateCacheConfig = DEFAULT_STATE_CACHE
+    hybrid_search: HybridSearchConfig = DEFAULT_HYBRID_SEARCH
+    prompt_layout: str = "inline"
+    perception_mode: str = "separate"
 
 
 DEFAULT_CHROMA = LocalChromaConfig(
@@ -162,6 +252,20 @@ def _get_env_int(name: str, default: int) -> int:
     return int(raw_value)
 
 
+def _get_env_float(name: str, default: float) -> float:
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    return float(raw_value)
+
+
+def _get_env_bool(name: str, default: bool) -> bool:
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    return raw_value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _override_role(prefix: str, config: RoleProviderConfig) -> RoleProviderConfig:
     provider = os.getenv(f"{prefix}_PROVIDER", config.provider)
     model = os.getenv(f"{prefix}_MODEL", config.model)
@@ -169,6 +273,9 @@ def _override_role(prefix: str, config: RoleProviderConfig) -> RoleProviderConfi
     base_url = os.getenv(f"{prefix}_BASE_URL", config.base_url)
     api_key_env = os.getenv(f"{prefix}_API_KEY_ENV", config.api_key_env)
     timeout_seconds = _get_env_int(f"{prefix}_TIMEOUT_SECONDS", config.timeout_seconds)
+    connect_timeout_seconds = _get_env_int(f"{prefix}_CONNECT_TIMEOUT_SECONDS", config.connect_timeout_seconds)
+    pool_size = _get_env_int(f"{prefix}_POOL_SIZE", config.pool_size)
+    max_prompt_tokens = _get_env_int(f"{prefix}_MAX_PROMPT_TOKENS", config.max_prompt_tokens)
 
     return RoleProviderConfig(
         provider=provider,
@@ -177,6 +284,9 @@ def _override_role(prefix: str, config: RoleProviderConfig) -> RoleProviderConfi
         base_url=base_url,
         api_key_env=api_key_env,
         timeout_seconds=timeout_seconds,
+        connect_timeout_seconds=connect_timeout_seconds,
+        pool_size=pool_size,
+        max_prompt_tokens=max_prompt_tokens,
     )
 
 
@@ -185,6 +295,64 @@ def _override_chroma(config: LocalChromaConfig) -> LocalChromaConfig:
         path=os.getenv("CHROMA_PATH", config.path),
         collection=os.getenv("CHROMA_COLLECTION", config.collection),
         distance_space=os.getenv("CHROMA_DISTANCE_SPACE", config.distance_space),
+        metadata_index=_get_env_bool("CHROMA_METADATA_INDEX", config.metadata_index),
+    )
+
+
+def _override_embedding_cache(config: EmbeddingCacheConfig) -> EmbeddingCacheConfig:
+    return EmbeddingCacheConfig(
+        max_entries=_get_env_int("EMBEDDING_CACHE_SIZE", config.max_entries),
+        path=os.getenv("EMBEDDING_CACHE_PATH", config.path),
+    )
+
+
+def _override_fast_path(config: FastPathConfig) -> FastPathConfig:
+    return FastPathConfig(
+        enabled=_get_env_bool("FAST_PATH_ENABLED", config.enabled),
+        reinterpret_min_confidence=_get_env_float("FAST_PATH_REINTERPRET_MIN_CONFIDENCE", config.reinterpret_min_confidence),
+        reinterpret_max_context_chars=_get_env_int("FAST_PATH_REINTERPRET_MAX_CONTEXT_CHARS", config.reinterpret_max_context_chars),
+        summary_max_context_chars=_get_env_int("FAST_PATH_SUMMARY_MAX_CONTEXT_CHARS", config.summary_max_context_chars),
+        summary_max_snippets=_get_env_int("FAST_PATH_SUMMARY_MAX_SNIPPETS", config.summary_max_snippets),
+    )
+
+
+def _override_history(config: ConversationHistoryConfig) -> ConversationHistoryConfig:
+    return ConversationHistoryConfig(
+        max_recent_turns=_get_env_int("HISTORY_MAX_RECENT_TURNS", config.max_recent_turns),
+        max_history_tokens=_get_env_int("HISTORY_MAX_TOKENS", config.max_history_tokens),
+        summary_max_chars=_get_env_int("HISTORY_SUMMARY_MAX_CHARS", config.summary_max_chars),
+        summary_line_chars=_get_env_int("HISTORY_SUMMARY_LINE_CHARS", config.summary_line_chars),
+    )
+
+
+def _override_prompt_budget(config: PromptBudgetConfig) -> PromptBudgetConfig:
+    raw_value = os.getenv("PROMPT_BUDGET_STAGE_TOKENS")
+    if raw_value is None or raw_value.strip() == "":
+        return config
+
+    limits: list[tuple[str, int]] = []
+    for item in raw_value.split(","):
+        if item.strip() == "":
+            continue
+        stage_name, separator, tokens = item.partition("=")
+        if separator == "":
+            raise ValueError(f"PROMPT_BUDGET_STAGE_TOKENS entries must look like Stage=tokens, got '{item.strip()}'")
+        limits.append((stage_name.strip(), int(tokens)))
+    return PromptBudgetConfig(stage_max_tokens=tuple(limits))
+
+
+def _override_state_cache(config: StateCacheConfig) -> StateCacheConfig:
+    return StateCacheConfig(
+        enabled=_get_env_bool("STATE_CACHE_ENABLED", config.enabled),
+        ttl_seconds=_get_env_float("STATE_CACHE_TTL_SECONDS", config.ttl_seconds),
+    )
+
+
+def _override_hybrid_search(config: HybridSearchConfig) -> HybridSearchConfig:
+    return HybridSearchConfig(
+        enabled=_get_env_bool("HYBRID_SEARCH_ENABLED", config.enabled),
+        lexical_results=_get_env_int("HYBRID_SEARCH_LEXICAL_RESULTS", config.lexical_results),
+        rrf_k=_get_env_int("HYBRID_SEARCH_RRF_K", config.rrf_k),
     )
 
 
@@ -196,6 +364,15 @@ def _apply_env_overrides(settings: AISettings) -> AISettings:
         judge_llm=_override_role("JUDGE", settings.judge_llm),
         embedding_model=_override_role("EMBEDDING", settings.embedding_model),
         chroma=_override_chroma(settings.chroma),
+        embedding_cache=_override_embedding_cache(settings.embedding_cache),
+        fast_path=_override_fast_path(settings.fast_path),
+        history=_override_history(settings.history),
+        prompt_budget=_override_prompt_budget(settings.prompt_budget),
+        state_cache=_override_state_cache(settings.state_cache),
+        hybrid_search=_override_hybrid_search(settings.hybrid_search),
+        prompt_layout=os.getenv("PROMPT_LAYOUT", settings.prompt_layout),
+        # Unlike the per-role variables this applies to whichever profile is active; empty keeps its mode.
+        perception_mode=os.getenv("PERCEPTION_MODE") or settings.perception_mode,
     )
 
 
@@ -209,6 +386,12 @@ def _validate_role(name: str, config: RoleProviderConfig) -> None:
     if config.provider == "openai_compatible" and config.base_url == "":
         raise ValueError(f"Missing base_url for hosted provider role '{name}'")
 
+    if config.pool_size < 1:
+        raise ValueError(f"pool_size must be at least 1 for role '{name}'")
+
+    if config.max_prompt_tokens < 0:
+        raise ValueError(f"max_prompt_tokens must not be negative for role '{name}'")
+
 
 def _validate_settings(settings: AISettings) -> None:
     _validate_role("decision_llm", settings.decision_llm)
@@ -222,6 +405,33 @@ def _validate_settings(settings: AISettings) -> None:
     if settings.chroma.collection == "":
         raise ValueError("Missing CHROMA_COLLECTION")
 
+    if settings.embedding_cache.max_entries < 0:
+        raise ValueError("EMBEDDING_CACHE_SIZE must not be negative")
+
+    if not 0.0 <= settings.fast_path.reinterpret_min_confidence <= 1.0:
+        raise ValueError("FAST_PATH_REINTERPRET_MIN_CONFIDENCE must be between 0.0 and 1.0")
+
+    if settings.history.max_recent_turns < 0:
+        raise ValueError("HISTORY_MAX_RECENT_TURNS must not be negative")
+
+    if settings.history.max_history_tokens < 1:
+        raise ValueError("HISTORY_MAX_TOKENS must be at least 1")
+
+    if settings.state_cache.ttl_seconds < 0:
+        raise ValueError("STATE_CACHE_TTL_SECONDS must not be negative")
+
+    if settings.hybrid_search.lexical_results < 1:
+        raise ValueError("HYBRID_SEARCH_LEXICAL_RESULTS must be at least 1")
+
+    if settings.hybrid_search.rrf_k < 1:
+        raise ValueError("HYBRID_SEARCH_RRF_K must be at least 1")
+
+    if settings.prompt_layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"PROMPT_LAYOUT must be one of {', '.join(PROMPT_LAYOUTS)}")
+
+    if settings.perception_mode not in PERCEPTION_MODES:
+        raise ValueError(f"PERCEPTION_MODE must be one of {', '.join(PERCEPTION_MODES)}")
+
 
 def _log_settings(settings: AISettings) -> None:
     logger.info("Resolved AI profile: %s", settings.profile)
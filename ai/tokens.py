@@ -0,0 +1,15 @@
+from typing import Any, Iterable
+
+# Rough average for English prose across the tokenizers in use; only used for budgeting, never billing.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    if text == "":
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(messages: Iterable[dict[str, Any]]) -> int:
+    return sum(estimate_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for message in messages)
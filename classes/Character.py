@@ -1,14 +1,19 @@
+from classes.CharacterRegistry import CharacterTemplate
+from classes.CharacterStateCache import CharacterStateCache
 from classes.ChromaDBHelper import ChromaDBHelper
 from classes.NpcAgent import NPCAgent
+from classes.ChromaRegistry import get_chroma_registry
+from classes.StateWriter import StateEntry, StateWriteKey, StateWriter, get_state_writer
 from ai import AISettings, get_ai_settings
 from models import Character as CharacterType, Faction, Metadata, MetadataType, MetadataCategory, CognitiveAction, NPCAction, Sentiment
-from typing import Any
+from typing import Any, Callable
+import asyncio
 import random
 from fastapi import WebSocket
 from server_models import ChatRequest
 import json
 from uuid import uuid4
-from workflow import TurnInput, TurnPipeline
+from workflow import TurnExecutor, TurnInput, TurnPipeline, get_turn_executor
 from workflow.models import InitialContext
 
 from logger import get_logger
@@ -55,11 +60,12 @@ class Character:
 
     def __init__(
         self,
-        char_data: dict[str | Any, str | Any] | None,
+        char_data: CharacterTemplate | dict[str | Any, str | Any] | None,
         situation,
         settings: AISettings | None = None,
     ):
-        parsed = CharacterType(**char_data) # type: ignore
+        # Registry templates are validated once at load; raw dicts are validated here.
+        parsed = char_data if isinstance(char_data, CharacterTemplate) else CharacterType(**char_data) # type: ignore
 
         self.name = parsed.name
         self.faction = parsed.faction
@@ -73,19 +79,30 @@ class Character:
         self.ai_settings = settings or get_ai_settings()
         self.db = ChromaDBHelper(self.ai_settings)
         self.agent = NPCAgent(self.ai_settings)
+        # None writes state updates synchronously instead of behind the reply.
+        self.state_writer: StateWriter | None = get_state_writer()
+        self.pending_state_writes: list[StateEntry] = []
+        self.state_cache = self.create_state_cache()
         self.talk_ongoing = True
         self.pipeline = TurnPipeline(self)
 
+        # An earlier conversation with this character may still have state writes in flight.
+        self.flush_state_writes()
         self.sentiment = self.compute_sentiment()
 
-    async def initiate_conversation(self, socket: WebSocket):
+    async def initiate_conversation(self, socket: WebSocket, executor: TurnExecutor | None = None, stream: bool = False):
         logger.info("Initiating conversation with %s", self.name)
-        self.initialize_message_loop_context()
+        # Every blocking LLM/Chroma call runs on the turn executor so the event loop keeps serving other sockets.
+        executor = executor or get_turn_executor()
+        await executor.run(self.initialize_message_loop_context)
 
         greeting_prompt = "Create the opening greeting for the player using the seeded character context."
 
-        greeting = self.db.generate_text(greeting_prompt, stage_name="Greeting")
-        await socket.send_json({ "event": "message", "data": greeting })
+        if stream:
+            await self.stream_reply(socket, executor, self.db.generate_text_stream, greeting_prompt, stage_name="Greeting")
+        else:
+            greeting = await executor.run(self.db.generate_text, greeting_prompt, stage_name="Greeting")
+            await socket.send_json({ "event": "message", "data": greeting })
 
         logger.verbose("Greeting completed for %s", self.name)
 
@@ -111,10 +128,32 @@ class Character:
                 logger.info("Ending conversation")
                 return
 
-            answer = self.prompt(prompt=user_prompt)
-            
+            if stream:
+                await self.stream_reply(socket, executor, self.prompt, prompt=user_prompt)
+            else:
+                answer = await executor.run(self.prompt, prompt=user_prompt)
+                await socket.send_json({ "event": "message", "data": answer })
+
             logger.verbose("Response sent to client for %s", self.name)
-            await socket.send_json({ "event": "message", "data": answer })
+
+    async def stream_reply(self, socket: WebSocket, executor: TurnExecutor, func: Callable[..., str], *args: Any, **kwargs: Any) -> str:
+        # Deltas are produced on a worker thread and handed to the event loop, which forwards them in order.
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        def on_delta(delta: str) -> None:
+            loop.call_soon_threadsafe(deltas.put_nowait, delta)
+
+        reply_task = asyncio.ensure_future(executor.run(func, *args, on_delta=on_delta, **kwargs))
+        reply_task.add_done_callback(lambda _: deltas.put_nowait(finished))
+
+        while (delta := await deltas.get()) is not finished:
+            await socket.send_json({ "event": "message_delta", "data": delta })
+
+        reply = await reply_task
+        await socket.send_json({ "event": "message_done", "data": reply })
+        return reply
 
     def create_answer_prompt(self, prompt: str, sentiment: str, intention: tuple[str, str | None], context: str):
         return f"""
@@ -158,6 +197,12 @@ class Character:
 
         return sentiment
 
+    def create_state_cache(self) -> CharacterStateCache | None:
+        config = self.ai_settings.state_cache
+        if not config.enabled:
+            return None
+        return CharacterStateCache(self.load_character_documents, ttl_seconds=config.ttl_seconds)
+
     def build_system_prompt(self) -> str:
         return "\n".join([
             f"Enter RP mode. You are {self.name}.",
@@ -186,6 +231,10 @@ class Character:
         return self.pipeline.initial_context_stage.run(TurnInput(prompt=""))
 
     def initialize_message_loop_context(self) -> None:
+        # Seeding happens once per conversation; later turns reuse the stage's cached initial context.
+        if self.db.response_context_initialized:
+            return
+
         initial_context = self.build_initial_context()
         self.db.seed_response_context(
             system_prompt=self.build_system_prompt(),
@@ -216,18 +265,17 @@ class Character:
         return "\n".join(sentiment_entries)
 
     def get_character_documents(self, category: MetadataCategory, limit: int | None = None) -> list[str]:
-        kwargs: dict[str, Any] = {
-            "where": self.get_character_category_filter(category),
-            "include": ["documents"],
-        }
-        if limit is not None:
-            kwargs["limit"] = limit
-
-        results = self.db.db.get(**kwargs)
-        documents = results.get("documents") or []
-        if not isinstance(documents, list):
-            return []
-
+        """The category's documents in write order; `limit` keeps the most recent ones, cached or not."""
+        if self.state_cache is None:
+            documents = self.load_character_documents(category)
+        else:
+            documents = self.state_cache.get(category)
+        if limit is None:
+            return documents
+        return documents[max(len(documents) - limit, 0):]
+
+    def load_character_documents(self, category: MetadataCategory) -> list[str]:
+        documents = self.db.get_documents(self.get_character_category_filter(category))
         return [str(doc).strip() for doc in documents if str(doc).strip()]
     
     def get_memories(self):
@@ -401,12 +449,17 @@ class Character:
             tags=tags,
         )
 
-    def prompt(self, prompt: str):
+    def prompt(self, prompt: str, on_delta: Callable[[str], None] | None = None):
         if(prompt.strip() == ""):
             return ""
 
+        # Last turn's state updates must be in Chroma before InitialContextStage reads them.
+        self.flush_state_writes()
         self.initialize_message_loop_context()
-        result = self.pipeline.run(TurnInput(prompt=prompt))
+        if on_delta is None:
+            result = self.pipeline.run(TurnInput(prompt=prompt))
+        else:
+            result = self.pipeline.run(TurnInput(prompt=prompt), on_delta=on_delta)
         self.apply_turn_updates(result.terminal_update)
 
         return result.response.reply
@@ -430,6 +483,7 @@ class Character:
             self.store_memory(tags=terminal_update.memory_tags)
 
         self.trigger_external_actions(terminal_update.external_actions)
+        self.submit_state_writes()
 
     def update_relationship(self, relationship_update, tags: list[str] | None = None):
         self.persist_state_update(MetadataCategory.RELATIONS, relationship_update, tags=tags)
@@ -509,11 +563,44 @@ class Character:
         if text.strip() == "":
             return
 
-        self.db.add_embedding(
-            id=self.create_state_embedding_id(category),
-            text=text.strip(),
-            metadata=self.build_character_embedding_metadata(category=category, tags=tags),
-        )
+        entry_id = self.create_state_embedding_id(category)
+        metadata = self.build_character_embedding_metadata(category=category, tags=tags)
+        if self.state_writer is None:
+            self.db.add_embedding(id=entry_id, text=text.strip(), metadata=metadata)
+        else:
+            # Written behind the reply; submit_state_writes hands the turn's entries to the writer as one batch.
+            self.pending_state_writes.append((entry_id, text.strip(), metadata))
+        if self.state_cache is not None:
+            self.state_cache.record_write(category, text.strip())
+        self.invalidate_initial_context(category)
+
+    def submit_state_writes(self) -> None:
+        if self.state_writer is None or len(self.pending_state_writes) == 0:
+            return
+
+        entries = self.pending_state_writes
+        self.pending_state_writes = []
+        self.state_writer.submit(self.state_write_key(), self.db, entries)
+
+    def flush_state_writes(self, timeout: float | None = 10.0) -> bool:
+        if self.state_writer is None:
+            return True
+
+        self.submit_state_writes()
+        flushed = self.state_writer.flush(self.state_write_key(), timeout)
+        if not flushed:
+            logger.warning("State writes for %s were still pending after %ss", self.name, timeout)
+        return flushed
+
+    def state_write_key(self) -> StateWriteKey:
+        return (get_chroma_registry().collection_key(self.ai_settings.chroma), self.name)
+
+    def invalidate_initial_context(self, category: MetadataCategory | None = None) -> None:
+        pipeline = getattr(self, "pipeline", None)
+        if pipeline is None:
+            return
+
+        pipeline.initial_context_stage.invalidate(category)
 
     def create_state_embedding_id(self, category: MetadataCategory) -> str:
         return f"runtime-{self.id}-{category.value}-{uuid4().hex}"
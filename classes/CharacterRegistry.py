@@ -0,0 +1,98 @@
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping
+
+from pydantic import ValidationError
+
+from logger import get_logger
+from models import Character as CharacterType, Faction
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CharacterTemplate:
+    """Validated, immutable character data; one per roster entry, shared by every conversation with that NPC."""
+
+    name: str
+    faction: Faction
+    pl_list: str
+    ali_chat: str
+    knowledge: str
+    past: str
+    relations: str
+    sentiment: str
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "CharacterTemplate":
+        parsed = CharacterType(**row)  # type: ignore[arg-type]
+        return cls(
+            name=parsed.name,
+            faction=parsed.faction,
+            pl_list=parsed.pl_list,
+            ali_chat=parsed.ali_chat,
+            knowledge=parsed.knowledge,
+            past=parsed.past,
+            relations=parsed.relations,
+            sentiment=parsed.sentiment,
+        )
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().casefold()
+
+
+class CharacterRegistry:
+    """Read-only roster of character templates with a case-insensitive name index.
+
+    Rows are validated once when the registry is built; rows that fail validation are logged and
+    skipped. When two rows share a name, the first one wins.
+    """
+
+    def __init__(self, templates: Iterable[CharacterTemplate] = ()):
+        index: dict[str, CharacterTemplate] = {}
+        for template in templates:
+            key = normalize_name(template.name)
+            if key in index:
+                logger.warning("Duplicate character name '%s'; keeping the first entry", template.name)
+                continue
+            index[key] = template
+        self._index: Mapping[str, CharacterTemplate] = MappingProxyType(index)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "CharacterRegistry":
+        templates: list[CharacterTemplate] = []
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                templates.append(CharacterTemplate.from_row(row))
+            except ValidationError as exc:
+                logger.error("Skipping invalid character row %s (%s): %s", row_number, row.get("name", ""), exc)
+        return cls(templates)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "CharacterRegistry":
+        if not path.exists():
+            logger.warning("Character file %s not found; the roster is empty", path)
+            return cls()
+
+        with path.open(mode="r", newline="", encoding="utf-8") as file:
+            registry = cls.from_rows(csv.DictReader(file, delimiter=";"))
+        logger.info("Loaded %s character templates from %s", len(registry), path)
+        return registry
+
+    def get(self, name: str) -> CharacterTemplate | None:
+        return self._index.get(normalize_name(name))
+
+    def names(self) -> list[str]:
+        return [template.name for template in self._index.values()]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and normalize_name(name) in self._index
+
+    def __iter__(self) -> Iterator[CharacterTemplate]:
+        return iter(self._index.values())
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,106 @@
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable
+
+from logger import get_logger
+from metrics import get_metrics_registry
+from models import MetadataCategory
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CharacterStateCacheStats:
+    categories: int
+    hits: int
+    misses: int
+    expirations: int
+    writes: int
+
+
+class CharacterStateCache:
+    """Documents of one character's state categories, loaded once and kept current by write-through.
+
+    `load(category)` does the Chroma metadata scan; it runs on the first read of a category and again
+    only after the category was invalidated or, with `ttl_seconds` > 0, has expired. Every state entry
+    the character writes is appended through `record_write`, so reads see it immediately, whether or
+    not the state writer has persisted it yet. Documents are kept in write order, oldest first.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[MetadataCategory], list[str]],
+        ttl_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl_seconds < 0:
+            raise ValueError("ttl_seconds must not be negative")
+
+        self.load = load
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = Lock()
+        # category -> (documents, loaded_at)
+        self._entries: dict[MetadataCategory, tuple[list[str], float]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._writes = 0
+
+    def get(self, category: MetadataCategory) -> list[str]:
+        with self._lock:
+            entry = self._entries.get(category)
+            if entry is not None and self._expired(entry[1]):
+                self._expirations += 1
+                del self._entries[category]
+                entry = None
+            if entry is not None:
+                self._hits += 1
+                _count_state_cache_read(category, "hit")
+                return list(entry[0])
+            self._misses += 1
+
+        _count_state_cache_read(category, "miss")
+        documents = list(self.load(category))
+        with self._lock:
+            # Turns of one character run one at a time, so no write of this category lands mid-load.
+            self._entries[category] = (documents, self.clock())
+        return list(documents)
+
+    def record_write(self, category: MetadataCategory, text: str) -> None:
+        # Categories that were never read are left unloaded; their first read scans Chroma as usual.
+        with self._lock:
+            entry = self._entries.get(category)
+            if entry is None:
+                return
+            entry[0].append(text)
+            self._writes += 1
+
+    def invalidate(self, category: MetadataCategory | None = None) -> None:
+        with self._lock:
+            if category is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(category, None)
+
+    def stats(self) -> CharacterStateCacheStats:
+        with self._lock:
+            return CharacterStateCacheStats(
+                categories=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                expirations=self._expirations,
+                writes=self._writes,
+            )
+
+    def _expired(self, loaded_at: float) -> bool:
+        return self.ttl_seconds > 0 and self.clock() - loaded_at >= self.ttl_seconds
+
+
+def _count_state_cache_read(category: MetadataCategory, result: str) -> None:
+    get_metrics_registry().counter(
+        "aigame_state_cache_reads_total",
+        "Character state category reads served from the per-character cache (hit) or from Chroma (miss).",
+        ("category", "result"),
+    ).inc(category=category.value, result=result)
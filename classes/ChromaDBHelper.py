@@ -1,32 +1,83 @@
-import chromadb
+import json
 from models import Metadata
-from typing import Any
-from ai import AISettings, create_chat_provider, create_embedding_provider, get_ai_settings
+from typing import Any, Callable
+from ai import AISettings, get_ai_settings, get_chat_provider, get_embedding_provider
+from ai.settings import DEFAULT_HISTORY
+from classes.ChromaRegistry import get_chroma_registry
+from classes.ConversationHistory import ConversationHistory
+from classes.EmbeddingCache import get_embedding_cache
+from classes.LexicalIndex import reciprocal_rank_fusion
 from logger import get_logger
+from metrics import count_hybrid_search_documents, message_chars, track_provider_call, track_vector_store
 
 logger = get_logger(__name__)
 
+EmbeddingEntry = tuple[str, str, Metadata | dict[str, Any] | None]
+
 class ChromaDBHelper:
     MAX_QUERY_DISTANCE = 0.4
+    QUERY_RESULTS = 5
+    UPSERT_BATCH_SIZE = 64
 
     def __init__(self, settings: AISettings | None = None):
         self.settings = settings or get_ai_settings()
-        self.db = chromadb.PersistentClient(
-            path=self.settings.chroma.path
-        ).get_or_create_collection(
-            self.settings.chroma.collection,
-            metadata={"hnsw:space": self.settings.chroma.distance_space}
-        )
-        self.embedding_provider = create_embedding_provider(self.settings.embedding_model)
-        self.response_provider = create_chat_provider(self.settings.response_llm)
-        self.messages = []
+        # The collection handle, providers and embedding cache are shared process-wide; history below stays per conversation.
+        self.db = get_chroma_registry().get_collection(self.settings.chroma)
+        self.metadata_index = get_chroma_registry().get_metadata_index(self.settings.chroma) if self.settings.chroma.metadata_index else None
+        self.lexical_index = get_chroma_registry().get_lexical_index(self.settings.chroma) if self.settings.hybrid_search.enabled else None
+        self.embedding_provider = get_embedding_provider(self.settings.embedding_model)
+        self.embedding_cache = get_embedding_cache(self.settings.embedding_model, self.settings.embedding_cache)
+        self.response_provider = get_chat_provider(self.settings.response_llm)
+        self.history = ConversationHistory(self.settings.history)
         self.response_context_initialized = False
 
+    @property
+    def messages(self) -> list[dict[str, str]]:
+        """The chat history as sent to the response model, without the pending prompt."""
+        return self.history.messages
+
+    @messages.setter
+    def messages(self, messages: list[dict[str, str]]) -> None:
+        config = self.settings.history if hasattr(self, "settings") else DEFAULT_HISTORY
+        self.history = ConversationHistory.from_messages(messages, config)
+
     def get_embedding(self, text: str):
-        return self.embedding_provider.embed(text)
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return [cached]
+
+        with track_provider_call("embedding", "embed", prompt_chars=len(text)):
+            embedding = self.embedding_provider.embed(text)
+        if len(embedding) > 0:
+            self.embedding_cache.put(text, embedding[0])
+        return embedding
+
+    def get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        embeddings: dict[str, list[float]] = {}
+        missing: list[str] = []
+
+        for text in texts:
+            if text in embeddings or text in missing:
+                continue
+            cached = self.embedding_cache.get(text)
+            if cached is not None:
+                embeddings[text] = cached
+            else:
+                missing.append(text)
+
+        if len(missing) > 0:
+            with track_provider_call("embedding", "embed_many", prompt_chars=sum(len(text) for text in missing)):
+                rows = self.embedding_provider.embed_many(missing)
+            if len(rows) != len(missing):
+                raise ValueError(f"Embedding provider returned {len(rows)} rows for {len(missing)} texts")
+            for text, row in zip(missing, rows):
+                self.embedding_cache.put(text, row)
+                embeddings[text] = row
+
+        return [embeddings[text] for text in texts]
     
     def init_context(self, context: str):
-        self.messages.append({"role": "system", "content": context})
+        self.history.add_seed_message({"role": "system", "content": context})
 
     def seed_response_context(self, system_prompt: str, seed_context_prompt: str):
         if self.response_context_initialized:
@@ -40,7 +91,7 @@ class ChromaDBHelper:
         if seed_context_prompt.strip() != "":
             seed_messages.append({"role": "user", "content": seed_context_prompt.strip()})
 
-        self.messages = seed_messages + self.messages
+        self.history.seed(seed_messages)
         self.response_context_initialized = True
     
     def add_embedding(self, id: str, text: str, metadata: Metadata | dict[str, Any] | None):
@@ -53,49 +104,234 @@ class ChromaDBHelper:
         }
 
         if metadata is not None:
-            if isinstance(metadata, Metadata):
-                kwargs["metadatas"] = [metadata.model_dump(mode="json", exclude_none=True)]
-            else:
-                kwargs["metadatas"] = [metadata]
+            kwargs["metadatas"] = [self._dump_metadata(metadata)]
+
+        with track_vector_store("upsert"):
+            self.db.upsert(**kwargs)
+        self.index_upserts(kwargs["ids"], kwargs["documents"], kwargs.get("metadatas", [None]))
+
+    def add_embeddings(self, entries: list[EmbeddingEntry], batch_size: int | None = None):
+        resolved_batch_size = batch_size or self.UPSERT_BATCH_SIZE
+        if resolved_batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        for start in range(0, len(entries), resolved_batch_size):
+            batch = entries[start:start + resolved_batch_size]
+            embeddings = self.get_embeddings([text for _, text, _ in batch])
+
+            # Chroma needs metadatas for every row of an upsert or for none of them.
+            with_metadata = [(entry, embedding) for entry, embedding in zip(batch, embeddings) if entry[2] is not None]
+            without_metadata = [(entry, embedding) for entry, embedding in zip(batch, embeddings) if entry[2] is None]
+
+            for group, include_metadata in ((with_metadata, True), (without_metadata, False)):
+                if len(group) == 0:
+                    continue
+
+                kwargs = {
+                    "ids": [entry[0] for entry, _ in group],
+                    "documents": [entry[1] for entry, _ in group],
+                    "embeddings": [embedding for _, embedding in group],
+                }
+                if include_metadata:
+                    kwargs["metadatas"] = [self._dump_metadata(entry[2]) for entry, _ in group]
+
+                with track_vector_store("upsert", items=len(group)):
+                    self.db.upsert(**kwargs)
+                self.index_upserts(kwargs["ids"], kwargs["documents"], kwargs.get("metadatas", [None] * len(group)))
+
+            logger.debug("Upserted %s embeddings (%s/%s)", len(batch), start + len(batch), len(entries))
+
+    def index_upserts(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any] | None]) -> None:
+        """Records upserted entries in the in-process indexes; callers that upsert to `self.db` directly must call this."""
+        metadata_index = getattr(self, "metadata_index", None)
+        if metadata_index is not None:
+            metadata_index.add(ids, metadatas)
+        lexical_index = getattr(self, "lexical_index", None)
+        if lexical_index is not None:
+            lexical_index.add(ids, documents, metadatas)
+
+    def resolve_filter_ids(self, filter: dict[str, Any] | None) -> list[str] | None:
+        """Ids matching `filter` from the metadata index, or None when Chroma has to evaluate the filter.
+
+        An empty match also returns None: the index only sees this process's upserts, so documents written
+        by ingestion scripts or other processes are still found through Chroma.
+        """
+        metadata_index = getattr(self, "metadata_index", None)
+        if metadata_index is None or filter is None:
+            return None
+        ids = metadata_index.resolve(filter)
+        return ids if ids else None
+
+    def get_documents(self, where: dict[str, Any], limit: int | None = None) -> list[str]:
+        ids = self.resolve_filter_ids(where)
+        kwargs: dict[str, Any] = {"include": ["documents"]}
+        if ids is None:
+            kwargs["where"] = where
+            if limit is not None:
+                kwargs["limit"] = limit
+        else:
+            kwargs["ids"] = ids = ids if limit is None else ids[:limit]
+
+        with track_vector_store("get"):
+            results = self.db.get(**kwargs)
+        documents = results.get("documents") or []
+        if not isinstance(documents, list):
+            return []
+        if ids is None:
+            return documents
+
+        # Chroma does not return id lookups in request order; the index order is upsert order.
+        documents_by_id = dict(zip(results.get("ids") or [], documents))
+        return [documents_by_id[document_id] for document_id in ids if document_id in documents_by_id]
+
+    def _query_scope(self, filter: dict[str, Any] | None) -> dict[str, Any]:
+        """The where or ids argument of a query."""
+        if filter is None:
+            return {}
+
+        ids = self.resolve_filter_ids(filter)
+        if ids is None:
+            return {"where": filter}
+        return {"ids": ids}
 
-        self.db.upsert(**kwargs)
+    def _dump_metadata(self, metadata: Metadata | dict[str, Any]) -> dict[str, Any]:
+        if isinstance(metadata, Metadata):
+            return metadata.model_dump(mode="json", exclude_none=True)
+        return metadata
 
     def query_docs(self, prompt: str, filter: dict[str, list[dict[str, str]]] | None = None):
+        scope = self._query_scope(filter)
+
         embedding = self.get_embedding(prompt)
 
         kwargs = {
             "query_embeddings": embedding,
-            "n_results":5,
+            "n_results": self.QUERY_RESULTS,
+            **scope,
         }
 
-        if filter != None:
-            kwargs["where"] = filter
+        with track_vector_store("query"):
+            res = self.db.query(**kwargs)
 
-        res = self.db.query(**kwargs)
+        ids = res.get("ids") or []
+        documents = res.get("documents") or []
+        distances = res.get("distances") or []
 
-        documents = res.get("documents")
-        distances = res.get("distances")
+        return self._select_documents(
+            prompt,
+            scope,
+            ids[0] if len(ids) > 0 else None,
+            documents[0] if len(documents) > 0 else None,
+            distances[0] if len(distances) > 0 else None,
+        )
 
-        if documents is None or distances is None or len(documents[0]) == 0:
-            return None
+    def query_docs_many(
+        self,
+        prompts: list[str],
+        filters: list[dict[str, Any] | None] | None = None,
+    ) -> list[list[list[str]] | None]:
+        """Embeds all prompts in one batch and sends one collection query per distinct filter."""
+        resolved_filters = filters if filters is not None else [None] * len(prompts)
+        if len(resolved_filters) != len(prompts):
+            raise ValueError("filters must have one entry per prompt")
+        if len(prompts) == 0:
+            return []
 
-        filtered_documents: list[list[str]] = []
+        embeddings = self.get_embeddings(prompts)
+        groups: dict[str, list[int]] = {}
+        for index, filter in enumerate(resolved_filters):
+            groups.setdefault(json.dumps(filter, sort_keys=True), []).append(index)
 
-        for doc_group, distance_group in zip(documents, distances):
-            if not isinstance(doc_group, list) or not isinstance(distance_group, list):
-                continue
+        results: list[list[list[str]] | None] = [None] * len(prompts)
+        for indexes in groups.values():
+            scope = self._query_scope(resolved_filters[indexes[0]])
+            kwargs = {
+                "query_embeddings": [embeddings[index] for index in indexes],
+                "n_results": self.QUERY_RESULTS,
+                **scope,
+            }
+
+            with track_vector_store("query", items=len(indexes)):
+                res = self.db.query(**kwargs)
+            ids = res.get("ids") or []
+            documents = res.get("documents") or []
+            distances = res.get("distances") or []
+
+            for position, index in enumerate(indexes):
+                results[index] = self._select_documents(
+                    prompts[index],
+                    scope,
+                    ids[position] if position < len(ids) else None,
+                    documents[position] if position < len(documents) else None,
+                    distances[position] if position < len(distances) else None,
+                )
+
+        return results
 
-            matching_docs = [
-                str(doc)
-                for doc, distance in zip(doc_group, distance_group)
+    def _select_documents(
+        self,
+        prompt: str,
+        scope: dict[str, Any],
+        id_group: Any,
+        doc_group: Any,
+        distance_group: Any,
+    ) -> list[list[str]] | None:
+        lexical_index = getattr(self, "lexical_index", None)
+        if lexical_index is None:
+            return self._filter_documents(doc_group, distance_group)
+
+        vector_hits: list[tuple[str, str]] = []
+        if isinstance(id_group, list) and isinstance(doc_group, list) and isinstance(distance_group, list):
+            vector_hits = [
+                (str(document_id), str(doc))
+                for document_id, doc, distance in zip(id_group, doc_group, distance_group)
                 if isinstance(distance, (int, float)) and distance <= self.MAX_QUERY_DISTANCE
             ]
-            filtered_documents.append(matching_docs)
+        config = self.settings.hybrid_search
+        lexical_hits = lexical_index.search(
+            prompt,
+            config.lexical_results,
+            candidate_ids=scope.get("ids"),
+            where=scope.get("where"),
+        )
+        return self._fuse_hits(vector_hits, lexical_hits, config.rrf_k)
+
+    def _fuse_hits(
+        self,
+        vector_hits: list[tuple[str, str]],
+        lexical_hits: list[tuple[str, str]],
+        rrf_k: int,
+    ) -> list[list[str]] | None:
+        documents = dict(vector_hits)
+        for document_id, doc in lexical_hits:
+            documents.setdefault(document_id, doc)
+
+        vector_ids = [document_id for document_id, _ in vector_hits]
+        lexical_ids = [document_id for document_id, _ in lexical_hits]
+        fused = reciprocal_rank_fusion([vector_ids, lexical_ids], k=rrf_k)[:self.QUERY_RESULTS]
+        if len(fused) == 0:
+            return None
+
+        for document_id in fused:
+            if document_id in vector_ids and document_id in lexical_ids:
+                count_hybrid_search_documents("both")
+            else:
+                count_hybrid_search_documents("vector" if document_id in vector_ids else "lexical")
+        return [[documents[document_id] for document_id in fused]]
 
-        if len(filtered_documents) == 0 or len(filtered_documents[0]) == 0:
+    def _filter_documents(self, doc_group: Any, distance_group: Any) -> list[list[str]] | None:
+        if not isinstance(doc_group, list) or not isinstance(distance_group, list):
             return None
 
-        return filtered_documents
+        matching_docs = [
+            str(doc)
+            for doc, distance in zip(doc_group, distance_group)
+            if isinstance(distance, (int, float)) and distance <= self.MAX_QUERY_DISTANCE
+        ]
+        if len(matching_docs) == 0:
+            return None
+
+        return [matching_docs]
 
     def parse_retrieved_docs(self, documents) -> list[str]:
         parsed_docs: list[str] = []
@@ -112,7 +348,18 @@ class ChromaDBHelper:
     
     def query_text(self, prompt: str, filter = None, stage_name: str = "RetrievalStage"):
         docs = self.query_docs(prompt=prompt, filter=filter)
+        return self._render_query_text(prompt, filter, docs, stage_name)
+
+    def query_text_many(self, prompts: list[str], filters = None, stage_name: str = "RetrievalStage") -> list[str]:
+        resolved_filters = filters if filters is not None else [None] * len(prompts)
+        docs_per_prompt = self.query_docs_many(prompts=prompts, filters=resolved_filters)
+
+        return [
+            self._render_query_text(prompt, filter, docs, stage_name)
+            for prompt, filter, docs in zip(prompts, resolved_filters, docs_per_prompt)
+        ]
 
+    def _render_query_text(self, prompt: str, filter, docs, stage_name: str) -> str:
         if(docs == None):
             logger.conversation_event(
                 stage_name=stage_name,
@@ -132,13 +379,14 @@ class ChromaDBHelper:
 
         return result
     
-    def generate_text(self, prompt: str, stage_name: str = "ResponseStage") -> str:
-        new_message = {"role": "user", "content": prompt}
-        self.messages.append(new_message)
-        request_messages = list(self.messages)
-        res = self.response_provider.chat(messages=request_messages)
-        message = {"role": "assistant", "content": res.content}
-        self.messages.append(message)
+    def generate_text(self, prompt: str, stage_name: str = "ResponseStage", history_text: str | None = None) -> str:
+        """Sends the history plus `prompt`; the turn is remembered as `history_text` (default: the prompt)."""
+        request_messages = self.history.build_request(prompt)
+        with track_provider_call("response", "chat", prompt_chars=message_chars(request_messages)) as call:
+            res = self.response_provider.chat(messages=request_messages)
+            call.completion_chars = len(res.content or "")
+            call.record_usage(res)
+        self.history.record_turn(history_text if history_text is not None else prompt, res.content)
 
         logger.conversation_event(
             stage_name=stage_name,
@@ -150,3 +398,34 @@ class ChromaDBHelper:
         )
 
         return res.content
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        on_delta: Callable[[str], None],
+        stage_name: str = "ResponseStage",
+        history_text: str | None = None,
+    ) -> str:
+        request_messages = self.history.build_request(prompt)
+
+        deltas: list[str] = []
+        with track_provider_call("response", "chat_stream", prompt_chars=message_chars(request_messages)) as call:
+            for delta in self.response_provider.chat_stream(messages=request_messages):
+                call.mark_first_output()
+                deltas.append(delta)
+                on_delta(delta)
+            call.completion_chars = sum(len(delta) for delta in deltas)
+
+        content = "".join(deltas)
+        self.history.record_turn(history_text if history_text is not None else prompt, content)
+
+        logger.conversation_event(
+            stage_name=stage_name,
+            event="generate_text",
+            payload={"prompt": prompt, "stream": True},
+            ai_request={"messages": list(request_messages)},
+            ai_response={"content": content, "chunks": len(deltas)},
+            result={"reply": content},
+        )
+
+        return content
@@ -0,0 +1,93 @@
+import os
+from threading import Lock
+from typing import Any
+
+import chromadb
+
+from ai.settings import LocalChromaConfig
+from classes.LexicalIndex import LexicalIndex
+from classes.MetadataIndex import MetadataIndex
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChromaRegistry:
+    """Hands out one PersistentClient per path and one collection handle per (path, collection, distance_space).
+
+    Each collection also gets one MetadataIndex and, for hybrid search, one LexicalIndex; both are built
+    from the stored entries on first request.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._index_lock = Lock()
+        self._clients: dict[str, Any] = {}
+        self._collections: dict[tuple[str, str, str], Any] = {}
+        self._indexes: dict[tuple[str, str, str], MetadataIndex] = {}
+        self._lexical_indexes: dict[tuple[str, str, str], LexicalIndex] = {}
+
+    def collection_key(self, config: LocalChromaConfig) -> tuple[str, str, str]:
+        return (os.path.abspath(config.path), config.collection, config.distance_space)
+
+    def get_collection(self, config: LocalChromaConfig) -> Any:
+        key = self.collection_key(config)
+
+        with self._lock:
+            collection = self._collections.get(key)
+            if collection is not None:
+                return collection
+
+            client = self._get_client(key[0])
+            logger.debug("Opening shared Chroma collection %s at %s", config.collection, key[0])
+            collection = client.get_or_create_collection(
+                config.collection,
+                metadata={"hnsw:space": config.distance_space},
+            )
+            self._collections[key] = collection
+            return collection
+
+    def get_metadata_index(self, config: LocalChromaConfig) -> MetadataIndex:
+        collection = self.get_collection(config)
+        key = self.collection_key(config)
+
+        # A separate lock, so a long index build does not block collection lookups.
+        with self._index_lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = MetadataIndex.build(collection)
+                self._indexes[key] = index
+            return index
+
+    def get_lexical_index(self, config: LocalChromaConfig) -> LexicalIndex:
+        collection = self.get_collection(config)
+        key = self.collection_key(config)
+
+        with self._index_lock:
+            index = self._lexical_indexes.get(key)
+            if index is None:
+                index = LexicalIndex.build(collection)
+                self._lexical_indexes[key] = index
+            return index
+
+    def clear(self) -> None:
+        with self._index_lock:
+            self._indexes.clear()
+            self._lexical_indexes.clear()
+        with self._lock:
+            self._collections.clear()
+            self._clients.clear()
+
+    def _get_client(self, path: str) -> Any:
+        client = self._clients.get(path)
+        if client is None:
+            client = chromadb.PersistentClient(path=path)
+            self._clients[path] = client
+        return client
+
+
+_chroma_registry = ChromaRegistry()
+
+
+def get_chroma_registry() -> ChromaRegistry:
+    return _chroma_registry
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+
+from ai.settings import DEFAULT_HISTORY, ConversationHistoryConfig
+from ai.tokens import estimate_message_tokens, estimate_tokens
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+Message = dict[str, str]
+SUMMARY_HEADING = "Earlier in this conversation (condensed):"
+
+
+@dataclass(frozen=True)
+class HistoryTurn:
+    user: str
+    assistant: str
+
+    def as_messages(self) -> list[Message]:
+        return [{"role": "user", "content": self.user}, {"role": "assistant", "content": self.assistant}]
+
+
+class ConversationHistory:
+    """Response-model chat history: seed messages, a rolling summary and the last few turns verbatim.
+
+    Turns store the compact player text rather than the full stage prompt. Turns beyond
+    `max_recent_turns` are folded into the summary one line per turn, and the summary keeps only its
+    newest lines. Summary plus recent turns must fit `max_history_tokens`.
+    """
+
+    def __init__(self, config: ConversationHistoryConfig = DEFAULT_HISTORY):
+        self.config = config
+        self.seed_messages: list[Message] = []
+        self.summary_lines: list[str] = []
+        self.turns: list[HistoryTurn] = []
+
+    @classmethod
+    def from_messages(cls, messages: list[Message], config: ConversationHistoryConfig = DEFAULT_HISTORY) -> "ConversationHistory":
+        """Rebuilds a history from a flat message list; a user message directly followed by a reply is a turn."""
+        history = cls(config)
+        index = 0
+        while index < len(messages):
+            message = messages[index]
+            following = messages[index + 1] if index + 1 < len(messages) else None
+            if message.get("role") == "user" and following is not None and following.get("role") == "assistant":
+                history.turns.append(HistoryTurn(user=message.get("content", ""), assistant=following.get("content", "")))
+                index += 2
+                continue
+            history.seed_messages.append(dict(message))
+            index += 1
+        history._enforce_budget()
+        return history
+
+    @property
+    def messages(self) -> list[Message]:
+        messages = list(self.seed_messages)
+        if len(self.summary_lines) > 0:
+            messages.append({"role": "system", "content": self.render_summary()})
+        for turn in self.turns:
+            messages.extend(turn.as_messages())
+        return messages
+
+    def seed(self, seed_messages: list[Message]) -> None:
+        self.seed_messages = [*seed_messages, *self.seed_messages]
+
+    def add_seed_message(self, message: Message) -> None:
+        self.seed_messages.append(message)
+
+    def build_request(self, prompt: str) -> list[Message]:
+        return [*self.messages, {"role": "user", "content": prompt}]
+
+    def record_turn(self, user_text: str, reply: str) -> None:
+        self.turns.append(HistoryTurn(user=user_text, assistant=reply))
+        self._enforce_budget()
+
+    def render_summary(self) -> str:
+        return "\n".join([SUMMARY_HEADING, *self.summary_lines])
+
+    def history_tokens(self) -> int:
+        tokens = sum(estimate_message_tokens(turn.as_messages()) for turn in self.turns)
+        if len(self.summary_lines) > 0:
+            tokens += estimate_tokens(self.render_summary())
+        return tokens
+
+    def _enforce_budget(self) -> None:
+        while len(self.turns) > self.config.max_recent_turns:
+            self._fold_oldest_turn()
+
+        while len(self.summary_lines) > 0 and len("\n".join(self.summary_lines)) > self.config.summary_max_chars:
+            self.summary_lines.pop(0)
+
+        # Over budget, the oldest condensed lines go first; recent turns are folded only once the summary is empty.
+        while self.history_tokens() > self.config.max_history_tokens:
+            if len(self.summary_lines) > 0:
+                self.summary_lines.pop(0)
+            elif len(self.turns) > 0:
+                self._fold_oldest_turn()
+            else:
+                break
+
+    def _fold_oldest_turn(self) -> None:
+        turn = self.turns.pop(0)
+        self.summary_lines.append(
+            f"Player: {self._condense(turn.user)} | You: {self._condense(turn.assistant)}"
+        )
+        logger.debug("Folded a turn into the conversation summary (%s summary lines)", len(self.summary_lines))
+
+    def _condense(self, text: str) -> str:
+        condensed = " ".join(text.split())
+        if len(condensed) <= self.config.summary_line_chars:
+            return condensed
+        return condensed[: self.config.summary_line_chars - 3].rstrip() + "..."
@@ -0,0 +1,208 @@
+import hashlib
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+
+from ai.settings import EmbeddingCacheConfig, RoleProviderConfig
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheStats:
+    model: str
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    disk_entries: int
+
+
+class DiskEmbeddingStore:
+    """Append-only float32 vector file read through mmap, with a small text index of key -> (offset, dim).
+
+    Assumes a single writer process per directory; readers in other processes see entries after reload.
+    """
+
+    VECTOR_FILE = "vectors.f32"
+    INDEX_FILE = "index.tsv"
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.vector_path = directory / self.VECTOR_FILE
+        self.index_path = directory / self.INDEX_FILE
+        self.vector_path.touch(exist_ok=True)
+        self.index_path.touch(exist_ok=True)
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self._mapped: mmap.mmap | None = None
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get(self, key: str) -> list[float] | None:
+        location = self._offsets.get(key)
+        if location is None:
+            return None
+
+        offset, dim = location
+        end = offset + dim * 4
+        mapped = self._map(end)
+        if mapped is None:
+            return None
+
+        values = array("f")
+        values.frombytes(mapped[offset:end])
+        return values.tolist()
+
+    def put(self, key: str, embedding: list[float]) -> None:
+        if key in self._offsets or len(embedding) == 0:
+            return
+
+        payload = array("f", embedding).tobytes()
+        with self.vector_path.open("ab") as vector_file:
+            offset = vector_file.tell()
+            vector_file.write(payload)
+        # The index line is written after the vector bytes so a crash never indexes a partial vector.
+        with self.index_path.open("a", encoding="ascii") as index_file:
+            index_file.write(f"{key}\t{offset}\t{len(embedding)}\n")
+        self._offsets[key] = (offset, len(embedding))
+
+    def close(self) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def _load_index(self) -> None:
+        vector_size = self.vector_path.stat().st_size
+        with self.index_path.open("r", encoding="ascii", errors="ignore") as index_file:
+            for line in index_file:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 3:
+                    continue
+                try:
+                    offset, dim = int(parts[1]), int(parts[2])
+                except ValueError:
+                    continue
+                if offset + dim * 4 > vector_size:
+                    continue
+                self._offsets[parts[0]] = (offset, dim)
+
+    def _map(self, required_size: int) -> mmap.mmap | None:
+        if self._mapped is not None and len(self._mapped) >= required_size:
+            return self._mapped
+
+        self.close()
+        if self.vector_path.stat().st_size < required_size:
+            return None
+        with self.vector_path.open("rb") as vector_file:
+            self._mapped = mmap.mmap(vector_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapped
+
+
+class EmbeddingCache:
+    """Content-hash keyed LRU of embeddings for one embedding model, with an optional on-disk tier."""
+
+    def __init__(self, model: str, max_entries: int = 4096, disk_path: str = ""):
+        self.model = model
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._evictions = 0
+        self._disk = DiskEmbeddingStore(Path(disk_path) / self._safe_model_name(model)) if disk_path != "" else None
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> list[float] | None:
+        key = self.key(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return embedding
+
+            if self._disk is not None:
+                embedding = self._disk.get(key)
+                if embedding is not None:
+                    self._disk_hits += 1
+                    self._remember(key, embedding)
+                    return embedding
+
+            self._misses += 1
+            return None
+
+    def put(self, text: str, embedding: list[float]) -> None:
+        key = self.key(text)
+        values = [float(value) for value in embedding]
+        with self._lock:
+            self._remember(key, values)
+            if self._disk is not None:
+                self._disk.put(key, values)
+
+    def stats(self) -> EmbeddingCacheStats:
+        with self._lock:
+            return EmbeddingCacheStats(
+                model=self.model,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                hits=self._hits,
+                misses=self._misses,
+                disk_hits=self._disk_hits,
+                evictions=self._evictions,
+                disk_entries=len(self._disk) if self._disk is not None else 0,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+
+    def _remember(self, key: str, embedding: list[float]) -> None:
+        if self.max_entries == 0:
+            return
+
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _safe_model_name(self, model: str) -> str:
+        safe_name = "".join(char if char.isalnum() or char in {"-", "_", "."} else "_" for char in model).strip("._")
+        return safe_name or "default"
+
+
+_embedding_caches: dict[tuple[str, int, str], EmbeddingCache] = {}
+_embedding_caches_lock = Lock()
+
+
+def get_embedding_cache(embedding_model: RoleProviderConfig, config: EmbeddingCacheConfig) -> EmbeddingCache:
+    model = f"{embedding_model.provider}:{embedding_model.model}"
+    key = (model, config.max_entries, os.path.abspath(config.path) if config.path != "" else "")
+
+    with _embedding_caches_lock:
+        cache = _embedding_caches.get(key)
+        if cache is None:
+            logger.debug("Creating embedding cache for %s (max_entries=%s, path=%s)", model, config.max_entries, config.path)
+            cache = EmbeddingCache(model=model, max_entries=config.max_entries, disk_path=config.path)
+            _embedding_caches[key] = cache
+        return cache
+
+
+def embedding_cache_stats() -> list[EmbeddingCacheStats]:
+    """Stats of every shared embedding cache created through get_embedding_cache."""
+    with _embedding_caches_lock:
+        caches = list(_embedding_caches.values())
+    return [cache.stats() for cache in caches]
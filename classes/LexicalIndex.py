@@ -0,0 +1,206 @@
+import math
+import re
+import time
+from collections import Counter
+from threading import Lock
+from typing import Any, Iterable, Mapping
+
+from logger import get_logger
+from metrics import observe_lexical_index_duration
+
+logger = get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Only the words that would otherwise match nearly every document; names and lore terms must stay searchable.
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from", "has", "have",
+    "he", "her", "his", "how", "i", "in", "is", "it", "its", "me", "my", "of", "on", "or", "s", "she",
+    "that", "the", "their", "them", "they", "this", "to", "was", "were", "what", "when", "where", "which",
+    "who", "why", "with", "you", "your",
+})
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.casefold()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[str]], k: int = 60) -> list[str]:
+    """Merges ranked id lists; an id scores 1 / (k + rank) per list it appears in."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, document_id in enumerate(ranking, start=1):
+            scores[document_id] = scores.get(document_id, 0.0) + 1.0 / (k + rank)
+    # sorted is stable, so ties keep the order in which ids were first seen.
+    return sorted(scores, key=lambda document_id: scores[document_id], reverse=True)
+
+
+def matches_filter(metadata: Mapping[str, Any], where: Mapping[str, Any]) -> bool | None:
+    """Evaluates the Chroma where-filter subset the app uses; None when the filter uses anything else."""
+    if len(where) == 0:
+        return True
+
+    results: list[bool] = []
+    for field, condition in where.items():
+        if field in {"$and", "$or"}:
+            if not isinstance(condition, list):
+                return None
+            clause_results = [matches_filter(metadata, clause) if isinstance(clause, Mapping) else None for clause in condition]
+            if None in clause_results:
+                return None
+            results.append(all(clause_results) if field == "$and" else any(clause_results))
+            continue
+
+        if field.startswith("$"):
+            return None
+        value = metadata.get(field)
+        if not isinstance(condition, Mapping):
+            results.append(value == condition)
+        elif list(condition) == ["$eq"]:
+            results.append(value == condition["$eq"])
+        elif list(condition) == ["$ne"]:
+            results.append(value != condition["$ne"])
+        elif list(condition) == ["$in"] and isinstance(condition["$in"], list):
+            results.append(value in condition["$in"])
+        else:
+            return None
+    return all(results)
+
+
+class LexicalIndex:
+    """In-process BM25 index over the collection's documents, kept current on upsert.
+
+    Dense retrieval tends to miss exact proper nouns such as faction and character names; ranking the
+    same documents by term overlap and fusing both lists recovers them. Scores use the classic Okapi
+    BM25 weighting with parameters `k1` and `b`.
+    """
+
+    BUILD_PAGE_SIZE = 1000
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = Lock()
+        self._postings: dict[str, dict[str, int]] = {}
+        self._lengths: dict[str, int] = {}
+        self._documents: dict[str, str] = {}
+        self._metadatas: dict[str, Mapping[str, Any]] = {}
+        self._total_length = 0
+
+    @classmethod
+    def build(cls, collection: Any, page_size: int = BUILD_PAGE_SIZE) -> "LexicalIndex":
+        index = cls()
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids")
+            documents = page.get("documents")
+            metadatas = page.get("metadatas")
+            if not isinstance(ids, list) or not isinstance(documents, list) or len(ids) == 0:
+                break
+            index.add(ids, documents, metadatas if isinstance(metadatas, list) else [None] * len(ids))
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        logger.info("Built lexical index over %s documents", len(index))
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def add(
+        self,
+        ids: Iterable[str],
+        documents: Iterable[str | None],
+        metadatas: Iterable[Mapping[str, Any] | None],
+    ) -> None:
+        started_at = time.perf_counter()
+        with self._lock:
+            for document_id, document, metadata in zip(ids, documents, metadatas):
+                self._remove(document_id)
+                text = str(document or "")
+                term_counts = Counter(tokenize(text))
+                if len(term_counts) == 0:
+                    continue
+
+                for term, count in term_counts.items():
+                    self._postings.setdefault(term, {})[document_id] = count
+                length = sum(term_counts.values())
+                self._lengths[document_id] = length
+                self._total_length += length
+                self._documents[document_id] = text
+                self._metadatas[document_id] = dict(metadata or {})
+        observe_lexical_index_duration("index", time.perf_counter() - started_at)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        candidate_ids: Iterable[str] | None = None,
+        where: Mapping[str, Any] | None = None,
+    ) -> list[tuple[str, str]]:
+        """Top `limit` (id, document) pairs by BM25 score.
+
+        `candidate_ids` restricts the search to ids already known to match the filter; otherwise `where`
+        is evaluated against the stored metadatas. A filter outside the supported subset yields no hits.
+        """
+        started_at = time.perf_counter()
+        try:
+            with self._lock:
+                return self._search(query, limit, candidate_ids, where)
+        finally:
+            observe_lexical_index_duration("search", time.perf_counter() - started_at)
+
+    def _search(
+        self,
+        query: str,
+        limit: int,
+        candidate_ids: Iterable[str] | None,
+        where: Mapping[str, Any] | None,
+    ) -> list[tuple[str, str]]:
+        document_count = len(self._documents)
+        if document_count == 0 or limit < 1:
+            return []
+
+        candidates = set(candidate_ids) if candidate_ids is not None else None
+        average_length = self._total_length / document_count
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            idf = math.log(1.0 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for document_id, frequency in postings.items():
+                if candidates is not None and document_id not in candidates:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[document_id] / average_length)
+                scores[document_id] = scores.get(document_id, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+
+        ranked = sorted(scores, key=lambda document_id: scores[document_id], reverse=True)
+        hits: list[tuple[str, str]] = []
+        for document_id in ranked:
+            if candidates is None and where is not None:
+                matched = matches_filter(self._metadatas[document_id], where)
+                if matched is None:
+                    logger.debug("Lexical search skipped; unsupported filter %s", where)
+                    return []
+                if not matched:
+                    continue
+            hits.append((document_id, self._documents[document_id]))
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def _remove(self, document_id: str) -> None:
+        if document_id not in self._documents:
+            return
+
+        for term in set(tokenize(self._documents.pop(document_id))):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(document_id, None)
+            if len(postings) == 0:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(document_id)
+        self._metadatas.pop(document_id, None)
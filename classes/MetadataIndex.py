@@ -0,0 +1,126 @@
+from threading import Lock
+from typing import Any, Iterable, Mapping
+
+from logger import get_logger
+from metrics import count_metadata_index_lookup
+
+logger = get_logger(__name__)
+
+# Field combinations the index answers, sorted by field name. They match the equality filters built by
+# Character: (name, type, category) for character state and (faction, category) for faction lore.
+INDEXED_FIELDS: tuple[tuple[str, ...], ...] = (
+    ("category", "name", "type"),
+    ("category", "faction"),
+)
+
+IndexKey = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+class MetadataIndex:
+    """In-process map from indexed metadata values to document ids, in upsert order.
+
+    `resolve(where)` turns a Chroma `where` filter into the matching ids when the filter is an equality
+    match on one of INDEXED_FIELDS, or an `$or` of such matches that each have indexed ids; any other
+    filter returns None and has to go to Chroma. The index only sees upserts made through `add`, so ids
+    written by other processes are missing until the index is rebuilt; ChromaDBHelper sends filters with
+    no indexed ids to Chroma as well.
+    """
+
+    BUILD_PAGE_SIZE = 1000
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # Dicts with None values keep ids unique and in insertion order.
+        self._ids: dict[IndexKey, dict[str, None]] = {}
+        self._keys_by_id: dict[str, list[IndexKey]] = {}
+
+    @classmethod
+    def build(cls, collection: Any, page_size: int = BUILD_PAGE_SIZE) -> "MetadataIndex":
+        index = cls()
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            ids = page.get("ids")
+            metadatas = page.get("metadatas")
+            if not isinstance(ids, list) or not isinstance(metadatas, list) or len(ids) == 0:
+                break
+            index.add(ids, metadatas)
+            offset += len(ids)
+            if len(ids) < page_size:
+                break
+        logger.info("Indexed metadata of %s documents", len(index))
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys_by_id)
+
+    def add(self, ids: Iterable[str], metadatas: Iterable[Mapping[str, Any] | None]) -> None:
+        with self._lock:
+            for document_id, metadata in zip(ids, metadatas):
+                # An upsert may change an id's metadata, so its old keys are dropped first.
+                for key in self._keys_by_id.pop(document_id, []):
+                    self._ids.get(key, {}).pop(document_id, None)
+
+                keys = self._keys_for(metadata or {})
+                self._keys_by_id[document_id] = keys
+                for key in keys:
+                    self._ids.setdefault(key, {})[document_id] = None
+
+    def resolve(self, where: Mapping[str, Any] | None) -> list[str] | None:
+        with self._lock:
+            ids = self._resolve(where)
+        count_metadata_index_lookup("unindexed" if ids is None else "indexed" if len(ids) > 0 else "empty")
+        return ids
+
+    def _resolve(self, where: Any) -> list[str] | None:
+        if not isinstance(where, Mapping):
+            return None
+
+        if list(where) == ["$or"]:
+            clauses = where["$or"]
+            if not isinstance(clauses, list) or len(clauses) == 0:
+                return None
+            matched: dict[str, None] = {}
+            for clause in clauses:
+                clause_ids = self._resolve(clause)
+                # An empty clause may only be missing from the index, and dropping it would hide its matches.
+                if clause_ids is None or len(clause_ids) == 0:
+                    return None
+                matched.update(dict.fromkeys(clause_ids))
+            return list(matched)
+
+        key = self._key_for_filter(where)
+        if key is None:
+            return None
+        return list(self._ids.get(key, {}))
+
+    def _key_for_filter(self, where: Mapping[str, Any]) -> IndexKey | None:
+        clauses = where["$and"] if list(where) == ["$and"] else [where]
+        if not isinstance(clauses, list):
+            return None
+
+        values: dict[str, str] = {}
+        for clause in clauses:
+            if not isinstance(clause, Mapping) or len(clause) != 1:
+                return None
+            field, value = next(iter(clause.items()))
+            if isinstance(value, Mapping) and list(value) == ["$eq"]:
+                value = value["$eq"]
+            if field.startswith("$") or field in values or not isinstance(value, str):
+                return None
+            values[field] = value
+
+        fields = tuple(sorted(values))
+        if fields not in INDEXED_FIELDS:
+            return None
+        return fields, tuple(values[field] for field in fields)
+
+    def _keys_for(self, metadata: Mapping[str, Any]) -> list[IndexKey]:
+        keys: list[IndexKey] = []
+        for fields in INDEXED_FIELDS:
+            values = [metadata.get(field) for field in fields]
+            if all(isinstance(value, str) for value in values):
+                keys.append((fields, tuple(values)))
+        return keys
+
@@ -2,15 +2,16 @@ from typing import Dict, Any, Callable
 import re
 import json
 
-from ai import AISettings, ChatCompletionResult, create_chat_provider, get_ai_settings
+from ai import AISettings, ChatCompletionResult, get_ai_settings, get_chat_provider
 from logger import get_logger
+from metrics import message_chars, track_provider_call
 
 logger = get_logger(__name__)
 
 class NPCAgent:
     def __init__(self, settings: AISettings | None = None):
         settings = settings or get_ai_settings()
-        self.provider = create_chat_provider(settings.decision_llm)
+        self.provider = get_chat_provider(settings.decision_llm)
 
     def parse_output(self, raw_output: str, fallback: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """
@@ -33,13 +34,24 @@ class NPCAgent:
         stage_name: str = "PerceptionStage",
         tools: list[Callable] | None = None,
         payload: dict[str, Any] | None = None,
+        system_prompt: str | None = None,
     ) -> ChatCompletionResult:
+        """
+        Send one stage prompt to the decision model.
+        A system_prompt is sent first, unchanged, so backends with prefix caching can reuse it across calls.
+        """
         system_message = {"role": "user", "content": prompt}
+        messages = [system_message]
+        if system_prompt is not None:
+            messages = [{"role": "system", "content": system_prompt}, system_message]
 
-        res = self.provider.chat(
-            messages=[system_message],
-            tools=tools
-        )
+        with track_provider_call("decision", "chat", prompt_chars=message_chars(messages)) as call:
+            res = self.provider.chat(
+                messages=messages,
+                tools=tools
+            )
+            call.completion_chars = len(res.content or "")
+            call.record_usage(res)
 
         logger.debug("Generated payload: %s", res)
         logger.conversation_event(
@@ -47,14 +59,19 @@ class NPCAgent:
             event="decision_model",
             payload=payload or {"prompt": prompt},
             ai_request={
-                "messages": [system_message],
+                "messages": messages,
                 "tools": [tool.__name__ for tool in tools] if tools is not None else [],
             },
             ai_response={
                 "content": res.content,
                 "tool_calls": res.tool_calls,
             },
-            result={"content": res.content, "tool_calls": res.tool_calls},
+            result={
+                "content": res.content,
+                "tool_calls": res.tool_calls,
+                "prompt_tokens": res.prompt_tokens,
+                "cached_prompt_tokens": res.cached_prompt_tokens,
+            },
         )
 
         return res
@@ -0,0 +1,208 @@
+import atexit
+import os
+from dataclasses import dataclass
+from queue import Empty, Queue
+from threading import Condition, Event, Lock, Thread
+from typing import Any
+
+from logger import get_logger
+from metrics import get_metrics_registry
+
+logger = get_logger(__name__)
+
+# (id, document, metadata), as accepted by ChromaDBHelper.add_embeddings.
+StateEntry = tuple[str, str, dict[str, Any] | None]
+# Identifies whose writes a flush waits for: the collection and the character name, so a later
+# conversation with the same NPC sees the writes of an earlier one even though it has its own helper.
+StateWriteKey = tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class StateWriterStats:
+    queued: int
+    pending: int
+    written: int
+    failed: int
+    batches: int
+
+
+class _StopMarker:
+    def __init__(self) -> None:
+        self.done = Event()
+
+
+class StateWriter:
+    """Embeds and upserts character state entries on one background thread.
+
+    Each submit hands over all entries of one turn under a StateWriteKey, with the ChromaDBHelper that
+    writes them; the writer merges what is queued per key into a single `add_embeddings` call, so a
+    turn's sentiment, relationship, belief, goal and memory updates cost one batched embedding request
+    and one upsert. `flush(key)` waits until everything submitted under that key is written, which is
+    what gives the next turn, or the next conversation with the same character, read-your-writes.
+    A failed batch is logged and counted; it is not retried.
+
+    `submit` blocks while the queue is full, so it must not be called on the event loop.
+    """
+
+    DEFAULT_MAX_QUEUE = 256
+    DEFAULT_BATCH_SIZE = 32
+
+    def __init__(self, max_queue: int = DEFAULT_MAX_QUEUE, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self._queue: Queue[tuple[StateWriteKey, Any, list[StateEntry]] | _StopMarker] = Queue(maxsize=max_queue)
+        self._lock = Lock()
+        # Held across the stopped check and the put, so no entry is queued behind the stop marker.
+        self._submit_lock = Lock()
+        self._written_condition = Condition(self._lock)
+        # Entries submitted but not yet written, per key.
+        self._pending: dict[StateWriteKey, int] = {}
+        self._thread: Thread | None = None
+        self._stopped = False
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+
+    def submit(self, key: StateWriteKey, db: Any, entries: list[StateEntry]) -> None:
+        if len(entries) == 0:
+            return
+
+        with self._submit_lock:
+            with self._lock:
+                if self._stopped:
+                    raise RuntimeError("State writer has been shut down")
+                if self._thread is None:
+                    self._thread = Thread(target=self._run, name="character-state-writer", daemon=True)
+                    self._thread.start()
+                self._pending[key] = self._pending.get(key, 0) + len(entries)
+            self._queue.put((key, db, list(entries)))
+
+    def flush(self, key: StateWriteKey, timeout: float | None = 10.0) -> bool:
+        """Blocks until every entry submitted under `key` has been written or has failed."""
+        with self._written_condition:
+            return self._written_condition.wait_for(lambda: self._pending.get(key, 0) == 0, timeout)
+
+    def shutdown(self, timeout: float | None = 10.0) -> None:
+        with self._submit_lock:
+            with self._lock:
+                thread = self._thread
+                already_stopped = self._stopped
+                self._stopped = True
+            if thread is None or already_stopped:
+                return
+            marker = _StopMarker()
+            self._queue.put(marker)
+        if not marker.done.wait(timeout):
+            logger.warning("State writer did not drain within %ss; %s entries may be lost", timeout, self.stats().pending)
+        thread.join(timeout)
+
+    def stats(self) -> StateWriterStats:
+        with self._lock:
+            return StateWriterStats(
+                queued=self._queue.qsize(),
+                pending=sum(self._pending.values()),
+                written=self._written,
+                failed=self._failed,
+                batches=self._batches,
+            )
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            stop = next((item for item in batch if isinstance(item, _StopMarker)), None)
+            self._write_batch([item for item in batch if not isinstance(item, _StopMarker)])
+            if stop is not None:
+                # Submits are refused once stopped and never queue behind the marker, so this is a final drain.
+                self._write_batch(self._drain())
+                stop.done.set()
+                return
+
+    def _drain(self) -> list[tuple[StateWriteKey, Any, list[StateEntry]]]:
+        items: list[tuple[StateWriteKey, Any, list[StateEntry]]] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except Empty:
+                return items
+            if not isinstance(item, _StopMarker):
+                items.append(item)
+
+    def _write_batch(self, items: list[tuple[StateWriteKey, Any, list[StateEntry]]]) -> None:
+        grouped: dict[StateWriteKey, tuple[Any, list[StateEntry]]] = {}
+        for key, db, entries in items:
+            grouped.setdefault(key, (db, []))[1].extend(entries)
+
+        for key, (db, entries) in grouped.items():
+            failed = False
+            try:
+                db.add_embeddings(entries)
+            except Exception:
+                failed = True
+                logger.error("Could not persist %s character state entries", len(entries), exc_info=True)
+
+            _count_state_writes(len(entries), "error" if failed else "ok")
+            with self._written_condition:
+                self._batches += 1
+                if failed:
+                    self._failed += len(entries)
+                else:
+                    self._written += len(entries)
+                remaining = self._pending.get(key, 0) - len(entries)
+                if remaining > 0:
+                    self._pending[key] = remaining
+                else:
+                    self._pending.pop(key, None)
+                self._written_condition.notify_all()
+
+
+def _count_state_writes(entries: int, status: str) -> None:
+    get_metrics_registry().counter(
+        "aigame_state_writes_total",
+        "Character state entries persisted by the write-behind state writer.",
+        ("status",),
+    ).inc(entries, status=status)
+
+
+def _get_env_int(name: str, default: int) -> int:
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value.strip() == "":
+        return default
+    return int(raw_value)
+
+
+_state_writer: StateWriter | None = None
+_state_writer_lock = Lock()
+
+
+def get_state_writer() -> StateWriter:
+    global _state_writer
+    with _state_writer_lock:
+        if _state_writer is None:
+            _state_writer = StateWriter(
+                max_queue=_get_env_int("AIGAME_STATE_WRITE_QUEUE_SIZE", StateWriter.DEFAULT_MAX_QUEUE),
+                batch_size=_get_env_int("AIGAME_STATE_WRITE_BATCH_SIZE", StateWriter.DEFAULT_BATCH_SIZE),
+            )
+        return _state_writer
+
+
+def shutdown_state_writer(timeout: float | None = 10.0) -> None:
+    global _state_writer
+    with _state_writer_lock:
+        writer = _state_writer
+        _state_writer = None
+    if writer is not None:
+        writer.shutdown(timeout)
+
+
+atexit.register(shutdown_state_writer)
@@ -1,14 +1,20 @@
+import atexit
+import hashlib
 import logging
 import os
 import json
+from collections import OrderedDict
 from contextvars import ContextVar, Token
-from dataclasses import asdict, is_dataclass
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from threading import Lock
-from typing import Any, Optional, Protocol, cast
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Optional, Protocol, TextIO, cast
 from uuid import uuid4
 
+from metrics import get_metrics_registry
+
 try:
     from dotenv import load_dotenv
 except Exception:
@@ -18,6 +24,11 @@ _configured = False
 VERBOSE_LEVEL = 15
 TRACE_LEVEL = VERBOSE_LEVEL
 _current_conversation_id: ContextVar[str | None] = ContextVar("current_conversation_id", default=None)
+TRACE_OVERFLOW_POLICIES = ("block", "drop", "sample")
+TRACE_FORMATS = ("text", "jsonl")
+# Strings at least this long are stored once per JSONL trace and referenced by hash.
+TRACE_BLOB_MIN_CHARS = 200
+TRACE_SECTION_MIN_CHARS = 64
 
 
 def _serialize_trace_value(value: Any) -> Any:
@@ -39,6 +50,283 @@ def _render_trace_value(value: Any) -> str:
     return json.dumps(serialized, indent=2, ensure_ascii=True, default=str)
 
 
+def _get_env_int(name: str, default: int) -> int:
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    return int(raw_value)
+
+
+@dataclass(frozen=True)
+class TraceWriterStats:
+    overflow: str
+    queued: int
+    written: int
+    dropped: int
+    sampled_out: int
+    open_files: int
+
+
+class _TraceMarker:
+    """Queued behind pending events; the writer flushes everything before it, then signals `done`."""
+
+    def __init__(self, path: Path | None = None, close: bool = False, stop: bool = False):
+        self.path = path
+        self.close = close
+        self.stop = stop
+        self.done = Event()
+
+
+class TraceWriter:
+    """Renders and appends conversation trace events on one background thread.
+
+    Callers enqueue a render callback instead of text, so JSON serialization of prompts and stage
+    results happens off the request thread. Events are written in batches, one open file handle per
+    trace. When the queue is full the `overflow` policy decides: `block` waits for room, `drop`
+    discards the event and `sample` keeps only every `sample_every`-th event once the queue is half
+    full. Failure events are never dropped or sampled.
+
+    `submit(..., wait=False)` and `close_file(path, wait=False)` never block the caller, which is what
+    event-loop callers need: when the queue is full, the item is held back and queued by the writer
+    thread itself, in submission order, as soon as there is room.
+    """
+
+    DEFAULT_MAX_QUEUE = 1024
+    DEFAULT_BATCH_SIZE = 64
+    DEFAULT_SAMPLE_EVERY = 4
+    DEFERRED_POLL_SECONDS = 0.5
+
+    def __init__(
+        self,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        overflow: str = "block",
+        sample_every: int = DEFAULT_SAMPLE_EVERY,
+    ) -> None:
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if overflow not in TRACE_OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {TRACE_OVERFLOW_POLICIES}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.sample_every = sample_every
+        self._queue: Queue[tuple[Path, Callable[[], str]] | _TraceMarker] = Queue(maxsize=max_queue)
+        self._files: dict[Path, TextIO] = {}
+        self._lock = Lock()
+        self._thread: Thread | None = None
+        self._stopped = False
+        self._deferred: list[tuple[Path, Callable[[], str]] | _TraceMarker] = []
+        self._written = 0
+        self._dropped = 0
+        self._sampled_out = 0
+        self._pressure_events = 0
+
+    def submit(self, path: Path, render: Callable[[], str], required: bool = False, wait: bool = True) -> None:
+        self._ensure_started()
+        item = (path, render)
+        if not wait and (required or self.overflow == "block"):
+            self._put_or_defer(item)
+            return
+        if required or self.overflow == "block":
+            self._put_in_order(item)
+            return
+
+        if self.overflow == "sample" and self._queue.qsize() >= self.max_queue // 2:
+            with self._lock:
+                self._pressure_events += 1
+                if self._pressure_events % self.sample_every != 0:
+                    self._sampled_out += 1
+                    return
+
+        with self._lock:
+            # Queueing past held-back items would reorder the trace, so the event is dropped like on a full queue.
+            if len(self._deferred) == 0:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except Full:
+                    pass
+            self._dropped += 1
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        return self._wait_for(_TraceMarker(), timeout)
+
+    def close_file(self, path: Path, timeout: float | None = 5.0, wait: bool = True) -> bool:
+        marker = _TraceMarker(path=path, close=True)
+        if wait:
+            return self._wait_for(marker, timeout)
+
+        with self._lock:
+            if self._thread is None or self._stopped:
+                return True
+        self._put_or_defer(marker)
+        return True
+
+    def shutdown(self, timeout: float | None = 5.0) -> None:
+        with self._lock:
+            thread = self._thread
+            self._stopped = True
+        if thread is None:
+            return
+        self._put_in_order(_TraceMarker(stop=True))
+        thread.join(timeout)
+
+    def stats(self) -> TraceWriterStats:
+        with self._lock:
+            return TraceWriterStats(
+                overflow=self.overflow,
+                queued=self._queue.qsize(),
+                written=self._written,
+                dropped=self._dropped,
+                sampled_out=self._sampled_out,
+                open_files=len(self._files),
+            )
+
+    def _put_or_defer(self, item: tuple[Path, Callable[[], str]] | _TraceMarker) -> None:
+        with self._lock:
+            # Once anything is held back, later items queue behind it so a trace's order is kept.
+            if len(self._deferred) == 0:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except Full:
+                    pass
+            self._deferred.append(item)
+
+    def _put_in_order(self, item: tuple[Path, Callable[[], str]] | _TraceMarker) -> None:
+        with self._lock:
+            # A blocking put would overtake items still held back, so it waits behind them instead.
+            if len(self._deferred) > 0:
+                self._deferred.append(item)
+                return
+        self._queue.put(item)
+
+    def _wait_for(self, marker: _TraceMarker, timeout: float | None) -> bool:
+        with self._lock:
+            if self._thread is None or self._stopped:
+                return True
+        self._put_in_order(marker)
+        return marker.done.wait(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Trace writer has been shut down")
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="conversation-trace-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                # The timeout lets items deferred while the queue was full get queued even when no event follows.
+                batch = [self._queue.get(timeout=self.DEFERRED_POLL_SECONDS)]
+            except Empty:
+                self._queue_deferred()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            if self._write_batch(batch):
+                return
+            self._queue_deferred()
+
+    def _queue_deferred(self) -> None:
+        with self._lock:
+            while len(self._deferred) > 0:
+                try:
+                    self._queue.put_nowait(self._deferred[0])
+                except Full:
+                    return
+                self._deferred.pop(0)
+
+    def _write_batch(self, batch: list[tuple[Path, Callable[[], str]] | _TraceMarker]) -> bool:
+        pending: dict[Path, list[str]] = {}
+        for item in batch:
+            if not isinstance(item, _TraceMarker):
+                path, render = item
+                try:
+                    pending.setdefault(path, []).append(render())
+                except Exception:
+                    logging.getLogger(__name__).warning("Could not render trace event for %s", path, exc_info=True)
+                continue
+
+            self._write_pending(pending)
+            pending = {}
+            if item.close and item.path is not None:
+                self._close(item.path)
+            if item.stop:
+                for path in list(self._files):
+                    self._close(path)
+                item.done.set()
+                return True
+            item.done.set()
+
+        self._write_pending(pending)
+        return False
+
+    def _write_pending(self, pending: dict[Path, list[str]]) -> None:
+        for path, texts in pending.items():
+            try:
+                file = self._files.get(path)
+                if file is None:
+                    file = path.open("a", encoding="utf-8")
+                    with self._lock:
+                        self._files[path] = file
+                file.write("".join(texts))
+                file.flush()
+            except OSError:
+                logging.getLogger(__name__).warning("Could not write conversation trace %s", path, exc_info=True)
+                with self._lock:
+                    self._dropped += len(texts)
+                continue
+            with self._lock:
+                self._written += len(texts)
+
+    def _close(self, path: Path) -> None:
+        with self._lock:
+            file = self._files.pop(path, None)
+        if file is not None:
+            file.close()
+
+
+_trace_writer: TraceWriter | None = None
+_trace_writer_lock = Lock()
+
+
+def get_trace_writer() -> TraceWriter:
+    global _trace_writer
+    with _trace_writer_lock:
+        if _trace_writer is None:
+            _trace_writer = TraceWriter(
+                max_queue=_get_env_int("AIGAME_TRACE_QUEUE_SIZE", TraceWriter.DEFAULT_MAX_QUEUE),
+                batch_size=_get_env_int("AIGAME_TRACE_BATCH_SIZE", TraceWriter.DEFAULT_BATCH_SIZE),
+                overflow=os.getenv("AIGAME_TRACE_OVERFLOW", "block").strip().lower() or "block",
+                sample_every=_get_env_int("AIGAME_TRACE_SAMPLE_EVERY", TraceWriter.DEFAULT_SAMPLE_EVERY),
+            )
+        return _trace_writer
+
+
+def shutdown_trace_writer(timeout: float | None = 5.0) -> None:
+    global _trace_writer
+    with _trace_writer_lock:
+        writer = _trace_writer
+        _trace_writer = None
+    if writer is not None:
+        writer.shutdown(timeout)
+
+
+atexit.register(shutdown_trace_writer)
+
+
 class ConversationTrace:
     def __init__(
         self,
@@ -47,15 +335,23 @@ class ConversationTrace:
         profile: str,
         providers: dict[str, str],
         persist_enabled: bool,
+        trace_format: str | None = None,
     ) -> None:
         self.persist_enabled = persist_enabled
         self.character_name = character_name
         self.profile = profile
         self.providers = providers
+        self.trace_format = (trace_format or os.getenv("AIGAME_TRACE_FORMAT", "text")).strip().lower()
+        if self.trace_format not in TRACE_FORMATS:
+            raise ValueError(f"trace_format must be one of {TRACE_FORMATS}")
         self.conversation_id = uuid4().hex
         self.started_at = datetime.now(timezone.utc)
-        self._lock = Lock()
         self.path: Path | None = None
+        self.closed = False
+        self._submitted = False
+        # Only touched while rendering, which happens on the single trace writer thread.
+        self._written_blobs: set[str] = set()
+        self._header_rendered = False
 
         if not self.persist_enabled:
             return
@@ -64,17 +360,41 @@ class ConversationTrace:
         safe_name = "".join(char for char in character_name if char.isalnum() or char in {"-", "_"}).strip("_")
         if safe_name == "":
             safe_name = "conversation"
-        filename = f"{self.started_at.strftime('%Y%m%d-%H%M%S')}-{safe_name}-{self.conversation_id[:8]}.txt"
+        extension = "jsonl" if self.trace_format == "jsonl" else "txt"
+        filename = f"{self.started_at.strftime('%Y%m%d-%H%M%S')}-{safe_name}-{self.conversation_id[:8]}.{extension}"
         self.path = root_dir / filename
-        self._append(self._render_header())
 
-    def _append(self, text: str) -> None:
+    def _submit(self, render: Callable[[], str], required: bool = False, wait: bool = True) -> None:
+        if not self.persist_enabled or self.path is None or self.closed:
+            return
+
+        # Traces start on the event loop, so the header is not queued on its own: it is written ahead of
+        # whichever item the writer renders first for this trace.
+        self._submitted = True
+        get_trace_writer().submit(self.path, lambda: self._render_pending_header() + render(), required=required, wait=wait)
+
+    def _render_pending_header(self) -> str:
+        if self._header_rendered:
+            return ""
+        self._header_rendered = True
+        return self._render_jsonl_header() if self.trace_format == "jsonl" else self._render_header()
+
+    def close(self, wait: bool = True) -> None:
+        """Releases the trace's file handle once every queued event is on disk.
+
+        With `wait`, blocks until then; without it, only queues the close, which is what event-loop callers need.
+        """
+        if self.closed:
+            return
+        if self.persist_enabled and self.path is not None and not self._submitted:
+            # A trace without events still gets its header file.
+            self._submit(lambda: "", required=True, wait=wait)
+        self.closed = True
         if not self.persist_enabled or self.path is None:
             return
 
-        with self._lock:
-            with self.path.open("a", encoding="utf-8") as file:
-                file.write(text)
+        if not get_trace_writer().close_file(self.path, wait=wait):
+            logging.getLogger(__name__).warning("Timed out flushing conversation trace %s", self.path)
 
     def _render_header(self) -> str:
         lines = [
@@ -90,6 +410,62 @@ class ConversationTrace:
         ]
         return "\n".join(lines)
 
+    def _render_jsonl_header(self) -> str:
+        return self._render_jsonl_record({
+            "type": "header",
+            "conversation_id": self.conversation_id,
+            "character_name": self.character_name,
+            "started_at_utc": self.started_at.isoformat(),
+            "ai_profile": self.profile,
+            "providers": self.providers,
+        })
+
+    def _render_jsonl_record(self, record: dict[str, Any]) -> str:
+        blob_lines: list[str] = []
+        compact = {key: self._extract_blobs(value, blob_lines) for key, value in _serialize_trace_value(record).items()}
+        blob_lines.append(json.dumps(compact, ensure_ascii=False, separators=(",", ":"), default=str))
+        return "\n".join(blob_lines) + "\n"
+
+    def _extract_blobs(self, value: Any, blob_lines: list[str]) -> Any:
+        """Replaces large values with blob references, emitting a blob line the first time a hash is seen.
+
+        Prompts are built from blank-line separated sections that repeat across stages and turns, so
+        long strings are split into sections first: {"$parts": [...]} joins its items with a blank line.
+        Large nested objects such as stage results, which later stages log again, are stored as blobs too.
+        """
+        if isinstance(value, str):
+            if len(value) < TRACE_BLOB_MIN_CHARS:
+                return value
+            sections = value.split("\n\n")
+            if len(sections) == 1:
+                return self._blob_reference(value, blob_lines)
+            return {"$parts": [
+                self._blob_reference(section, blob_lines) if len(section) >= TRACE_SECTION_MIN_CHARS else section
+                for section in sections
+            ]}
+        if isinstance(value, dict):
+            compact = {key: self._extract_blobs(item, blob_lines) for key, item in value.items()}
+        elif isinstance(value, list):
+            compact = [self._extract_blobs(item, blob_lines) for item in value]
+        else:
+            return value
+
+        encoded = json.dumps(compact, ensure_ascii=False, separators=(",", ":"), default=str)
+        return self._blob_reference(compact, blob_lines, encoded) if len(encoded) >= TRACE_BLOB_MIN_CHARS else compact
+
+    def _blob_reference(self, content: Any, blob_lines: list[str], encoded: str | None = None) -> dict[str, str]:
+        key = content if isinstance(content, str) else encoded or json.dumps(content, sort_keys=True, default=str)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        if digest not in self._written_blobs:
+            self._written_blobs.add(digest)
+            blob_lines.append(json.dumps(
+                {"type": "blob", "hash": digest, "content": content},
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=str,
+            ))
+        return {"$blob": digest}
+
     def record_stage_event(
         self,
         stage_name: str,
@@ -100,26 +476,167 @@ class ConversationTrace:
         result: Any | None = None,
         status: str = "ok",
     ) -> None:
+        if not self.persist_enabled:
+            return
+
         timestamp = datetime.now(timezone.utc).isoformat()
-        lines = [
-            f"=== Stage: {stage_name} ===",
-            f"timestamp_utc: {timestamp}",
-            f"event: {event}",
-            f"status: {status}",
-        ]
-        if payload is not None:
-            lines.extend(["payload:", _render_trace_value(payload)])
-        if ai_request is not None:
-            lines.extend(["ai_request:", _render_trace_value(ai_request)])
-        if ai_response is not None:
-            lines.extend(["ai_response:", _render_trace_value(ai_response)])
-        if result is not None:
-            lines.extend(["result:", _render_trace_value(result)])
-        lines.append("")
-        self._append("\n".join(lines))
+        # Rendering happens later on the writer thread, so copy the values as they are now; callers may
+        # keep mutating the dicts and lists they logged.
+        payload, ai_request, ai_response, result = (
+            _serialize_trace_value(value) for value in (payload, ai_request, ai_response, result)
+        )
+
+        if self.trace_format == "jsonl":
+            record: dict[str, Any] = {
+                "type": "event",
+                "timestamp_utc": timestamp,
+                "stage": stage_name,
+                "event": event,
+                "status": status,
+            }
+            for key, value in (("payload", payload), ("ai_request", ai_request), ("ai_response", ai_response), ("result", result)):
+                if value is not None:
+                    record[key] = value
+            self._submit(lambda: self._render_jsonl_record(record), required=status != "ok")
+            return
 
+        def render() -> str:
+            lines = [
+                f"=== Stage: {stage_name} ===",
+                f"timestamp_utc: {timestamp}",
+                f"event: {event}",
+                f"status: {status}",
+            ]
+            if payload is not None:
+                lines.extend(["payload:", _render_trace_value(payload)])
+            if ai_request is not None:
+                lines.extend(["ai_request:", _render_trace_value(ai_request)])
+            if ai_response is not None:
+                lines.extend(["ai_response:", _render_trace_value(ai_response)])
+            if result is not None:
+                lines.extend(["result:", _render_trace_value(result)])
+            lines.append("")
+            return "\n".join(lines)
+
+        self._submit(render, required=status != "ok")
+
+
+@dataclass(frozen=True)
+class TraceRegistryStats:
+    active: int
+    finished: int
+    evicted: int
+
+
+class TraceRegistry:
+    """Tracks conversation traces from start to end.
+
+    At most `max_active` traces stay open; past that the oldest is closed and evicted, and its later
+    events are ignored. A finished trace is closed and only its file path is kept, in a bounded LRU,
+    so the path can still be looked up after the conversation ends.
+    """
+
+    DEFAULT_MAX_ACTIVE = 1024
+    DEFAULT_MAX_FINISHED = 256
+
+    def __init__(self, max_active: int = DEFAULT_MAX_ACTIVE, max_finished: int = DEFAULT_MAX_FINISHED) -> None:
+        if max_active < 1:
+            raise ValueError("max_active must be at least 1")
+        if max_finished < 0:
+            raise ValueError("max_finished must not be negative")
+
+        self.max_active = max_active
+        self.max_finished = max_finished
+        self._active: OrderedDict[str, ConversationTrace] = OrderedDict()
+        # Paths are kept as strings: a str is a fraction of the size of a Path with its cached parts.
+        self._finished: OrderedDict[str, str | None] = OrderedDict()
+        self._lock = Lock()
+        self._evicted = 0
 
-_conversation_traces: dict[str, ConversationTrace] = {}
+    def add(self, trace: ConversationTrace) -> None:
+        evicted: list[ConversationTrace] = []
+        with self._lock:
+            self._active[trace.conversation_id] = trace
+            while len(self._active) > self.max_active:
+                _, oldest = self._active.popitem(last=False)
+                self._remember_finished(oldest)
+                evicted.append(oldest)
+            self._evicted += len(evicted)
+
+        if len(evicted) > 0:
+            get_metrics_registry().counter(
+                "aigame_conversation_traces_evicted_total",
+                "Conversation traces closed early because too many were open.",
+            ).inc(len(evicted))
+        for oldest in evicted:
+            logging.getLogger(__name__).warning(
+                "Evicting conversation trace %s; more than %s conversations are open",
+                oldest.conversation_id,
+                self.max_active,
+            )
+            # add runs on the event loop when a conversation starts, so eviction must not wait for the writer.
+            oldest.close(wait=False)
+
+    def get(self, conversation_id: str) -> ConversationTrace | None:
+        with self._lock:
+            return self._active.get(conversation_id)
+
+    def finish(self, conversation_id: str, wait: bool = True) -> None:
+        with self._lock:
+            trace = self._active.pop(conversation_id, None)
+            if trace is not None:
+                self._remember_finished(trace)
+        if trace is not None:
+            trace.close(wait=wait)
+
+    def path_for(self, conversation_id: str) -> Path | None:
+        with self._lock:
+            trace = self._active.get(conversation_id)
+            if trace is not None:
+                return trace.path
+            path = self._finished.get(conversation_id)
+        return Path(path) if path is not None else None
+
+    def stats(self) -> TraceRegistryStats:
+        with self._lock:
+            return TraceRegistryStats(active=len(self._active), finished=len(self._finished), evicted=self._evicted)
+
+    def _remember_finished(self, trace: ConversationTrace) -> None:
+        if self.max_finished == 0:
+            return
+        self._finished[trace.conversation_id] = str(trace.path) if trace.path is not None else None
+        self._finished.move_to_end(trace.conversation_id)
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
+
+_trace_registry: TraceRegistry | None = None
+_trace_registry_lock = Lock()
+
+
+def get_trace_registry() -> TraceRegistry:
+    # Built on first use rather than at import, so limits set in .env (loaded by configure_logging) apply.
+    global _trace_registry
+    with _trace_registry_lock:
+        if _trace_registry is None:
+            _trace_registry = TraceRegistry(
+                max_active=_get_env_int("AIGAME_TRACE_MAX_ACTIVE", TraceRegistry.DEFAULT_MAX_ACTIVE),
+                max_finished=_get_env_int("AIGAME_TRACE_MAX_FINISHED", TraceRegistry.DEFAULT_MAX_FINISHED),
+            )
+        return _trace_registry
+
+
+def _active_trace_count() -> float:
+    with _trace_registry_lock:
+        registry = _trace_registry
+    return registry.stats().active if registry is not None else 0
+
+
+get_metrics_registry().gauge(
+    "aigame_conversation_traces_active",
+    "Conversation traces currently open.",
+    callback=_active_trace_count,
+)
 
 
 class LoggerWithTrace(Protocol):
@@ -144,9 +661,10 @@ class LoggerWithTrace(Protocol):
         profile: str,
         providers: dict[str, str],
         persist_enabled: bool,
+        trace_format: str | None = None,
     ) -> Token[str | None]:
         ...
-    def reset_conversation_id(self, token: Token[str | None]) -> None:
+    def reset_conversation_id(self, token: Token[str | None], wait: bool = True) -> None:
         ...
     def get_conversation_id(self) -> str | None:
         ...
@@ -186,6 +704,7 @@ def _install_verbose_level() -> None:
             profile: str,
             providers: dict[str, str],
             persist_enabled: bool,
+            trace_format: str | None = None,
         ) -> Token[str | None]:
             trace = ConversationTrace(
                 root_dir=Path(root_dir),
@@ -193,12 +712,16 @@ def _install_verbose_level() -> None:
                 profile=profile,
                 providers=providers,
                 persist_enabled=persist_enabled,
+                trace_format=trace_format,
             )
-            _conversation_traces[trace.conversation_id] = trace
+            get_trace_registry().add(trace)
             return _current_conversation_id.set(trace.conversation_id)
 
-        def reset_conversation_id(self: logging.Logger, token: Token[str | None]) -> None:
+        def reset_conversation_id(self: logging.Logger, token: Token[str | None], wait: bool = True) -> None:
+            conversation_id = _current_conversation_id.get()
             _current_conversation_id.reset(token)
+            if conversation_id is not None:
+                get_trace_registry().finish(conversation_id, wait=wait)
 
         def get_conversation_id(self: logging.Logger) -> str | None:
             return _current_conversation_id.get()
@@ -216,7 +739,7 @@ def _install_verbose_level() -> None:
             conversation_id = _current_conversation_id.get()
             if conversation_id is None:
                 return
-            trace = _conversation_traces.get(conversation_id)
+            trace = get_trace_registry().get(conversation_id)
             if trace is None:
                 return
             trace.record_stage_event(
@@ -232,8 +755,7 @@ def _install_verbose_level() -> None:
         def get_conversation_trace_path(self: logging.Logger, conversation_id: str | None) -> Path | None:
             if conversation_id is None:
                 return None
-            trace = _conversation_traces.get(conversation_id)
-            return None if trace is None else trace.path
+            return get_trace_registry().path_for(conversation_id)
 
         logging.Logger.verbose = verbose  # type: ignore[assignment]
         logging.Logger.trace = trace  # type: ignore[assignment]
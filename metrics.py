@@ -0,0 +1,398 @@
+import math
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Iterable
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+DEFAULT_TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: dict[str, str] | None = None) -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.extend(f'{name}="{_escape_label_value(value)}"' for name, value in extra.items())
+    return "{" + ",".join(pairs) + "}" if len(pairs) > 0 else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = Lock()
+
+    def _label_values(self, labels: dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        callback: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: Any) -> float:
+        if self.callback is not None:
+            return self.callback()
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        if self.callback is not None:
+            lines.append(f"{self.name} {_format_value(self.callback())}")
+            return lines
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._label_values(labels), []))
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key in sorted(self._counts):
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, math.inf), self._counts[key]):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        """A callback gauge has no labels and is read when metrics are rendered."""
+        return self._get_or_create(Gauge, name, help_text, labelnames, callback=callback)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def _get_or_create(self, metric_cls, name: str, help_text: str, labelnames: tuple[str, ...], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_cls(name, help_text, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_cls) or metric.labelnames != labelnames:
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+
+def process_resident_memory_bytes() -> float:
+    """Current resident set size from /proc; 0 on platforms without it."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            resident_pages = int(file.read().split()[1])
+        return float(resident_pages * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+_registry = MetricsRegistry()
+_registry.gauge(
+    "aigame_process_resident_memory_bytes",
+    "Resident memory of the server process.",
+    callback=process_resident_memory_bytes,
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def render_metrics() -> str:
+    return _registry.render()
+
+
+def message_chars(messages: Iterable[dict[str, Any]]) -> int:
+    return sum(len(str(message.get("content") or "")) for message in messages)
+
+
+def observe_stage_duration(stage_name: str, seconds: float, status: str) -> None:
+    _registry.histogram(
+        "aigame_stage_duration_seconds",
+        "Wall time of one pipeline stage.",
+        ("stage", "status"),
+    ).observe(seconds, stage=stage_name, status=status)
+
+
+def observe_turn_duration(seconds: float, status: str) -> None:
+    _registry.histogram(
+        "aigame_turn_duration_seconds",
+        "Wall time of one full pipeline turn.",
+        ("status",),
+    ).observe(seconds, status=status)
+
+
+def observe_prompt_tokens(stage_name: str, tokens: int) -> None:
+    _registry.histogram(
+        "aigame_prompt_tokens",
+        "Estimated size of one stage prompt, in tokens.",
+        ("stage",),
+        buckets=DEFAULT_TOKEN_BUCKETS,
+    ).observe(tokens, stage=stage_name)
+
+
+def count_prompt_section_cut(stage_name: str, section: str, action: str) -> None:
+    _registry.counter(
+        "aigame_prompt_sections_cut_total",
+        "Prompt sections trimmed or dropped to fit a token budget.",
+        ("stage", "section", "action"),
+    ).inc(stage=stage_name, section=section, action=action)
+
+
+def count_metadata_index_lookup(result: str) -> None:
+    _registry.counter(
+        "aigame_metadata_index_lookups_total",
+        "Metadata filters answered by the in-process index (indexed), matched by none of its ids (empty), or left to Chroma (unindexed).",
+        ("result",),
+    ).inc(result=result)
+
+
+def count_hybrid_search_documents(source: str) -> None:
+    _registry.counter(
+        "aigame_hybrid_search_documents_total",
+        "Documents returned by hybrid retrieval, by the ranking that found them (vector, lexical or both).",
+        ("source",),
+    ).inc(source=source)
+
+
+def observe_lexical_index_duration(operation: str, seconds: float) -> None:
+    _registry.histogram(
+        "aigame_lexical_index_duration_seconds",
+        "Latency of one lexical index operation.",
+        ("operation",),
+    ).observe(seconds, operation=operation)
+
+
+class track_provider_call:
+    """Times one model call and records its latency, outcome and prompt/completion size by role."""
+
+    def __init__(self, role: str, operation: str, prompt_chars: int = 0):
+        self.role = role
+        self.operation = operation
+        self.prompt_chars = prompt_chars
+        self.completion_chars = 0
+        self.prompt_tokens: int | None = None
+        self.cached_prompt_tokens: int | None = None
+        self.started_at = 0.0
+        self.first_output_at: float | None = None
+
+    def mark_first_output(self) -> None:
+        if self.first_output_at is None:
+            self.first_output_at = time.perf_counter()
+
+    def record_usage(self, result: Any) -> None:
+        """Copies backend-reported prompt token usage, including prefix-cache hits, from a chat result."""
+        prompt_tokens = getattr(result, "prompt_tokens", None)
+        cached_prompt_tokens = getattr(result, "cached_prompt_tokens", None)
+        self.prompt_tokens = prompt_tokens if isinstance(prompt_tokens, int) else None
+        self.cached_prompt_tokens = cached_prompt_tokens if isinstance(cached_prompt_tokens, int) else None
+
+    def __enter__(self) -> "track_provider_call":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        elapsed = time.perf_counter() - self.started_at
+        status = "ok" if exc_type is None else "error"
+        labels = {"role": self.role, "operation": self.operation}
+
+        _registry.histogram(
+            "aigame_provider_call_duration_seconds",
+            "Latency of one model provider call.",
+            ("role", "operation"),
+        ).observe(elapsed, **labels)
+        _registry.counter(
+            "aigame_provider_calls_total",
+            "Model provider calls by outcome.",
+            ("role", "operation", "status"),
+        ).inc(status=status, **labels)
+        _registry.histogram(
+            "aigame_provider_prompt_chars",
+            "Prompt size sent to a model provider, in characters.",
+            ("role", "operation"),
+            buckets=DEFAULT_SIZE_BUCKETS,
+        ).observe(self.prompt_chars, **labels)
+        if exc_type is None:
+            _registry.histogram(
+                "aigame_provider_completion_chars",
+                "Completion size returned by a model provider, in characters.",
+                ("role", "operation"),
+                buckets=DEFAULT_SIZE_BUCKETS,
+            ).observe(self.completion_chars, **labels)
+        if self.prompt_tokens is not None:
+            _registry.counter(
+                "aigame_provider_prompt_tokens_total",
+                "Prompt tokens reported by model providers that expose usage.",
+                ("role", "operation"),
+            ).inc(self.prompt_tokens, **labels)
+        if self.cached_prompt_tokens is not None:
+            _registry.counter(
+                "aigame_provider_cached_prompt_tokens_total",
+                "Prompt tokens served from the backend's prefix cache, where the backend reports it.",
+                ("role", "operation"),
+            ).inc(self.cached_prompt_tokens, **labels)
+        if self.first_output_at is not None:
+            _registry.histogram(
+                "aigame_provider_first_output_seconds",
+                "Time from request to the first streamed chunk.",
+                ("role", "operation"),
+            ).observe(self.first_output_at - self.started_at, **labels)
+
+
+class track_vector_store:
+    """Times one Chroma collection operation."""
+
+    def __init__(self, operation: str, items: int = 1):
+        self.operation = operation
+        self.items = items
+        self.started_at = 0.0
+
+    def __enter__(self) -> "track_vector_store":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        elapsed = time.perf_counter() - self.started_at
+        _registry.histogram(
+            "aigame_vector_store_duration_seconds",
+            "Latency of one vector store operation.",
+            ("operation",),
+        ).observe(elapsed, operation=self.operation)
+        _registry.counter(
+            "aigame_vector_store_operations_total",
+            "Vector store operations by outcome.",
+            ("operation", "status"),
+        ).inc(operation=self.operation, status="ok" if exc_type is None else "error")
+        _registry.counter(
+            "aigame_vector_store_items_total",
+            "Embeddings queried or written by vector store operations.",
+            ("operation",),
+        ).inc(self.items, operation=self.operation)
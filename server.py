@@ -1,17 +1,30 @@
-import csv
+import asyncio
 import os
 from pathlib import Path
 import argparse
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Any
 
 import json
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from starlette.websockets import WebSocketState
 import uvicorn
 from server_models import InitChatRequest
 
+from ai import get_ai_settings
+from ai.http_pool import close_http_clients
 from classes.Character import Character
-from logger import configure_logging, get_logger
+from classes.CharacterRegistry import CharacterRegistry, CharacterTemplate
+from classes.ChromaRegistry import get_chroma_registry
+from classes.EmbeddingCache import embedding_cache_stats
+from classes.StateWriter import get_state_writer, shutdown_state_writer
+from logger import configure_logging, get_logger, get_trace_registry, get_trace_writer, shutdown_trace_writer
+from metrics import render_metrics
+from workflow import TurnExecutorSaturatedError, configure_turn_executor, get_turn_executor, shutdown_turn_executor
+from workflow.policy import get_fast_path_counters
 
 APP_ROOT = Path(__file__).resolve().parent
 CHARACTER_CSV = APP_ROOT / "data" / "character_data_cop.csv"
@@ -20,33 +33,54 @@ DEFAULT_SITUATION = (
     "{{char}} initiates the contact to {{user}}"
 )
 
-app = FastAPI(title="AI Game NPC Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_ai_settings()
+    # Scanning the collection for its indexes here keeps the cost out of the first conversation.
+    if settings.chroma.metadata_index:
+        get_chroma_registry().get_metadata_index(settings.chroma)
+    if settings.hybrid_search.enabled:
+        get_chroma_registry().get_lexical_index(settings.chroma)
+    yield
+    # In-flight turns still submit state writes, so the executor drains before the state writer stops.
+    shutdown_turn_executor(wait=True)
+    shutdown_state_writer()
+    # The state writer embeds its remaining entries through the pooled clients, so they close after it.
+    close_http_clients()
+    shutdown_trace_writer()
+
+
+app = FastAPI(title="AI Game NPC Service", lifespan=lifespan)
 logger = get_logger(__name__)
 app.state.persist_enabled = False
 
 
-def load_characters(path: Path) -> list[dict[str, str]]:
-    if not path.exists():
-        return []
-
-    with path.open(mode="r", newline="", encoding="utf-8") as file:
-        reader = csv.DictReader(file, delimiter=";")
-        return [row for row in reader]
-
-
-CHARACTERS = load_characters(CHARACTER_CSV)
+# Parsed and validated once at import; connections only look templates up by name.
+CHARACTERS = CharacterRegistry.from_csv(CHARACTER_CSV)
 
-def find_character(name: str) -> dict[str, str] | None:
-    lowered = name.strip().lower()
-    for character in CHARACTERS:
-        if (character.get("name") or "").strip().lower() == lowered:
-            return character
-    return None
+def find_character(name: str) -> CharacterTemplate | None:
+    return CHARACTERS.get(name)
 
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
+@app.get("/stats")
+def stats() -> dict[str, Any]:
+    return {
+        "turn_executor": asdict(get_turn_executor().stats()),
+        "fast_path": asdict(get_fast_path_counters().stats()),
+        "trace_writer": asdict(get_trace_writer().stats()),
+        "conversation_traces": asdict(get_trace_registry().stats()),
+        "state_writer": asdict(get_state_writer().stats()),
+        "embedding_caches": [asdict(cache_stats) for cache_stats in embedding_cache_stats()],
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.websocket("/talk-to-npc")
 async def chat(websocket: WebSocket) -> None:
     await websocket.accept()
@@ -81,7 +115,16 @@ async def chat(websocket: WebSocket) -> None:
         return
 
     situation = request.situation or DEFAULT_SITUATION
-    npc = Character(character_data, situation)
+    executor = get_turn_executor()
+    try:
+        npc = await executor.admit(Character, character_data, situation)
+    except TurnExecutorSaturatedError as exc:
+        logger.error("Rejecting conversation with %s: %s", request.name, exc)
+
+        await websocket.send_json({"event": "error", "data": "Server busy, try again later"})
+        logger.info("Conversation concluded: turn queue full")
+        await websocket.close(code=1013)
+        return
     if bool(app.state.persist_enabled):
         conversation_token = logger.start_conversation_trace(
             root_dir="logs/conversations",
@@ -100,7 +143,7 @@ async def chat(websocket: WebSocket) -> None:
         logger.info("Conversation initialized with: %s", request.name)
         await websocket.send_json({"event": "start", "data": {"npc": npc.name}})
         
-        await npc.initiate_conversation(socket=websocket)
+        await npc.initiate_conversation(socket=websocket, executor=executor, stream=request.stream)
         
         await websocket.send_json({"event": "end", "data": "done"})
     except WebSocketDisconnect:
@@ -108,8 +151,11 @@ async def chat(websocket: WebSocket) -> None:
     except Exception as exc:
         await websocket.send_json({"event": "error", "data": str(exc)})
     finally:
+        # Persists the conversation's remaining state updates off the event loop; submitting can block on a full queue.
+        await asyncio.to_thread(npc.flush_state_writes)
         if conversation_token is not None:
-            logger.reset_conversation_id(conversation_token)
+            # Runs on the event loop; the trace writer closes the file once its queued events are written.
+            logger.reset_conversation_id(conversation_token, wait=False)
         logger.info("Conversation concluded")
         if websocket.client_state == WebSocketState.CONNECTED:
             await websocket.close()
@@ -127,6 +173,7 @@ def main() -> None:
     port = int(os.getenv("AIGAME_PORT", "8000"))
     configure_logging("VERBOSE" if args.verbose else None)
     app.state.persist_enabled = args.persist
+    configure_turn_executor()
     logger.info("Server startup configured: persist=%s verbose=%s", args.persist, args.verbose)
     uvicorn.run(app, host=host, port=port)
 
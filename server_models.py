@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 class InitChatRequest(BaseModel):
     name: str = Field(..., description="Character name")
     situation: str | None = None
+    stream: bool = Field(default=False, description="Send the reply as message_delta events followed by message_done")
 
 class ChatRequest(BaseModel):
     prompt: str = Field(..., description="User input for the NPC")
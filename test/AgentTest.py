@@ -15,6 +15,7 @@ from ai import (
 )
 from classes.Character import Character
 from logger import configure_logging, get_logger
+from metrics import track_provider_call
 from models import (
     PromptCategory,
     StageDeterministicCheck,
@@ -189,6 +190,8 @@ class AgentTest:
     def reset_character_state(self, character: Character) -> None:
         character.db.messages = []
         character.db.response_context_initialized = False
+        if hasattr(character, "invalidate_initial_context"):
+            character.invalidate_initial_context()
         if hasattr(character, "talk_ongoing"):
             character.talk_ongoing = True
 
@@ -693,7 +696,9 @@ class AgentTest:
             ]
 
         judge_prompt = self.build_judge_prompt(character, prompt, stage_output, execution_context, active_metrics)
-        raw_output = self.provider.generate(judge_prompt)
+        with track_provider_call("judge", "generate", prompt_chars=len(judge_prompt)) as call:
+            raw_output = self.provider.generate(judge_prompt)
+            call.completion_chars = len(raw_output)
         metric_results = self.parse_judge_output(raw_output, active_metrics)
 
         return [
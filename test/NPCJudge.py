@@ -8,6 +8,7 @@ import os
 from ai import AISettings, create_text_generation_provider, get_ai_settings
 from models import TestPrompt, PromptCategory
 from logger import configure_logging, get_logger
+from metrics import track_provider_call
 
 @dataclass
 class JudgeResult:
@@ -188,7 +189,10 @@ class NpcJudge:
         For example, with Ollama's /api/generate or /api/chat.
         This is intentionally left abstract so you can plug in what you use.
         """
-        return self.provider.generate(prompt)
+        with track_provider_call("judge", "generate", prompt_chars=len(prompt)) as call:
+            raw_output = self.provider.generate(prompt)
+            call.completion_chars = len(raw_output)
+        return raw_output
 
     def parse_judge_output(self, raw_output: str) -> Dict[str, Any]:
         """
@@ -1,6 +1,31 @@
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+from unittest.mock import MagicMock
+
+from classes.ChromaDBHelper import ChromaDBHelper
+from classes.EmbeddingCache import EmbeddingCache
+
+
+def create_stub_chroma_helper(
+    db: Any = None,
+    embed: Callable[[str], list[float]] = lambda text: [float(len(text))],
+    **attributes: Any,
+) -> ChromaDBHelper:
+    """A ChromaDBHelper built without __init__: no settings, providers or registry lookups.
+
+    `db` defaults to a MagicMock collection and `embed` maps one text to its vector for both embed and
+    embed_many. Extra keyword arguments are set as attributes, e.g. `metadata_index` or `settings`.
+    """
+    helper = ChromaDBHelper.__new__(ChromaDBHelper)
+    helper.db = db if db is not None else MagicMock()
+    helper.embedding_provider = MagicMock()
+    helper.embedding_provider.embed.side_effect = lambda text: [embed(text)]
+    helper.embedding_provider.embed_many.side_effect = lambda texts: [embed(text) for text in texts]
+    helper.embedding_cache = EmbeddingCache(model="test", max_entries=16)
+    for name, value in attributes.items():
+        setattr(helper, name, value)
+    return helper
 
 
 def create_test_embedding(db: Any, document: str) -> list[float]:
@@ -27,6 +52,7 @@ def create_test_embeddings(db: Any, entries: list[dict[str, Any]]) -> dict[str,
         metadatas=metadatas,
         embeddings=embeddings,
     )
+    db.index_upserts(ids, documents, metadatas)
     return {"ids": ids, "count": len(ids)}
 
 
@@ -34,6 +34,21 @@ class AISettingsTests(unittest.TestCase):
         self.assertEqual(settings.decision_llm.model, "custom-decision")
         self.assertEqual(settings.response_llm.model, "custom-response")
 
+    def test_connection_pool_overrides_are_applied(self):
+        with patch.dict(os.environ, {
+            "AI_PROFILE": "local",
+            "RESPONSE_POOL_SIZE": "4",
+            "RESPONSE_CONNECT_TIMEOUT_SECONDS": "2",
+            "RESPONSE_TIMEOUT_SECONDS": "90",
+        }, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+
+        self.assertEqual(settings.response_llm.pool_size, 4)
+        self.assertEqual(settings.response_llm.connect_timeout_seconds, 2)
+        self.assertEqual(settings.response_llm.timeout_seconds, 90)
+        self.assertEqual(settings.decision_llm.pool_size, 10)
+
     def test_hosted_provider_requires_base_url(self):
         with patch.dict(os.environ, {
             "AI_PROFILE": "local",
@@ -81,3 +96,36 @@ class AISettingsTests(unittest.TestCase):
         self.assertEqual(settings.response_llm.provider, "huggingface")
         self.assertEqual(settings.response_llm.hf_provider, "featherless-ai")
         self.assertEqual(settings.embedding_model.api_key_env, "HF_TOKEN")
+
+    def test_state_cache_overrides_are_applied(self):
+        with patch.dict(os.environ, {
+            "AI_PROFILE": "local",
+            "STATE_CACHE_TTL_SECONDS": "45",
+        }, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+
+        self.assertTrue(settings.state_cache.enabled)
+        self.assertEqual(settings.state_cache.ttl_seconds, 45.0)
+
+    def test_negative_state_cache_ttl_is_rejected(self):
+        with patch.dict(os.environ, {
+            "AI_PROFILE": "local",
+            "STATE_CACHE_TTL_SECONDS": "-1",
+        }, clear=True):
+            get_ai_settings.cache_clear()
+            with self.assertRaises(ValueError):
+                get_ai_settings()
+
+    def test_hybrid_search_overrides_are_applied(self):
+        with patch.dict(os.environ, {
+            "AI_PROFILE": "local",
+            "HYBRID_SEARCH_ENABLED": "true",
+            "HYBRID_SEARCH_LEXICAL_RESULTS": "8",
+        }, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+
+        self.assertTrue(settings.hybrid_search.enabled)
+        self.assertEqual(settings.hybrid_search.lexical_results, 8)
+        self.assertEqual(settings.hybrid_search.rrf_k, 60)
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ai.providers import (
+    AsyncHuggingFaceChatProvider,
+    AsyncHuggingFaceEmbeddingProvider,
+    AsyncOllamaChatProvider,
+    AsyncOllamaEmbeddingProvider,
+    AsyncOpenAICompatibleChatProvider,
+    AsyncOpenAICompatibleEmbeddingProvider,
+    AsyncOpenAICompatibleTextGenerationProvider,
+    RoleProviderConfig,
+    create_async_chat_provider,
+    create_async_embedding_provider,
+    create_async_text_generation_provider,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        self.server.requests.append({
+            "path": self.path,
+            "payload": payload,
+            "authorization": self.headers.get("Authorization"),
+        })
+
+        if self.path == "/v1/chat/completions":
+            body = {
+                "choices": [{
+                    "message": {
+                        "role": "assistant",
+                        "content": "stub reply",
+                        "tool_calls": [{
+                            "function": {
+                                "name": "recall_memory",
+                                "arguments": "{\"reasoning\": \"Need memory\"}",
+                            },
+                        }],
+                    },
+                }],
+            }
+        elif self.path == "/v1/embeddings":
+            body = {"data": [{"embedding": [0.1, 0.2, 0.3]}]}
+        elif self.path == "/api/chat":
+            body = {
+                "model": payload.get("model"),
+                "created_at": "2026-01-01T00:00:00Z",
+                "message": {"role": "assistant", "content": "ollama stub reply"},
+                "done": True,
+            }
+        elif self.path == "/api/embed":
+            body = {"model": payload.get("model"), "embeddings": [[0.4, 0.5]]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        return
+
+
+class AsyncProviderStubServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests.clear()
+
+    def create_config(self, provider: str, path: str = "") -> RoleProviderConfig:
+        return RoleProviderConfig(
+            provider=provider,
+            model="stub-model",
+            base_url=self.base_url + path,
+            api_key_env="STUB_API_KEY",
+            timeout_seconds=5,
+        )
+
+    @patch.dict("os.environ", {"STUB_API_KEY": "secret"}, clear=False)
+    def test_openai_compatible_chat_round_trip(self):
+        provider = AsyncOpenAICompatibleChatProvider(self.create_config("openai_compatible", "/v1/chat/completions"))
+
+        async def scenario():
+            try:
+                return await provider.chat(messages=[{"role": "user", "content": "hi"}])
+            finally:
+                await provider.aclose()
+
+        result = asyncio.run(scenario())
+
+        self.assertEqual(result.content, "stub reply")
+        self.assertEqual(result.tool_calls[0].function.name, "recall_memory")
+        self.assertEqual(result.tool_calls[0].function.arguments, {"reasoning": "Need memory"})
+        self.assertEqual(self.server.requests[0]["payload"]["model"], "stub-model")
+        self.assertEqual(self.server.requests[0]["authorization"], "Bearer secret")
+
+    def test_openai_compatible_chat_normalizes_tool_definitions(self):
+        provider = AsyncOpenAICompatibleChatProvider(self.create_config("openai_compatible", "/v1/chat/completions"))
+
+        def recall_memory(reasoning: str):
+            """Recall memories."""
+            return reasoning
+
+        async def scenario():
+            try:
+                await provider.chat(messages=[{"role": "user", "content": "hi"}], tools=[recall_memory])
+            finally:
+                await provider.aclose()
+
+        asyncio.run(scenario())
+
+        tools = self.server.requests[0]["payload"]["tools"]
+        self.assertEqual(tools[0]["function"]["name"], "recall_memory")
+        self.assertEqual(tools[0]["function"]["parameters"]["required"], ["reasoning"])
+
+    def test_openai_compatible_embedding_and_text_generation(self):
+        embedding_provider = AsyncOpenAICompatibleEmbeddingProvider(self.create_config("openai_compatible", "/v1/embeddings"))
+        text_provider = AsyncOpenAICompatibleTextGenerationProvider(self.create_config("openai_compatible", "/v1/chat/completions"))
+
+        async def scenario():
+            try:
+                return await asyncio.gather(
+                    embedding_provider.embed("hello"),
+                    text_provider.generate("prompt"),
+                )
+            finally:
+                await embedding_provider.aclose()
+                await text_provider.aclose()
+
+        embedding, text = asyncio.run(scenario())
+
+        self.assertEqual(embedding, [[0.1, 0.2, 0.3]])
+        self.assertEqual(text, "stub reply")
+
+    def test_concurrent_calls_overlap_on_one_event_loop(self):
+        provider = AsyncOpenAICompatibleChatProvider(self.create_config("openai_compatible", "/v1/chat/completions"))
+
+        async def scenario():
+            try:
+                return await asyncio.gather(*[
+                    provider.chat(messages=[{"role": "user", "content": f"hi {index}"}])
+                    for index in range(5)
+                ])
+            finally:
+                await provider.aclose()
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual([result.content for result in results], ["stub reply"] * 5)
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_ollama_chat_and_embedding_use_configured_host(self):
+        chat_provider = AsyncOllamaChatProvider(self.create_config("ollama"))
+        embedding_provider = AsyncOllamaEmbeddingProvider(self.create_config("ollama"))
+
+        async def scenario():
+            return await asyncio.gather(
+                chat_provider.chat(messages=[{"role": "user", "content": "hi"}]),
+                embedding_provider.embed("hello"),
+            )
+
+        chat_result, embedding = asyncio.run(scenario())
+
+        self.assertEqual(chat_result.content, "ollama stub reply")
+        self.assertEqual(chat_result.tool_calls, [])
+        self.assertEqual(embedding, [[0.4, 0.5]])
+        self.assertEqual(
+            sorted(request["path"] for request in self.server.requests),
+            ["/api/chat", "/api/embed"],
+        )
+
+
+class AsyncHuggingFaceProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.config = RoleProviderConfig(
+            provider="huggingface",
+            model="test-model",
+            hf_provider="hf-inference",
+            api_key_env="HF_TOKEN",
+            timeout_seconds=42,
+        )
+
+    @patch("ai.providers.AsyncInferenceClient")
+    def test_chat_provider_awaits_chat_completion(self, inference_client_cls):
+        client = MagicMock()
+        inference_client_cls.return_value = client
+        message = MagicMock()
+        message.content = "hello"
+        message.tool_calls = None
+        choice = MagicMock()
+        choice.message = message
+        result = MagicMock()
+        result.choices = [choice]
+        client.chat_completion = AsyncMock(return_value=result)
+
+        provider = AsyncHuggingFaceChatProvider(self.config)
+        response = asyncio.run(provider.chat(messages=[{"role": "user", "content": "hi"}]))
+
+        self.assertEqual(response.content, "hello")
+        self.assertEqual(response.tool_calls, [])
+        inference_client_cls.assert_called_with(timeout=42.0, provider="hf-inference")
+
+    @patch("ai.providers.AsyncInferenceClient")
+    def test_embedding_provider_wraps_single_embedding_row(self, inference_client_cls):
+        client = MagicMock()
+        inference_client_cls.return_value = client
+        client.feature_extraction = AsyncMock(return_value=[0.1, 0.2])
+
+        provider = AsyncHuggingFaceEmbeddingProvider(self.config)
+
+        self.assertEqual(asyncio.run(provider.embed("hello")), [[0.1, 0.2]])
+
+
+class AsyncProviderFactoryTests(unittest.TestCase):
+    @patch("ai.providers.AsyncInferenceClient")
+    def test_async_factories_return_backend_specific_providers(self, inference_client_cls):
+        ollama_config = RoleProviderConfig(provider="ollama", model="m")
+        hosted_config = RoleProviderConfig(provider="openai_compatible", model="m", base_url="http://127.0.0.1:1")
+        hf_config = RoleProviderConfig(provider="huggingface", model="m")
+
+        self.assertIsInstance(create_async_chat_provider(ollama_config), AsyncOllamaChatProvider)
+        self.assertIsInstance(create_async_embedding_provider(hosted_config), AsyncOpenAICompatibleEmbeddingProvider)
+        self.assertIsInstance(create_async_text_generation_provider(hosted_config), AsyncOpenAICompatibleTextGenerationProvider)
+        self.assertIsInstance(create_async_chat_provider(hf_config), AsyncHuggingFaceChatProvider)
+
+        with self.assertRaises(ValueError):
+            create_async_chat_provider(RoleProviderConfig(provider="unknown", model="m"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import dataclasses
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from ai.settings import BUILT_IN_PROFILES
+from classes.Character import Character
+from classes.CharacterRegistry import CharacterRegistry, CharacterTemplate
+from classes.NpcAgent import NPCAgent
+from logger import configure_logging
+from models import Faction
+
+
+def make_row(name: str, faction: str = Faction.WORLD.value) -> dict[str, str]:
+    return {
+        "name": name,
+        "faction": faction,
+        "pl_list": "Helpful trader",
+        "ali_chat": "Welcome, traveler.",
+        "knowledge": "",
+        "past": "",
+        "relations": "",
+        "sentiment": "neutral",
+    }
+
+
+class CharacterRegistryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_lookup_ignores_case_and_surrounding_whitespace(self):
+        registry = CharacterRegistry.from_rows([make_row("Mira"), make_row("Straße")])
+
+        self.assertEqual(registry.get("  mIRA ").name, "Mira")
+        self.assertEqual(registry.get("STRASSE").name, "Straße")
+        self.assertIn("mira", registry)
+        self.assertIsNone(registry.get("Unknown"))
+
+    def test_invalid_rows_are_skipped_and_first_duplicate_wins(self):
+        first = make_row("Mira")
+        duplicate = {**make_row("mira"), "pl_list": "Someone else"}
+
+        with self.assertLogs("classes.CharacterRegistry", level="WARNING") as logs:
+            registry = CharacterRegistry.from_rows([first, make_row("Broken", faction="no-such-faction"), duplicate])
+
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.get("Mira").pl_list, "Helpful trader")
+        self.assertTrue(any("Broken" in line for line in logs.output))
+
+    def test_templates_are_immutable(self):
+        template = CharacterTemplate.from_row(make_row("Mira"))
+
+        self.assertIs(template.faction, Faction.WORLD)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            template.name = "Someone else"  # type: ignore[misc]
+
+    def test_loads_semicolon_separated_csv(self):
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "characters.csv"
+            header = ";".join(make_row("Mira"))
+            lines = [header, *(";".join(make_row(f"NPC {index}").values()) for index in range(2000))]
+            path.write_text("\n".join(lines), encoding="utf-8")
+
+            registry = CharacterRegistry.from_csv(path)
+
+        self.assertEqual(len(registry), 2000)
+        self.assertEqual(registry.get("npc 1999").name, "NPC 1999")
+        self.assertEqual(len(CharacterRegistry.from_csv(Path(temp_dir) / "missing.csv")), 0)
+
+
+class CharacterFromTemplateTests(unittest.TestCase):
+    def test_template_skips_revalidation(self):
+        settings = BUILT_IN_PROFILES["local"]
+        template = CharacterTemplate.from_row(make_row("Mira"))
+
+        with patch("classes.Character.ChromaDBHelper"), patch("classes.Character.NPCAgent"), \
+                patch("classes.Character.CharacterType") as character_type, \
+                patch.object(Character, "compute_sentiment", return_value="neutral"):
+            character = Character(char_data=template, situation="At the market", settings=settings)
+
+        character_type.assert_not_called()
+        self.assertEqual(character.name, "Mira")
+        self.assertEqual(character.id, "Mira" + str(Faction.WORLD))
+
+    def test_sessions_share_model_providers(self):
+        settings = BUILT_IN_PROFILES["local"]
+
+        self.assertIs(NPCAgent(settings).provider, NPCAgent(settings).provider)
+
+
+if __name__ == "__main__":
+    unittest.main()
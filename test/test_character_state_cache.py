@@ -0,0 +1,153 @@
+import unittest
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+from ai.settings import BUILT_IN_PROFILES, StateCacheConfig
+from classes.Character import Character
+from classes.CharacterStateCache import CharacterStateCache
+from logger import configure_logging
+from models import Faction, MetadataCategory
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self, documents: dict[MetadataCategory, list[str]]):
+        self.documents = documents
+        self.calls: list[MetadataCategory] = []
+
+    def __call__(self, category: MetadataCategory) -> list[str]:
+        self.calls.append(category)
+        return list(self.documents.get(category, []))
+
+
+class CharacterStateCacheTests(unittest.TestCase):
+    def test_category_is_loaded_once(self):
+        loader = CountingLoader({MetadataCategory.GOAL: ["Reach the capital."]})
+        cache = CharacterStateCache(loader)
+
+        self.assertEqual(cache.get(MetadataCategory.GOAL), ["Reach the capital."])
+        self.assertEqual(cache.get(MetadataCategory.GOAL), ["Reach the capital."])
+
+        self.assertEqual(loader.calls, [MetadataCategory.GOAL])
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_writes_go_through_to_loaded_categories_only(self):
+        loader = CountingLoader({MetadataCategory.BELIEF: ["The player is a stranger."]})
+        cache = CharacterStateCache(loader)
+        cache.get(MetadataCategory.BELIEF)
+
+        cache.record_write(MetadataCategory.BELIEF, "The player keeps promises.")
+        cache.record_write(MetadataCategory.MEMORY, "Player: hello")
+
+        self.assertEqual(cache.get(MetadataCategory.BELIEF), ["The player is a stranger.", "The player keeps promises."])
+        self.assertEqual(cache.stats().categories, 1)
+        self.assertEqual(loader.calls, [MetadataCategory.BELIEF])
+
+    def test_returned_documents_are_copies(self):
+        cache = CharacterStateCache(CountingLoader({MetadataCategory.GOAL: ["Trade."]}))
+
+        cache.get(MetadataCategory.GOAL).append("Mutated.")
+
+        self.assertEqual(cache.get(MetadataCategory.GOAL), ["Trade."])
+
+    def test_ttl_reloads_expired_categories(self):
+        clock = FakeClock()
+        loader = CountingLoader({MetadataCategory.SENTIMENT: ["neutral"]})
+        cache = CharacterStateCache(loader, ttl_seconds=30.0, clock=clock)
+
+        cache.get(MetadataCategory.SENTIMENT)
+        clock.now = 29.0
+        cache.get(MetadataCategory.SENTIMENT)
+        loader.documents[MetadataCategory.SENTIMENT] = ["neutral", "happy: written by another process"]
+        clock.now = 30.0
+
+        self.assertEqual(cache.get(MetadataCategory.SENTIMENT)[-1], "happy: written by another process")
+        self.assertEqual(len(loader.calls), 2)
+        self.assertEqual(cache.stats().expirations, 1)
+
+    def test_invalidate_forces_reload(self):
+        loader = CountingLoader({})
+        cache = CharacterStateCache(loader)
+        cache.get(MetadataCategory.GOAL)
+        cache.get(MetadataCategory.BELIEF)
+
+        cache.invalidate(MetadataCategory.GOAL)
+        cache.get(MetadataCategory.GOAL)
+        cache.get(MetadataCategory.BELIEF)
+        cache.invalidate()
+        cache.get(MetadataCategory.BELIEF)
+
+        self.assertEqual(loader.calls, [
+            MetadataCategory.GOAL,
+            MetadataCategory.BELIEF,
+            MetadataCategory.GOAL,
+            MetadataCategory.BELIEF,
+        ])
+
+    def test_negative_ttl_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CharacterStateCache(CountingLoader({}), ttl_seconds=-1.0)
+
+
+class CharacterStateCacheWiringTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def create_character(self, settings) -> Character:
+        char_data = {
+            "name": "Mira",
+            "faction": Faction.WORLD,
+            "pl_list": "Helpful trader",
+            "ali_chat": "Welcome, traveler.",
+            "knowledge": "",
+            "past": "",
+            "relations": "",
+            "sentiment": "neutral",
+        }
+        with patch("classes.Character.ChromaDBHelper") as chroma_helper_cls, patch("classes.Character.NPCAgent"):
+            chroma_helper_cls.return_value.get_documents = MagicMock(return_value=["neutral: first meeting"])
+            return Character(char_data=char_data, situation="At the market", settings=settings)
+
+    def test_sentiment_reads_after_init_do_not_scan_chroma(self):
+        character = self.create_character(BUILT_IN_PROFILES["local"])
+        character.state_writer = MagicMock()
+        chroma_get = character.db.get_documents
+
+        character.change_sentiment("happy", "The player paid up front.")
+        sentiment = character.get_sentiment()
+
+        self.assertEqual(chroma_get.call_count, 1)
+        self.assertEqual(sentiment, "happy: The player paid up front.\nneutral: first meeting")
+        self.assertEqual(character.pending_state_writes[0][1], "happy: The player paid up front.")
+
+    def test_disabled_cache_reads_chroma_every_time(self):
+        settings = replace(BUILT_IN_PROFILES["local"], state_cache=StateCacheConfig(enabled=False))
+        character = self.create_character(settings)
+
+        character.get_sentiment()
+
+        self.assertIsNone(character.state_cache)
+        self.assertEqual(character.db.get_documents.call_count, 2)
+
+    def test_limit_keeps_the_latest_documents_with_or_without_the_cache(self):
+        disabled = replace(BUILT_IN_PROFILES["local"], state_cache=StateCacheConfig(enabled=False))
+        for settings in (BUILT_IN_PROFILES["local"], disabled):
+            character = self.create_character(settings)
+            character.db.get_documents.return_value = ["neutral", "wary", "happy"]
+            if character.state_cache is not None:
+                character.state_cache.invalidate()
+
+            self.assertEqual(character.get_character_documents(MetadataCategory.SENTIMENT, limit=2), ["wary", "happy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
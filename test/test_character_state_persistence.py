@@ -14,7 +14,7 @@ class FakeDB:
         self.messages = []
         self.embeddings: list[dict] = []
         self.documents_by_category: dict[str, list[str]] = {}
-        self.db = SimpleNamespace(get=self.get_documents)
+        self.db = SimpleNamespace(get=self.get_collection_documents)
 
     def add_embedding(self, id: str, text: str, metadata):
         if hasattr(metadata, "model_dump"):
@@ -29,7 +29,10 @@ class FakeDB:
         category = str(payload.get("category", ""))
         self.documents_by_category.setdefault(category, []).append(text)
 
-    def get_documents(self, where, include, limit=None):
+    def get_documents(self, where, limit=None):
+        return self.get_collection_documents(where, include=["documents"], limit=limit)["documents"]
+
+    def get_collection_documents(self, where, include, limit=None):
         category = ""
         for item in where.get("$and", []):
             if "category" in item:
@@ -55,6 +58,8 @@ class CharacterStatePersistenceTests(unittest.TestCase):
         character.faction = Faction.WORLD
         character.sentiment = "neutral"
         character.db = FakeDB()
+        character.state_writer = None
+        character.state_cache = None
         return character
 
     def test_change_sentiment_persists_sentiment_entry(self):
@@ -110,6 +115,29 @@ class CharacterStatePersistenceTests(unittest.TestCase):
         self.assertIn("Mira: I can offer you rope and herbs.", character.db.embeddings[0]["text"])
         self.assertTrue(character.db.embeddings[0]["metadata"]["supplies"])
 
+    def test_state_write_invalidates_cached_initial_context_section(self):
+        character = self.create_character()
+        character.pipeline = SimpleNamespace(initial_context_stage=InitialContextStage(character))
+        stage = character.pipeline.initial_context_stage
+        stage.cached_sections = {
+            "relationship_summary": "Relationship to player:\nwary",
+            "active_goals": ["Protect the market."],
+            "belief_state": [],
+        }
+
+        character.update_beliefs(StateUpdate(changed=True, value="The player is honest."), tags=["belief"])
+
+        self.assertNotIn("belief_state", stage.cached_sections)
+        self.assertIn("relationship_summary", stage.cached_sections)
+        self.assertIn("active_goals", stage.cached_sections)
+
+    def test_message_loop_context_is_seeded_once_per_conversation(self):
+        character = self.create_character()
+        character.db.response_context_initialized = True
+        character.pipeline = SimpleNamespace(initial_context_stage=SimpleNamespace(run=self.fail))
+
+        character.initialize_message_loop_context()
+
     def test_initial_context_stage_reads_persisted_goals_and_beliefs(self):
         character = self.create_character()
         character.situation = "At the market"
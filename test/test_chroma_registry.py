@@ -0,0 +1,86 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ai.settings import BUILT_IN_PROFILES, LocalChromaConfig
+from classes.ChromaDBHelper import ChromaDBHelper
+from classes.ChromaRegistry import ChromaRegistry, get_chroma_registry
+
+
+class ChromaRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.config = LocalChromaConfig(path="./faction_db", collection="factions", distance_space="cosine")
+
+    @patch("classes.ChromaRegistry.chromadb.PersistentClient")
+    def test_same_key_returns_one_shared_collection(self, persistent_client_cls):
+        registry = ChromaRegistry()
+
+        first = registry.get_collection(self.config)
+        second = registry.get_collection(LocalChromaConfig(path="faction_db", collection="factions", distance_space="cosine"))
+
+        self.assertIs(first, second)
+        persistent_client_cls.assert_called_once()
+        persistent_client_cls.return_value.get_or_create_collection.assert_called_once_with(
+            "factions",
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    @patch("classes.ChromaRegistry.chromadb.PersistentClient")
+    def test_collections_on_one_path_share_a_client(self, persistent_client_cls):
+        client = MagicMock()
+        client.get_or_create_collection.side_effect = lambda name, metadata: MagicMock(name=name)
+        persistent_client_cls.return_value = client
+        registry = ChromaRegistry()
+
+        factions = registry.get_collection(self.config)
+        l2_factions = registry.get_collection(LocalChromaConfig(path="./faction_db", collection="factions", distance_space="l2"))
+        lore = registry.get_collection(LocalChromaConfig(path="./faction_db", collection="lore", distance_space="cosine"))
+
+        self.assertIsNot(factions, l2_factions)
+        self.assertIsNot(factions, lore)
+        persistent_client_cls.assert_called_once()
+        self.assertEqual(client.get_or_create_collection.call_count, 3)
+
+    @patch("classes.ChromaRegistry.chromadb.PersistentClient")
+    def test_concurrent_lookups_open_the_store_once(self, persistent_client_cls):
+        registry = ChromaRegistry()
+        results = []
+
+        def lookup():
+            results.append(registry.get_collection(self.config))
+
+        threads = [threading.Thread(target=lookup) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(result) for result in results}), 1)
+        persistent_client_cls.assert_called_once()
+        persistent_client_cls.return_value.get_or_create_collection.assert_called_once()
+
+
+class ChromaDBHelperSharingTests(unittest.TestCase):
+    def tearDown(self):
+        get_chroma_registry().clear()
+
+    @patch("classes.ChromaDBHelper.get_chat_provider")
+    @patch("classes.ChromaDBHelper.get_embedding_provider")
+    @patch("classes.ChromaRegistry.chromadb.PersistentClient")
+    def test_helpers_share_store_but_keep_separate_message_state(self, persistent_client_cls, embedding_factory, chat_factory):
+        get_chroma_registry().clear()
+        settings = BUILT_IN_PROFILES["local"]
+
+        first = ChromaDBHelper(settings)
+        second = ChromaDBHelper(settings)
+        first.seed_response_context(system_prompt="system", seed_context_prompt="seed")
+
+        self.assertIs(first.db, second.db)
+        persistent_client_cls.assert_called_once()
+        self.assertEqual(len(first.messages), 2)
+        self.assertEqual(second.messages, [])
+        self.assertFalse(second.response_context_initialized)
+
+
+if __name__ == "__main__":
+    unittest.main()
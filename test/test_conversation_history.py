@@ -0,0 +1,115 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ai.settings import ConversationHistoryConfig, get_ai_settings
+from ai.tokens import estimate_message_tokens, estimate_tokens
+from classes.ChromaDBHelper import ChromaDBHelper
+from classes.ConversationHistory import SUMMARY_HEADING, ConversationHistory
+from logger import configure_logging
+
+
+class ConversationHistoryTests(unittest.TestCase):
+    def test_keeps_recent_turns_verbatim_and_folds_older_ones(self):
+        history = ConversationHistory(ConversationHistoryConfig(max_recent_turns=2, max_history_tokens=10_000))
+        history.seed([{"role": "system", "content": "You are Lyra."}])
+
+        for index in range(4):
+            history.record_turn(f"question {index}", f"answer {index}")
+
+        messages = history.messages
+        self.assertEqual(messages[0], {"role": "system", "content": "You are Lyra."})
+        self.assertEqual(messages[1]["role"], "system")
+        self.assertTrue(messages[1]["content"].startswith(SUMMARY_HEADING))
+        self.assertIn("Player: question 0 | You: answer 0", messages[1]["content"])
+        self.assertEqual([message["content"] for message in messages[2:]], ["question 2", "answer 2", "question 3", "answer 3"])
+
+    def test_token_budget_folds_turns_before_the_turn_limit(self):
+        config = ConversationHistoryConfig(max_recent_turns=10, max_history_tokens=120, summary_line_chars=40)
+        history = ConversationHistory(config)
+
+        for index in range(6):
+            history.record_turn(f"{index} " + "long question " * 10, f"{index} " + "long answer " * 10)
+
+        self.assertLessEqual(history.history_tokens(), config.max_history_tokens)
+        self.assertLess(len(history.turns), 6)
+        self.assertTrue(history.turns[-1].user.startswith("5 "))
+
+    def test_summary_keeps_only_newest_lines(self):
+        history = ConversationHistory(ConversationHistoryConfig(max_recent_turns=0, summary_max_chars=60))
+
+        for index in range(5):
+            history.record_turn(f"q{index}", f"a{index}")
+
+        self.assertLessEqual(len("\n".join(history.summary_lines)), 60)
+        self.assertIn("q4", history.summary_lines[-1])
+        self.assertNotIn("q0", history.render_summary())
+
+    def test_from_messages_separates_seed_from_turns(self):
+        history = ConversationHistory.from_messages([
+            {"role": "system", "content": "You are Lyra."},
+            {"role": "user", "content": "Conversation-start context."},
+            {"role": "user", "content": "Greet the player."},
+            {"role": "assistant", "content": "Well met."},
+        ])
+
+        self.assertEqual(len(history.seed_messages), 2)
+        self.assertEqual(len(history.turns), 1)
+        self.assertEqual(history.turns[0].assistant, "Well met.")
+
+    def test_token_estimates(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+        self.assertEqual(estimate_message_tokens([{"role": "user", "content": "abcd"}]), 5)
+
+    def test_settings_read_history_overrides(self):
+        with patch.dict(os.environ, {"AI_PROFILE": "local", "HISTORY_MAX_RECENT_TURNS": "3", "HISTORY_MAX_TOKENS": "900"}, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+        get_ai_settings.cache_clear()
+
+        self.assertEqual(settings.history.max_recent_turns, 3)
+        self.assertEqual(settings.history.max_history_tokens, 900)
+
+
+class ChromaDBHelperHistoryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_generate_text_remembers_player_text_instead_of_stage_prompt(self):
+        helper = ChromaDBHelper.__new__(ChromaDBHelper)
+        helper.messages = [{"role": "system", "content": "You are Lyra."}]
+        helper.response_provider = MagicMock()
+        helper.response_provider.chat.return_value = MagicMock(content="Salt, mostly.", tool_calls=[])
+        stage_prompt = "Respond to the current turn...\n\nPlayer input:\nWhat do you trade?\n\n" + "context " * 200
+
+        reply = helper.generate_text(stage_prompt, history_text="What do you trade?")
+
+        sent = helper.response_provider.chat.call_args.kwargs["messages"]
+        self.assertEqual(reply, "Salt, mostly.")
+        self.assertEqual(sent[-1], {"role": "user", "content": stage_prompt})
+        self.assertEqual(helper.messages[-2:], [
+            {"role": "user", "content": "What do you trade?"},
+            {"role": "assistant", "content": "Salt, mostly."},
+        ])
+
+    def test_request_size_stays_bounded_over_a_long_conversation(self):
+        helper = ChromaDBHelper.__new__(ChromaDBHelper)
+        helper.history = ConversationHistory(ConversationHistoryConfig(max_recent_turns=4, max_history_tokens=400))
+        helper.response_provider = MagicMock()
+        helper.response_provider.chat.return_value = MagicMock(content="A fair question. " * 5, tool_calls=[])
+
+        stage_prompt = "stage prompt " * 100
+        sizes = []
+        for index in range(50):
+            helper.generate_text(stage_prompt, history_text=f"player line {index}")
+            sizes.append(estimate_message_tokens(helper.response_provider.chat.call_args.kwargs["messages"]))
+
+        prompt_tokens = estimate_message_tokens([{"role": "user", "content": stage_prompt}])
+        self.assertLessEqual(max(sizes) - prompt_tokens, 400)
+        self.assertIn("player line 49", helper.messages[-2]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
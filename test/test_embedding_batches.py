@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ai.providers import (
+    HuggingFaceEmbeddingProvider,
+    OllamaEmbeddingProvider,
+    OpenAICompatibleEmbeddingProvider,
+    RoleProviderConfig,
+)
+from models import Faction, Metadata, MetadataCategory, MetadataType
+from test.stage_test_utils import create_stub_chroma_helper
+
+
+class EmbedManyProviderTests(unittest.TestCase):
+    @patch("ai.providers.ollama.embed")
+    def test_ollama_sends_one_batched_request(self, ollama_embed):
+        ollama_embed.return_value = {"embeddings": [[0.1], [0.2]]}
+        provider = OllamaEmbeddingProvider(RoleProviderConfig(provider="ollama", model="mxbai-embed-large"))
+
+        self.assertEqual(provider.embed_many(["first", "second"]), [[0.1], [0.2]])
+        ollama_embed.assert_called_once_with(model="mxbai-embed-large", input=["first", "second"])
+
+    @patch("ai.providers._post_json")
+    def test_openai_compatible_sends_input_list_and_orders_by_index(self, post_json):
+        post_json.return_value = {
+            "data": [
+                {"index": 1, "embedding": [0.2]},
+                {"index": 0, "embedding": [0.1]},
+            ]
+        }
+        config = RoleProviderConfig(provider="openai_compatible", model="embed", base_url="http://stub/v1/embeddings")
+        provider = OpenAICompatibleEmbeddingProvider(config)
+
+        self.assertEqual(provider.embed_many(["first", "second"]), [[0.1], [0.2]])
+        post_json.assert_called_once_with(
+            url="http://stub/v1/embeddings",
+            payload={"model": "embed", "input": ["first", "second"]},
+            config=config,
+        )
+
+    @patch("ai.providers.InferenceClient")
+    def test_huggingface_uses_one_feature_extraction_call(self, inference_client_cls):
+        client = MagicMock()
+        inference_client_cls.return_value = client
+        client.feature_extraction.return_value = [[0.1, 0.2], [0.3, 0.4]]
+        provider = HuggingFaceEmbeddingProvider(RoleProviderConfig(provider="huggingface", model="embed"))
+
+        self.assertEqual(provider.embed_many(["first", "second"]), [[0.1, 0.2], [0.3, 0.4]])
+        client.feature_extraction.assert_called_once_with(text=["first", "second"], model="embed")
+
+    @patch("ai.providers.InferenceClient")
+    def test_huggingface_falls_back_to_single_calls_for_unexpected_shape(self, inference_client_cls):
+        client = MagicMock()
+        inference_client_cls.return_value = client
+        client.feature_extraction.side_effect = [[0.5, 0.6], [0.1, 0.2], [0.3, 0.4]]
+        provider = HuggingFaceEmbeddingProvider(RoleProviderConfig(provider="huggingface", model="embed"))
+
+        self.assertEqual(provider.embed_many(["first", "second"]), [[0.1, 0.2], [0.3, 0.4]])
+        self.assertEqual(client.feature_extraction.call_count, 3)
+
+
+class AddEmbeddingsTests(unittest.TestCase):
+    def test_upserts_in_batches_with_one_embedding_request_each(self):
+        helper = create_stub_chroma_helper()
+        metadata = Metadata(faction=Faction.RACCOON, type=MetadataType.CHARACTER, category=MetadataCategory.PAST, name="Lyra")
+        entries = [(f"id-{index}", "x" * (index + 1), metadata) for index in range(5)]
+
+        helper.add_embeddings(entries, batch_size=2)
+
+        self.assertEqual(helper.embedding_provider.embed_many.call_count, 3)
+        self.assertEqual(helper.db.upsert.call_count, 3)
+        first_call = helper.db.upsert.call_args_list[0].kwargs
+        self.assertEqual(first_call["ids"], ["id-0", "id-1"])
+        self.assertEqual(first_call["embeddings"], [[1.0], [2.0]])
+        self.assertEqual(first_call["metadatas"][0]["name"], "Lyra")
+
+    def test_cached_and_duplicate_texts_are_not_embedded_again(self):
+        helper = create_stub_chroma_helper()
+        helper.embedding_cache.put("known", [9.0])
+
+        helper.add_embeddings([("a", "known", None), ("b", "new", None), ("c", "new", None)])
+
+        helper.embedding_provider.embed_many.assert_called_once_with(["new"])
+        upsert_kwargs = helper.db.upsert.call_args.kwargs
+        self.assertEqual(upsert_kwargs["embeddings"], [[9.0], [3.0], [3.0]])
+        self.assertNotIn("metadatas", upsert_kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
+
+from ai.settings import BUILT_IN_PROFILES, EmbeddingCacheConfig
+from classes.ChromaDBHelper import ChromaDBHelper
+from classes.ChromaRegistry import get_chroma_registry
+from classes.EmbeddingCache import EmbeddingCache, embedding_cache_stats, get_embedding_cache
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_lru_evicts_least_recently_used_entry(self):
+        cache = EmbeddingCache(model="ollama:test", max_entries=2)
+        cache.put("first", [1.0])
+        cache.put("second", [2.0])
+        cache.get("first")
+        cache.put("third", [3.0])
+
+        self.assertEqual(cache.get("first"), [1.0])
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), [3.0])
+
+        stats = cache.stats()
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.evictions, 1)
+        self.assertEqual(stats.hits, 3)
+        self.assertEqual(stats.misses, 1)
+
+    def test_zero_size_disables_memory_tier(self):
+        cache = EmbeddingCache(model="ollama:test", max_entries=0)
+        cache.put("text", [1.0])
+
+        self.assertIsNone(cache.get("text"))
+        self.assertEqual(cache.stats().entries, 0)
+
+    def test_keys_are_separated_by_model(self):
+        first = EmbeddingCache(model="ollama:a")
+        second = EmbeddingCache(model="ollama:b")
+
+        self.assertNotEqual(first.key("same text"), second.key("same text"))
+
+    def test_disk_tier_survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = EmbeddingCache(model="ollama:mxbai-embed-large", max_entries=4, disk_path=directory)
+            writer.put("Describe Lyra's relationships.", [0.25, -0.5, 1.0])
+            writer.close()
+
+            reader = EmbeddingCache(model="ollama:mxbai-embed-large", max_entries=4, disk_path=directory)
+            other_model = EmbeddingCache(model="ollama:other", max_entries=4, disk_path=directory)
+
+            self.assertEqual(reader.get("Describe Lyra's relationships."), [0.25, -0.5, 1.0])
+            self.assertEqual(reader.stats().disk_hits, 1)
+            self.assertEqual(reader.get("Describe Lyra's relationships."), [0.25, -0.5, 1.0])
+            self.assertEqual(reader.stats().hits, 1)
+            self.assertIsNone(other_model.get("Describe Lyra's relationships."))
+            reader.close()
+            other_model.close()
+
+    def test_disk_tier_skips_truncated_index_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = EmbeddingCache(model="ollama:test", disk_path=directory)
+            writer.put("kept", [1.0, 2.0])
+            writer.close()
+            index_path = writer._disk.index_path
+            with index_path.open("a", encoding="ascii") as index_file:
+                index_file.write("deadbeef\t8\t")
+
+            reader = EmbeddingCache(model="ollama:test", disk_path=directory)
+
+            self.assertEqual(reader.get("kept"), [1.0, 2.0])
+            self.assertEqual(reader.stats().disk_entries, 1)
+            reader.close()
+
+
+    def test_shared_caches_report_their_stats(self):
+        embedding_model = replace(BUILT_IN_PROFILES["local"].embedding_model, model="stats-test-model")
+        cache = get_embedding_cache(embedding_model, EmbeddingCacheConfig(max_entries=4, path=""))
+        cache.put("Rack", [1.0])
+        cache.get("Rack")
+        cache.get("Salt road")
+
+        stats = next(stats for stats in embedding_cache_stats() if stats.model.endswith(":stats-test-model"))
+
+        self.assertEqual((stats.entries, stats.max_entries, stats.hits, stats.misses), (1, 4, 1, 1))
+
+
+class ChromaDBHelperEmbeddingCacheTests(unittest.TestCase):
+    def tearDown(self):
+        get_chroma_registry().clear()
+
+    @patch("classes.ChromaDBHelper.get_chat_provider")
+    @patch("classes.ChromaDBHelper.get_embedding_provider")
+    @patch("classes.ChromaRegistry.chromadb.PersistentClient")
+    def test_repeated_text_is_embedded_once(self, persistent_client_cls, embedding_factory, chat_factory):
+        embedding_provider = MagicMock()
+        embedding_provider.embed.return_value = [[0.1, 0.2]]
+        embedding_factory.return_value = embedding_provider
+        settings = replace(
+            BUILT_IN_PROFILES["local"],
+            embedding_cache=EmbeddingCacheConfig(max_entries=8, path=""),
+        )
+        helper = ChromaDBHelper(settings)
+        helper.embedding_cache = EmbeddingCache(model="test", max_entries=8)
+
+        first = helper.get_embedding("What do I know about the Iron Wolves?")
+        second = helper.get_embedding("What do I know about the Iron Wolves?")
+
+        self.assertEqual(first, [[0.1, 0.2]])
+        self.assertEqual(second, [[0.1, 0.2]])
+        embedding_provider.embed.assert_called_once_with("What do I know about the Iron Wolves?")
+        self.assertEqual(helper.embedding_cache.stats().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
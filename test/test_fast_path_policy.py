@@ -0,0 +1,86 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from ai.settings import FastPathConfig, get_ai_settings
+from test.test_turn_pipeline import FakeCharacter, FakeFunction, FakeToolCall
+from workflow import TurnInput, TurnPipeline
+from workflow.models import PerceptionResult, RetrievedContext
+from workflow.policy import FastPathCounters, FastPathPolicy
+
+
+ENABLED = FastPathConfig(enabled=True)
+
+
+class FastPathPolicyTests(unittest.TestCase):
+    def test_disabled_policy_always_runs_both_calls(self):
+        counters = FastPathCounters()
+        policy = FastPathPolicy(FastPathConfig(enabled=False), counters)
+        perception = PerceptionResult(raw_prompt="hi", confidence=1.0)
+
+        self.assertTrue(policy.should_reinterpret(perception, RetrievedContext(combined_context="no information")))
+        self.assertTrue(policy.should_summarize(perception, "short"))
+        self.assertEqual(counters.stats().reinterpret_run, 1)
+        self.assertEqual(counters.stats().summarize_run, 1)
+
+    def test_confident_turn_with_small_context_skips_reinterpretation(self):
+        counters = FastPathCounters()
+        policy = FastPathPolicy(ENABLED, counters)
+        context = RetrievedContext(combined_context="The ants trade salt.")
+
+        self.assertFalse(policy.should_reinterpret(PerceptionResult(raw_prompt="hi", confidence=0.9), context))
+        self.assertTrue(policy.should_reinterpret(PerceptionResult(raw_prompt="hi", confidence=0.4), context))
+        self.assertTrue(policy.should_reinterpret(
+            PerceptionResult(raw_prompt="hi", confidence=0.9, is_ambiguous=True),
+            context,
+        ))
+        self.assertEqual(counters.stats().reinterpret_skipped, 1)
+        self.assertEqual(counters.stats().reinterpret_run, 2)
+
+    def test_summary_is_skipped_only_for_short_non_sensitive_context(self):
+        policy = FastPathPolicy(FastPathConfig(enabled=True, summary_max_context_chars=50, summary_max_snippets=2), FastPathCounters())
+        perception = PerceptionResult(raw_prompt="hi")
+
+        self.assertFalse(policy.should_summarize(perception, "snippet one\nsnippet two"))
+        self.assertTrue(policy.should_summarize(perception, "a\nb\nc"))
+        self.assertTrue(policy.should_summarize(perception, "x" * 51))
+        self.assertTrue(policy.should_summarize(PerceptionResult(raw_prompt="hi", topic_sensitivity="secret"), "short"))
+
+    def test_settings_read_fast_path_overrides(self):
+        with patch.dict(os.environ, {
+            "AI_PROFILE": "local",
+            "FAST_PATH_ENABLED": "true",
+            "FAST_PATH_REINTERPRET_MIN_CONFIDENCE": "0.6",
+            "FAST_PATH_SUMMARY_MAX_SNIPPETS": "5",
+        }, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+        get_ai_settings.cache_clear()
+
+        self.assertTrue(settings.fast_path.enabled)
+        self.assertEqual(settings.fast_path.reinterpret_min_confidence, 0.6)
+        self.assertEqual(settings.fast_path.summary_max_snippets, 5)
+
+
+class FastPathPipelineTests(unittest.TestCase):
+    def test_enabled_fast_path_drops_both_optional_calls(self):
+        character = FakeCharacter(
+            gap_content='{"tool_names": ["recall_memory"]}',
+            gap_tool_calls=[FakeToolCall(FakeFunction("recall_memory", {"reasoning": "Need memory context"}))],
+        )
+        pipeline = TurnPipeline(character)
+        policy = FastPathPolicy(ENABLED, FastPathCounters())
+        pipeline.fast_path_policy = policy
+        pipeline.retrieval_stage.fast_path_policy = policy
+
+        result = pipeline.run(TurnInput(prompt="Do you remember me?"))
+
+        # Perception, gap analysis, appraisal and strategy only; reinterpretation and the summary are skipped.
+        self.assertEqual(len(character.agent.prompts), 4)
+        self.assertEqual(result.retrieved_context.combined_context, "retrieved lore")
+        self.assertEqual(policy.counters.stats().reinterpret_skipped, 1)
+        self.assertEqual(policy.counters.stats().summarize_skipped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ai.http_pool import close_http_clients, get_http_client
+from ai.providers import OpenAICompatibleChatProvider, OpenAICompatibleEmbeddingProvider, RoleProviderConfig
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        self.rfile.read(length)
+        self.server.client_ports.append(self.client_address[1])
+
+        if self.path.endswith("/embeddings"):
+            body = {"data": [{"embedding": [0.1, 0.2]}]}
+        else:
+            body = {"choices": [{"message": {"role": "assistant", "content": "pooled reply"}}]}
+
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        return
+
+
+class PooledHttpClientTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        cls.server.client_ports = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        close_http_clients()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        close_http_clients()
+        self.server.client_ports.clear()
+
+    def create_config(self, path: str, **overrides) -> RoleProviderConfig:
+        return RoleProviderConfig(
+            provider="openai_compatible",
+            model="stub-model",
+            base_url=self.base_url + path,
+            **overrides,
+        )
+
+    def test_sequential_calls_across_providers_reuse_one_connection(self):
+        first_character_provider = OpenAICompatibleChatProvider(self.create_config("/v1/chat/completions"))
+        second_character_provider = OpenAICompatibleChatProvider(self.create_config("/v1/chat/completions"))
+        embedding_provider = OpenAICompatibleEmbeddingProvider(self.create_config("/v1/embeddings"))
+
+        for _ in range(3):
+            self.assertEqual(first_character_provider.chat(messages=[{"role": "user", "content": "hi"}]).content, "pooled reply")
+            self.assertEqual(second_character_provider.chat(messages=[{"role": "user", "content": "hi"}]).content, "pooled reply")
+            self.assertEqual(embedding_provider.embed("hello"), [[0.1, 0.2]])
+
+        self.assertEqual(len(self.server.client_ports), 9)
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+
+    def test_client_is_shared_per_origin_and_uses_role_timeouts(self):
+        chat_config = self.create_config("/v1/chat/completions", timeout_seconds=30, connect_timeout_seconds=3, pool_size=4)
+        embedding_config = self.create_config("/v1/embeddings", timeout_seconds=30, connect_timeout_seconds=3, pool_size=4)
+
+        client = get_http_client(chat_config)
+
+        self.assertIs(client, get_http_client(embedding_config))
+        self.assertEqual(client.timeout.read, 30.0)
+        self.assertEqual(client.timeout.connect, 3.0)
+
+    def test_different_pool_settings_get_separate_clients(self):
+        small_pool = self.create_config("/v1/chat/completions", pool_size=1)
+        large_pool = self.create_config("/v1/chat/completions", pool_size=8)
+
+        self.assertIsNot(get_http_client(small_pool), get_http_client(large_pool))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -55,6 +56,22 @@ class HuggingFaceProviderTests(unittest.TestCase):
         )
         client.chat_completion.assert_not_called()
 
+    @patch("ai.providers.InferenceClient")
+    def test_featherless_invalid_json_is_logged_without_patching_huggingface_hub(self, inference_client_cls):
+        import huggingface_hub.inference._client as hf_client_module
+
+        client = MagicMock()
+        inference_client_cls.return_value = client
+        client.text_generation.side_effect = lambda **_: hf_client_module._bytes_to_dict(b"<html>busy</html>")
+        original_bytes_to_dict = hf_client_module._bytes_to_dict
+
+        provider = HuggingFaceChatProvider(self.config)
+        with self.assertLogs("ai.providers", level="ERROR") as logs, self.assertRaises(json.JSONDecodeError):
+            provider.chat(messages=[{"role": "user", "content": "hi"}])
+
+        self.assertIn("<html>busy</html>", logs.output[0])
+        self.assertIs(hf_client_module._bytes_to_dict, original_bytes_to_dict)
+
     @patch("ai.providers.InferenceClient")
     def test_chat_provider_normalizes_inference_client_output(self, inference_client_cls):
         client = MagicMock()
@@ -0,0 +1,130 @@
+import unittest
+from dataclasses import replace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import chromadb
+
+from ai.settings import BUILT_IN_PROFILES, HybridSearchConfig
+from classes.LexicalIndex import LexicalIndex, matches_filter, reciprocal_rank_fusion, tokenize
+from classes.MetadataIndex import MetadataIndex
+from test.stage_test_utils import create_stub_chroma_helper
+
+
+def lore(faction: str) -> dict:
+    return {"faction": faction, "type": "faction", "category": "lore"}
+
+
+class LexicalIndexTests(unittest.TestCase):
+    def create_index(self) -> LexicalIndex:
+        index = LexicalIndex()
+        index.add(
+            ["rack", "guild", "weather"],
+            [
+                "The village of Rack sits below the northern pass.",
+                "The Merchant Guild controls trade in Rack and beyond.",
+                "Rain falls often in the valley during autumn.",
+            ],
+            [lore("world"), lore("merchants"), lore("world")],
+        )
+        return index
+
+    def test_tokenize_drops_stopwords_and_case(self):
+        self.assertEqual(tokenize("What is Mira's view of the Guild?"), ["mira", "view", "guild"])
+
+    def test_rare_terms_rank_their_documents_first(self):
+        hits = self.create_index().search("Who runs the Merchant Guild?", limit=5)
+
+        self.assertEqual([document_id for document_id, _ in hits], ["guild"])
+
+    def test_search_respects_filters_and_candidate_ids(self):
+        index = self.create_index()
+
+        filtered = index.search("Rack", limit=5, where={"$and": [{"faction": "world"}, {"category": "lore"}]})
+        restricted = index.search("Rack", limit=5, candidate_ids=["guild"])
+        unsupported = index.search("Rack", limit=5, where={"faction": {"$gt": "a"}})
+
+        self.assertEqual([document_id for document_id, _ in filtered], ["rack"])
+        self.assertEqual([document_id for document_id, _ in restricted], ["guild"])
+        self.assertEqual(unsupported, [])
+
+    def test_upserts_replace_earlier_postings(self):
+        index = self.create_index()
+
+        index.add(["rack"], ["A quiet hamlet."], [lore("world")])
+
+        self.assertEqual([document_id for document_id, _ in index.search("Rack", limit=5)], ["guild"])
+        self.assertEqual(index.search("hamlet", limit=5), [("rack", "A quiet hamlet.")])
+        self.assertEqual(len(index), 3)
+
+    def test_build_pages_through_the_collection(self):
+        collection = MagicMock()
+        collection.get.side_effect = [
+            {"ids": ["a", "b"], "documents": ["Rack", "Guild"], "metadatas": [None, None]},
+            {"ids": [], "documents": [], "metadatas": []},
+        ]
+
+        index = LexicalIndex.build(collection, page_size=2)
+
+        self.assertEqual(len(index), 2)
+        self.assertEqual(collection.get.call_count, 2)
+
+    def test_matches_filter_supports_the_app_filters(self):
+        metadata = {"name": "Mira", "type": "character", "category": "goal"}
+
+        self.assertTrue(matches_filter(metadata, {"$or": [{"category": "belief"}, {"$and": [{"name": "Mira"}, {"category": {"$in": ["goal"]}}]}]}))
+        self.assertFalse(matches_filter(metadata, {"name": {"$ne": "Mira"}}))
+        self.assertIsNone(matches_filter(metadata, {"$not": []}))
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+
+        self.assertEqual(fused[0], "c")
+        self.assertEqual(set(fused), {"a", "b", "c", "d"})
+
+
+class ChromaDBHelperHybridSearchTests(unittest.TestCase):
+    def setUp(self):
+        collection = chromadb.EphemeralClient().get_or_create_collection(
+            f"hybrid-test-{uuid4().hex}",
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=None,
+        )
+        self.helper = create_stub_chroma_helper(
+            collection,
+            # Queries and the rain document share one vector; the other documents are far from every query.
+            embed=lambda text: [0.0, 1.0] if text.startswith(("The", "Bandits")) else [1.0, 0.0],
+            settings=replace(BUILT_IN_PROFILES["local"], hybrid_search=HybridSearchConfig(enabled=True)),
+            metadata_index=MetadataIndex.build(collection),
+            lexical_index=LexicalIndex.build(collection),
+        )
+        self.helper.add_embeddings([
+            ("weather", "Rain falls often in the valley during autumn.", lore("world")),
+            ("guild", "The Merchant Guild controls trade in Rack.", lore("world")),
+            ("bandits", "Bandits raid the Merchant Guild caravans.", lore("bandits")),
+        ])
+
+    def test_lexical_hits_are_fused_with_vector_hits(self):
+        docs = self.helper.query_docs("What is the Merchant Guild?", filter={"$and": [{"faction": "world"}, {"category": "lore"}]})
+
+        self.assertEqual(sorted(docs[0]), [
+            "Rain falls often in the valley during autumn.",
+            "The Merchant Guild controls trade in Rack.",
+        ])
+
+    def test_batched_queries_are_fused_per_prompt(self):
+        results = self.helper.query_docs_many(["Tell me about the Merchant Guild.", "Any bandits?"])
+
+        self.assertIn("The Merchant Guild controls trade in Rack.", results[0][0])
+        self.assertIn("Bandits raid the Merchant Guild caravans.", results[1][0])
+
+    def test_without_lexical_index_only_vector_hits_are_returned(self):
+        self.helper.lexical_index = None
+
+        docs = self.helper.query_docs("What is the Merchant Guild?", filter={"$and": [{"faction": "world"}, {"category": "lore"}]})
+
+        self.assertEqual(docs, [["Rain falls often in the valley during autumn."]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import chromadb
+
+from classes.MetadataIndex import MetadataIndex
+from test.stage_test_utils import create_stub_chroma_helper
+
+
+def character_filter(name: str, category: str) -> dict:
+    return {"$and": [{"name": name}, {"type": "character"}, {"category": category}]}
+
+
+def character_metadata(name: str, category: str) -> dict:
+    return {"name": name, "type": "character", "category": category, "faction": "world"}
+
+
+class MetadataIndexTests(unittest.TestCase):
+    def test_equality_filters_resolve_to_ids_in_upsert_order(self):
+        index = MetadataIndex()
+        index.add(
+            ["goal-1", "belief-1", "goal-2", "lore-1"],
+            [
+                character_metadata("Mira", "goal"),
+                character_metadata("Mira", "belief"),
+                character_metadata("Mira", "goal"),
+                {"faction": "world", "type": "faction", "category": "lore"},
+            ],
+        )
+
+        self.assertEqual(index.resolve(character_filter("Mira", "goal")), ["goal-1", "goal-2"])
+        self.assertEqual(index.resolve({"$and": [{"faction": "world"}, {"category": {"$eq": "lore"}}]}), ["lore-1"])
+        self.assertEqual(index.resolve(character_filter("Tomas", "goal")), [])
+
+    def test_or_filters_union_their_clauses(self):
+        index = MetadataIndex()
+        index.add(["goal-1", "belief-1"], [character_metadata("Mira", "goal"), character_metadata("Mira", "belief")])
+
+        ids = index.resolve({"$or": [character_filter("Mira", "belief"), character_filter("Mira", "goal")]})
+
+        self.assertEqual(ids, ["belief-1", "goal-1"])
+        self.assertIsNone(index.resolve({"$or": [character_filter("Mira", "goal"), character_filter("Mira", "relations")]}))
+
+    def test_filters_outside_the_indexed_fields_are_not_resolved(self):
+        index = MetadataIndex()
+
+        self.assertIsNone(index.resolve({"category": "relations"}))
+        self.assertIsNone(index.resolve({"$and": [{"faction": "world"}, {"type": "lore"}]}))
+        self.assertIsNone(index.resolve({"$or": [character_filter("Mira", "goal"), {"category": "relations"}]}))
+        self.assertIsNone(index.resolve({"$or": []}))
+
+    def test_upsert_moves_an_id_to_its_new_keys(self):
+        index = MetadataIndex()
+        index.add(["entry"], [character_metadata("Mira", "goal")])
+
+        index.add(["entry"], [character_metadata("Mira", "belief")])
+
+        self.assertEqual(index.resolve(character_filter("Mira", "goal")), [])
+        self.assertEqual(index.resolve(character_filter("Mira", "belief")), ["entry"])
+        self.assertEqual(len(index), 1)
+
+    def test_build_pages_through_the_collection(self):
+        collection = MagicMock()
+        collection.get.side_effect = [
+            {"ids": ["a", "b"], "metadatas": [character_metadata("Mira", "goal"), None]},
+            {"ids": ["c"], "metadatas": [character_metadata("Mira", "goal")]},
+        ]
+
+        index = MetadataIndex.build(collection, page_size=2)
+
+        self.assertEqual(index.resolve(character_filter("Mira", "goal")), ["a", "c"])
+        self.assertEqual(collection.get.call_args_list[1].kwargs["offset"], 2)
+
+
+class ChromaDBHelperMetadataIndexTests(unittest.TestCase):
+    def setUp(self):
+        collection = chromadb.EphemeralClient().get_or_create_collection(
+            f"index-test-{uuid4().hex}",
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=None,
+        )
+        collection.upsert(
+            ids=["seed-goal"],
+            documents=["Protect the market."],
+            embeddings=[[1.0, 0.0]],
+            metadatas=[character_metadata("Mira", "goal")],
+        )
+
+        self.helper = create_stub_chroma_helper(
+            collection,
+            embed=lambda text: [1.0, 0.0],
+            metadata_index=MetadataIndex.build(collection),
+        )
+
+    def test_get_documents_sees_upserts_in_write_order(self):
+        self.helper.add_embeddings([
+            ("runtime-z", "Pay off the debt.", character_metadata("Mira", "goal")),
+            ("runtime-a", "The player is honest.", character_metadata("Mira", "belief")),
+        ])
+        self.helper.add_embedding("runtime-b", "Find a new supplier.", character_metadata("Mira", "goal"))
+
+        documents = self.helper.get_documents(character_filter("Mira", "goal"))
+
+        self.assertEqual(documents, ["Protect the market.", "Pay off the debt.", "Find a new supplier."])
+        self.assertEqual(self.helper.get_documents(character_filter("Mira", "goal"), limit=1), ["Protect the market."])
+
+    def test_indexed_query_is_narrowed_to_matching_ids(self):
+        self.helper.db = MagicMock(wraps=self.helper.db)
+
+        docs = self.helper.query_docs("What does Mira want?", filter=character_filter("Mira", "goal"))
+
+        self.assertEqual(docs, [["Protect the market."]])
+        self.assertEqual(self.helper.db.query.call_args.kwargs["ids"], ["seed-goal"])
+        self.assertNotIn("where", self.helper.db.query.call_args.kwargs)
+
+    def test_filters_without_indexed_ids_fall_back_to_chroma(self):
+        # Written by another process, e.g. an ingestion script, so the index never saw it.
+        self.helper.db.upsert(
+            ids=["external-goal"],
+            documents=["Find the missing caravan."],
+            embeddings=[[1.0, 0.0]],
+            metadatas=[character_metadata("Tomas", "goal")],
+        )
+
+        docs = self.helper.query_docs("What does Tomas want?", filter=character_filter("Tomas", "goal"))
+        documents = self.helper.get_documents(character_filter("Tomas", "goal"))
+
+        self.assertEqual(docs, [["Find the missing caravan."]])
+        self.assertEqual(documents, ["Find the missing caravan."])
+
+    def test_or_filter_with_an_unindexed_clause_falls_back_to_chroma(self):
+        self.helper.db.upsert(
+            ids=["external-belief"],
+            documents=["The caravan was robbed."],
+            embeddings=[[1.0, 0.0]],
+            metadatas=[character_metadata("Mira", "belief")],
+        )
+
+        documents = self.helper.get_documents({"$or": [character_filter("Mira", "goal"), character_filter("Mira", "belief")]})
+
+        self.assertCountEqual(documents, ["Protect the market.", "The caravan was robbed."])
+
+
+if __name__ == "__main__":
+    unittest.main()
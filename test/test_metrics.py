@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+import server
+from logger import configure_logging
+from metrics import MetricsRegistry, get_metrics_registry, track_provider_call
+from test.stage_test_utils import create_stub_chroma_helper
+from test.test_turn_pipeline import FakeCharacter
+from workflow import TurnInput, TurnPipeline
+
+
+def provider_calls(role: str, operation: str, status: str) -> float:
+    return get_metrics_registry().counter(
+        "aigame_provider_calls_total",
+        "Model provider calls by outcome.",
+        ("role", "operation", "status"),
+    ).value(role=role, operation=operation, status=status)
+
+
+def stage_observations(stage: str) -> int:
+    return get_metrics_registry().histogram(
+        "aigame_stage_duration_seconds",
+        "Wall time of one pipeline stage.",
+        ("stage", "status"),
+    ).count(stage=stage, status="ok")
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_renders_counters_and_cumulative_histogram_buckets(self):
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls.", ("role",)).inc(role="judge")
+        latency = registry.histogram("latency_seconds", "Latency.", ("role",), buckets=(0.1, 1.0))
+        latency.observe(0.05, role="judge")
+        latency.observe(0.5, role="judge")
+        latency.observe(3.0, role="judge")
+
+        text = registry.render()
+
+        self.assertIn("# TYPE calls_total counter", text)
+        self.assertIn('calls_total{role="judge"} 1', text)
+        self.assertIn('latency_seconds_bucket{role="judge",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{role="judge",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{role="judge",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{role="judge"} 3', text)
+
+    def test_rejects_mismatched_labels_and_redefinitions(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls.", ("role",))
+
+        with self.assertRaises(ValueError):
+            counter.inc(stage="x")
+        with self.assertRaises(ValueError):
+            registry.histogram("calls_total", "Calls.", ("role",))
+
+    def test_provider_call_counts_errors_separately(self):
+        before = provider_calls("judge", "test", "error")
+
+        with self.assertRaises(RuntimeError):
+            with track_provider_call("judge", "test", prompt_chars=10):
+                raise RuntimeError("offline")
+
+        self.assertEqual(provider_calls("judge", "test", "error"), before + 1)
+
+
+class MetricsInstrumentationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_pipeline_records_every_stage(self):
+        before = stage_observations("ResponseStage")
+
+        TurnPipeline(FakeCharacter()).run(TurnInput(prompt="Hello there"))
+
+        self.assertEqual(stage_observations("ResponseStage"), before + 1)
+
+    def test_chroma_helper_records_embedding_and_response_calls(self):
+        helper = create_stub_chroma_helper(embed=lambda text: [0.1], response_provider=MagicMock(), messages=[])
+        helper.db.query.return_value = {"documents": [["lore"]], "distances": [[0.1]]}
+        helper.response_provider.chat.return_value = MagicMock(content="Greetings.", tool_calls=[])
+        embeddings_before = provider_calls("embedding", "embed", "ok")
+        responses_before = provider_calls("response", "chat", "ok")
+
+        helper.query_docs("uncached metrics prompt")
+        helper.generate_text("Hello")
+
+        self.assertEqual(provider_calls("embedding", "embed", "ok"), embeddings_before + 1)
+        self.assertEqual(provider_calls("response", "chat", "ok"), responses_before + 1)
+        self.assertIn('aigame_vector_store_operations_total{operation="query",status="ok"}', get_metrics_registry().render())
+
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        with track_provider_call("decision", "chat", prompt_chars=5):
+            pass
+
+        response = TestClient(server.app).get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("aigame_provider_call_duration_seconds_bucket", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
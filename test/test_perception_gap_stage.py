@@ -0,0 +1,89 @@
+import dataclasses
+import os
+import unittest
+from unittest.mock import patch
+
+from ai.settings import BUILT_IN_PROFILES, get_ai_settings
+from logger import configure_logging
+from test.test_turn_pipeline import FakeCharacter, FakeFunction, FakeToolCall
+from workflow import TurnInput, TurnPipeline
+
+
+def combined_character(**kwargs) -> FakeCharacter:
+    character = FakeCharacter(**kwargs)
+    character.ai_settings = dataclasses.replace(BUILT_IN_PROFILES["local"], perception_mode="combined")
+    return character
+
+
+class PerceptionGapStageTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_combined_mode_saves_one_decision_call(self):
+        tool_calls = [FakeToolCall(FakeFunction("recall_memory", {"reasoning": "Need memory context"}))]
+        separate = FakeCharacter(gap_content='{"tool_names": ["recall_memory"]}', gap_tool_calls=tool_calls)
+        combined = combined_character(tool_calls=tool_calls)
+
+        separate_result = TurnPipeline(separate).run(TurnInput(prompt="Do you remember me?"))
+        combined_result = TurnPipeline(combined).run(TurnInput(prompt="Do you remember me?"))
+
+        self.assertEqual(len(combined.agent.prompts), len(separate.agent.prompts) - 1)
+        self.assertEqual(combined_result.gap_analysis.tool_calls, tool_calls)
+        self.assertEqual(combined_result.retrieved_context.memory_context, separate_result.retrieved_context.memory_context)
+        self.assertEqual(combined_result.perception.summary, separate_result.perception.summary)
+
+    def test_combined_prompt_carries_perception_rubric_and_tool_rules(self):
+        character = combined_character()
+        pipeline = TurnPipeline(character)
+
+        pipeline.run(TurnInput(prompt="Hello there"))
+
+        combined_prompts = [prompt for prompt in character.agent.prompts if "Tool usage rules" in prompt]
+        self.assertEqual(len(combined_prompts), 1)
+        self.assertIn("Decision rubric", combined_prompts[0])
+        self.assertNotIn("GapAnalysisStage", [node.name for node in pipeline.graph.nodes])
+
+    def test_missing_perception_json_falls_back_to_a_perception_call(self):
+        tool_calls = [FakeToolCall(FakeFunction("recall_knowledge", {"reasoning": "Need lore"}))]
+        character = combined_character(tool_calls=tool_calls)
+        stage = TurnPipeline(character).perception_gap_stage
+        initial_context = TurnPipeline(character).initial_context_stage.run(TurnInput(prompt="Hi"))
+        character.agent.perception_content = ""
+
+        with self.assertLogs("workflow.stages.perception_gap_stage", level="WARNING"):
+            perception, gap_analysis = stage.run(TurnInput(prompt="Hi"), initial_context)
+
+        self.assertEqual(gap_analysis.tool_calls, tool_calls)
+        self.assertEqual(perception.raw_prompt, "Hi")
+
+    def test_mode_is_read_from_settings(self):
+        with patch.dict(os.environ, {"AI_PROFILE": "local", "PERCEPTION_MODE": "combined"}, clear=True):
+            get_ai_settings.cache_clear()
+            settings = get_ai_settings()
+        with patch.dict(os.environ, {"AI_PROFILE": "local", "PERCEPTION_MODE": "merged"}, clear=True):
+            get_ai_settings.cache_clear()
+            with self.assertRaises(ValueError):
+                get_ai_settings()
+        get_ai_settings.cache_clear()
+
+        self.assertEqual(settings.perception_mode, "combined")
+
+    def test_profiles_default_to_separate_unless_combined_is_opted_into(self):
+        with patch.dict(os.environ, {"AI_PROFILE": "hugging_face__remote"}, clear=True):
+            get_ai_settings.cache_clear()
+            remote = get_ai_settings()
+        with patch.dict(os.environ, {"AI_PROFILE": "hugging_face__remote", "PERCEPTION_MODE": ""}, clear=True):
+            get_ai_settings.cache_clear()
+            blank = get_ai_settings()
+        with patch.dict(os.environ, {"AI_PROFILE": "hugging_face__remote", "PERCEPTION_MODE": "combined"}, clear=True):
+            get_ai_settings.cache_clear()
+            opted_in = get_ai_settings()
+        get_ai_settings.cache_clear()
+
+        self.assertEqual({profile.perception_mode for profile in BUILT_IN_PROFILES.values()}, {"separate"})
+        self.assertEqual((remote.perception_mode, blank.perception_mode), ("separate", "separate"))
+        self.assertEqual(opted_in.perception_mode, "combined")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import dataclasses
+import os
+import unittest
+from unittest.mock import patch
+
+from ai.settings import BUILT_IN_PROFILES, get_ai_settings
+from ai.tokens import estimate_tokens
+from metrics import get_metrics_registry
+from workflow.stages import PerceptionStage, ResponseStage
+from workflow.models import InitialContext
+from workflow.stages.prompting import TRIM_MARKER, PromptBudget, format_prompt, format_static_prefix, resolve_prompt_budget
+
+
+def section_cuts(stage: str, section: str, action: str) -> float:
+    return get_metrics_registry().counter(
+        "aigame_prompt_sections_cut_total",
+        "Prompt sections trimmed or dropped to fit a token budget.",
+        ("stage", "section", "action"),
+    ).value(stage=stage, section=section, action=action)
+
+
+def load_settings(env: dict[str, str]):
+    with patch.dict(os.environ, {"AI_PROFILE": "local", **env}, clear=True):
+        get_ai_settings.cache_clear()
+        settings = get_ai_settings()
+    get_ai_settings.cache_clear()
+    return settings
+
+
+class FormatPromptBudgetTests(unittest.TestCase):
+    SECTIONS = [
+        ("Player input", "Where does the salt road lead?"),
+        ("Character definition", "Mira is a trader. " * 40),
+        ("Example dialogues", "Mira: Welcome, traveler. " * 80),
+        ("Retrieved context", "The salt road runs north. " * 60),
+    ]
+
+    def test_without_budget_output_is_unchanged(self):
+        unlimited = format_prompt("Title", self.SECTIONS, budget=PromptBudget(stage_name="TestStage"))
+
+        self.assertEqual(unlimited, format_prompt("Title", self.SECTIONS))
+        self.assertIn("Example dialogues:", unlimited)
+
+    def test_drops_lowest_priority_sections_first(self):
+        dropped_before = section_cuts("TestStage", "Example dialogues", "dropped")
+
+        prompt = format_prompt("Title", self.SECTIONS, budget=PromptBudget(stage_name="TestStage", max_tokens=600))
+
+        self.assertLessEqual(estimate_tokens(prompt), 600)
+        self.assertNotIn("Example dialogues:", prompt)
+        self.assertIn("Mira is a trader.", prompt)
+        self.assertIn("Where does the salt road lead?", prompt)
+        self.assertEqual(section_cuts("TestStage", "Example dialogues", "dropped"), dropped_before + 1)
+
+    def test_trims_a_section_that_only_needs_shortening(self):
+        full = format_prompt("Title", self.SECTIONS)
+        budget = PromptBudget(stage_name="TestStage", max_tokens=estimate_tokens(full) - 50)
+
+        prompt = format_prompt("Title", self.SECTIONS, budget=budget)
+
+        self.assertLessEqual(estimate_tokens(prompt), budget.max_tokens)
+        self.assertIn("Example dialogues:", prompt)
+        self.assertIn(TRIM_MARKER, prompt)
+        self.assertIn("Retrieved context:", prompt)
+
+    def test_unlisted_sections_are_never_cut(self):
+        with self.assertLogs("workflow.stages.prompting", level="WARNING"):
+            prompt = format_prompt(
+                "Title",
+                [("Player input", "word " * 400)],
+                budget=PromptBudget(stage_name="TestStage", max_tokens=50),
+            )
+
+        self.assertIn("word " * 399, prompt)
+
+    def test_reserved_tokens_count_against_the_budget_and_the_reported_size(self):
+        full = format_prompt("Title", self.SECTIONS)
+        budget = PromptBudget(stage_name="TestStage", max_tokens=estimate_tokens(full), reserved_tokens=300)
+
+        with patch("workflow.stages.prompting.observe_prompt_tokens") as observe:
+            prompt = format_prompt("Title", self.SECTIONS, budget=budget)
+
+        self.assertLessEqual(estimate_tokens(prompt) + 300, budget.max_tokens)
+        self.assertIn(TRIM_MARKER, prompt)
+        observe.assert_called_once_with("TestStage", estimate_tokens(prompt) + 300)
+
+
+class PromptBudgetSettingsTests(unittest.TestCase):
+    def test_stage_and_model_limits_combine_to_the_smaller(self):
+        settings = load_settings({
+            "DECISION_MAX_PROMPT_TOKENS": "4000",
+            "RESPONSE_MAX_PROMPT_TOKENS": "1500",
+            "PROMPT_BUDGET_STAGE_TOKENS": "PerceptionStage=3000, ResponseStage=2000",
+        })
+
+        self.assertEqual(resolve_prompt_budget(settings, "PerceptionStage", "decision_llm").max_tokens, 3000)
+        self.assertEqual(resolve_prompt_budget(settings, "StrategyStage", "decision_llm").max_tokens, 4000)
+        self.assertEqual(resolve_prompt_budget(settings, "ResponseStage", "response_llm").max_tokens, 1500)
+
+    def test_stages_resolve_their_own_budget(self):
+        settings = load_settings({"PROMPT_BUDGET_STAGE_TOKENS": "PerceptionStage=3000"})
+        character = type("Character", (), {"ai_settings": settings})()
+
+        self.assertEqual(PerceptionStage(character).prompt_budget(), PromptBudget("PerceptionStage", 3000))
+        self.assertEqual(ResponseStage(character).prompt_budget(), PromptBudget("ResponseStage", 0))
+
+    def test_stable_prefix_is_charged_to_prefixed_stages(self):
+        settings = load_settings({"PROMPT_BUDGET_STAGE_TOKENS": "PerceptionStage=3000"})
+        initial_context = InitialContext(
+            character_name="Mira",
+            situation="At the market",
+            sentiment="neutral",
+            character_definition="Mira is a trader. " * 40,
+            example_dialogues="Mira: Welcome, traveler. " * 80,
+        )
+        inline = PerceptionStage(type("Character", (), {"ai_settings": settings})())
+        prefixed = PerceptionStage(type("Character", (), {
+            "ai_settings": dataclasses.replace(settings, prompt_layout="stable_prefix"),
+        })())
+
+        self.assertEqual(inline.prompt_budget(initial_context), PromptBudget("PerceptionStage", 3000))
+        self.assertEqual(
+            prefixed.prompt_budget(initial_context),
+            PromptBudget("PerceptionStage", 3000, reserved_tokens=estimate_tokens(format_static_prefix(initial_context))),
+        )
+
+    def test_malformed_stage_limits_are_rejected(self):
+        with self.assertRaises(ValueError):
+            load_settings({"PROMPT_BUDGET_STAGE_TOKENS": "PerceptionStage"})
+
+
+if __name__ == "__main__":
+    unittest.main()
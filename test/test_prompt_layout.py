@@ -0,0 +1,99 @@
+import dataclasses
+import unittest
+from unittest.mock import MagicMock
+
+from ai.providers import ChatCompletionResult, _parse_openai_chat_response
+from ai.settings import BUILT_IN_PROFILES
+from classes.NpcAgent import NPCAgent
+from logger import configure_logging
+from metrics import get_metrics_registry
+from test.test_turn_pipeline import FakeCharacter
+from workflow import TurnInput, TurnPipeline
+
+
+def cached_prompt_tokens(role: str) -> float:
+    return get_metrics_registry().counter(
+        "aigame_provider_cached_prompt_tokens_total",
+        "Prompt tokens served from the backend's prefix cache, where the backend reports it.",
+        ("role", "operation"),
+    ).value(role=role, operation="chat")
+
+
+def run_turns(prompt_layout: str, prompts: list[str]) -> FakeCharacter:
+    character = FakeCharacter()
+    character.ai_settings = dataclasses.replace(BUILT_IN_PROFILES["local"], prompt_layout=prompt_layout)
+    pipeline = TurnPipeline(character)
+    for prompt in prompts:
+        pipeline.run(TurnInput(prompt=prompt))
+    return character
+
+
+class StablePrefixLayoutTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_character_data_moves_into_one_shared_system_prefix(self):
+        character = run_turns("stable_prefix", ["Hello there", "What do you sell?"])
+        agent = character.agent
+
+        prefixes = {prefix for prefix in agent.system_prompts if prefix is not None}
+        self.assertEqual(len(prefixes), 1)
+        prefix = prefixes.pop()
+        self.assertIn("Character definition:\nHelpful trader", prefix)
+        self.assertIn("Example dialogues:\nWelcome, traveler.", prefix)
+
+        prefixed_prompts = [prompt for prompt, system in zip(agent.prompts, agent.system_prompts) if system is not None]
+        self.assertGreaterEqual(len(prefixed_prompts), 4)
+        for prompt in prefixed_prompts:
+            self.assertNotIn("Character definition:", prompt)
+            self.assertNotIn("Example dialogues:", prompt)
+
+    def test_inline_layout_sends_no_system_prefix(self):
+        character = run_turns("inline", ["Hello there"])
+
+        self.assertTrue(all(prefix is None for prefix in character.agent.system_prompts))
+        self.assertTrue(any("Character definition:" in prompt for prompt in character.agent.prompts))
+
+
+class PrefixCacheReportingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_openai_compatible_usage_is_parsed(self):
+        vllm = _parse_openai_chat_response({
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 900, "prompt_tokens_details": {"cached_tokens": 768}},
+        })
+        llama_cpp = _parse_openai_chat_response({
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 900},
+            "timings": {"cache_n": 512},
+        })
+        silent = _parse_openai_chat_response({"choices": [{"message": {"content": "ok"}}]})
+
+        self.assertEqual((vllm.prompt_tokens, vllm.cached_prompt_tokens), (900, 768))
+        self.assertEqual((llama_cpp.prompt_tokens, llama_cpp.cached_prompt_tokens), (900, 512))
+        self.assertEqual((silent.prompt_tokens, silent.cached_prompt_tokens), (None, None))
+
+    def test_agent_sends_system_prefix_first_and_counts_cache_hits(self):
+        agent = NPCAgent.__new__(NPCAgent)
+        agent.provider = MagicMock()
+        agent.provider.chat.return_value = ChatCompletionResult(
+            content="{}", tool_calls=[], prompt_tokens=1000, cached_prompt_tokens=800,
+        )
+        before = cached_prompt_tokens("decision")
+
+        agent.run_prompt(prompt="Stage task", stage_name="PerceptionStage", system_prompt="Character reference")
+
+        messages = agent.provider.chat.call_args.kwargs["messages"]
+        self.assertEqual(messages, [
+            {"role": "system", "content": "Character reference"},
+            {"role": "user", "content": "Stage task"},
+        ])
+        self.assertEqual(cached_prompt_tokens("decision"), before + 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
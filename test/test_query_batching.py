@@ -0,0 +1,95 @@
+import unittest
+from types import SimpleNamespace
+
+from ai.providers import NormalizedToolCall, NormalizedToolFunction
+from ai.settings import BUILT_IN_PROFILES
+from logger import configure_logging
+from test.stage_test_utils import create_stub_chroma_helper
+from workflow.models import GapAnalysisResult, PerceptionResult
+from workflow.stages import InitialContextStage, RetrievalStage
+
+
+class BatchingDb:
+    def __init__(self):
+        self.batches: list[dict] = []
+
+    def query_text_many(self, prompts: list[str], filters=None, stage_name: str = "RetrievalStage"):
+        self.batches.append({"prompts": prompts, "filters": filters, "stage_name": stage_name})
+        return [f"result {index}" for index, _ in enumerate(prompts)]
+
+    def query_text(self, prompt: str, filter=None, stage_name: str = "RetrievalStage"):
+        raise AssertionError("single query_text should not be used when batching is available")
+
+
+class QueryManyTests(unittest.TestCase):
+    def test_prompts_sharing_a_filter_use_one_collection_query(self):
+        helper = create_stub_chroma_helper()
+        relation_filter = {"category": "relations"}
+        helper.db.query.side_effect = [
+            {"documents": [["close doc"], ["far doc"]], "distances": [[0.1], [0.9]]},
+            {"documents": [["lore doc"]], "distances": [[0.2]]},
+        ]
+
+        results = helper.query_docs_many(
+            ["relationship", "lore", "trust"],
+            [relation_filter, None, {"category": "relations"}],
+        )
+
+        helper.embedding_provider.embed_many.assert_called_once_with(["relationship", "lore", "trust"])
+        self.assertEqual(helper.db.query.call_count, 2)
+        first_query = helper.db.query.call_args_list[0].kwargs
+        self.assertEqual(first_query["query_embeddings"], [[12.0], [5.0]])
+        self.assertEqual(first_query["where"], relation_filter)
+        self.assertNotIn("where", helper.db.query.call_args_list[1].kwargs)
+        self.assertEqual(results, [[["close doc"]], [["lore doc"]], None])
+
+    def test_query_text_many_returns_one_text_per_prompt(self):
+        helper = create_stub_chroma_helper()
+        helper.db.query.return_value = {"documents": [["a", "b"], []], "distances": [[0.1, 0.3], []]}
+
+        self.assertEqual(helper.query_text_many(["first", "second"]), ["a\nb", ""])
+
+
+class StageBatchingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_retrieval_stage_sends_all_tool_prompts_in_one_batch(self):
+        db = BatchingDb()
+        agent = SimpleNamespace(run_prompt=lambda prompt, stage_name, payload: SimpleNamespace(content=payload["retrieved_context"]))
+        stage = RetrievalStage(SimpleNamespace(db=db, agent=agent, ai_settings=BUILT_IN_PROFILES["local"]))
+        gap_analysis = GapAnalysisResult(tool_calls=[
+            NormalizedToolCall(function=NormalizedToolFunction(name="recall_knowledge", arguments={})),
+            NormalizedToolCall(function=NormalizedToolFunction(name="recall_memory", arguments={})),
+        ])
+
+        result = stage.run(PerceptionResult(raw_prompt="Tell me about the ants."), gap_analysis)
+
+        self.assertEqual(len(db.batches), 1)
+        self.assertEqual(len(db.batches[0]["prompts"]), 2)
+        self.assertEqual(result.knowledge_context, "result 0")
+        self.assertEqual(result.memory_context, "result 1")
+        self.assertEqual(result.combined_context, "result 1\nresult 0")
+
+    def test_initial_context_prefetches_relationship_and_goals_together(self):
+        db = BatchingDb()
+        character = SimpleNamespace(
+            name="Lyra",
+            db=db,
+            get_relations=lambda: {"category": "relations"},
+            get_sentiment_filter=lambda: {"category": "sentiment"},
+            get_character_documents=lambda category: [],
+        )
+        stage = InitialContextStage(character)
+
+        stage.prefetch_retrieved_sections()
+
+        self.assertEqual(len(db.batches), 1)
+        self.assertEqual(db.batches[0]["stage_name"], "InitialContextStage")
+        self.assertEqual(stage.get_cached_section("relationship_summary", stage.build_relationship_summary), "Relationship to player:\nresult 0")
+        self.assertEqual(stage.get_cached_section("active_goals", stage.get_active_goals), ["result 1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
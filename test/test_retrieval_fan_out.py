@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from ai.providers import NormalizedToolCall, NormalizedToolFunction
+from ai.settings import BUILT_IN_PROFILES
+from logger import configure_logging
+from workflow.models import GapAnalysisResult, PerceptionResult
+from workflow.stages import RetrievalStage
+
+
+class SlowQueryDb:
+    def __init__(self, delays: dict[str, float]):
+        self.delays = delays
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+
+    def query_text(self, prompt: str, filter=None, stage_name: str = "RetrievalStage"):
+        instruction = prompt.split("\n", 1)[0]
+        with self.lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            time.sleep(next((delay for marker, delay in self.delays.items() if marker in instruction), 0.2))
+        finally:
+            with self.lock:
+                self.active -= 1
+        return instruction
+
+
+class PassthroughAgent:
+    def run_prompt(self, prompt: str, stage_name: str, payload: dict):
+        return SimpleNamespace(content=payload["retrieved_context"])
+
+
+def create_gap_analysis(*tool_names: str) -> GapAnalysisResult:
+    return GapAnalysisResult(tool_calls=[
+        NormalizedToolCall(function=NormalizedToolFunction(name=tool_name, arguments={"reasoning": tool_name}))
+        for tool_name in tool_names
+    ])
+
+
+class RetrievalFanOutTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def create_stage(self, delays: dict[str, float] | None = None) -> RetrievalStage:
+        character = SimpleNamespace(db=SlowQueryDb(delays or {}), agent=PassthroughAgent(), ai_settings=BUILT_IN_PROFILES["local"])
+        return RetrievalStage(character)
+
+    def test_tool_queries_run_concurrently_and_merge_in_fixed_order(self):
+        stage = self.create_stage()
+        gap_analysis = create_gap_analysis("evaluate_social_context", "recall_knowledge", "recall_relationship", "recall_memory")
+
+        started_at = time.perf_counter()
+        result = stage.run(PerceptionResult(raw_prompt="Who are you?"), gap_analysis)
+        elapsed = time.perf_counter() - started_at
+
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(stage.character.db.peak_active, 4)
+        self.assertTrue(result.memory_context.startswith("Recall prior memories"))
+        self.assertTrue(result.social_context.startswith("Recall social context"))
+        self.assertEqual(
+            result.combined_context.split("\n"),
+            [result.memory_context, result.relationship_context, result.knowledge_context, result.social_context],
+        )
+
+    def test_query_missing_the_deadline_counts_as_no_information(self):
+        stage = self.create_stage({"world knowledge": 1.0})
+        stage.QUERY_DEADLINE_SECONDS = 0.3
+
+        result = stage.run(PerceptionResult(raw_prompt="What is happening?"), create_gap_analysis("recall_memory", "recall_knowledge"))
+
+        self.assertEqual(result.knowledge_context, "no information")
+        self.assertTrue(result.memory_context.startswith("Recall prior memories"))
+        self.assertEqual(result.combined_context, result.memory_context)
+
+
+if __name__ == "__main__":
+    unittest.main()
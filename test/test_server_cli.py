@@ -1,8 +1,10 @@
+import asyncio
 import unittest
 from argparse import Namespace
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import server
+from ai.settings import BUILT_IN_PROFILES
 
 
 class ServerCliTests(unittest.TestCase):
@@ -55,5 +57,28 @@ class ServerCliTests(unittest.TestCase):
         uvicorn_run_mock.assert_called_once()
 
 
+class ServerLifespanTests(unittest.TestCase):
+    def test_shutdown_closes_pooled_http_clients_after_turns_and_state_writes_drain(self):
+        calls = MagicMock()
+
+        async def run_lifespan():
+            async with server.lifespan(server.app):
+                pass
+
+        with (
+            patch("server.get_ai_settings", return_value=BUILT_IN_PROFILES["local"]),
+            patch("server.shutdown_turn_executor", calls.shutdown_turn_executor),
+            patch("server.close_http_clients", calls.close_http_clients),
+            patch("server.shutdown_state_writer", calls.shutdown_state_writer),
+            patch("server.shutdown_trace_writer", calls.shutdown_trace_writer),
+        ):
+            asyncio.run(run_lifespan())
+
+        self.assertEqual(
+            [name for name, _, _ in calls.mock_calls],
+            ["shutdown_turn_executor", "shutdown_state_writer", "close_http_clients", "shutdown_trace_writer"],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+import threading
+import time
+import unittest
+
+from logger import configure_logging
+from test.test_turn_pipeline import FakeCharacter
+from workflow import TurnInput, TurnPipeline
+from workflow.graph import StageGraph, StageGraphError, StageHooks, StageNode
+
+
+class RecordingHooks:
+    def __init__(self):
+        self.events: list[tuple[str, str]] = []
+        self.failures: list[tuple[str, str, object]] = []
+        self.lock = threading.Lock()
+
+    def as_hooks(self) -> StageHooks:
+        return StageHooks(
+            on_start=lambda name, payload: self.record(name, "started"),
+            on_complete=lambda name, result, summary: self.record(name, "completed"),
+            on_failure=lambda name, exc, payload: self.failures.append((name, str(exc), payload)),
+        )
+
+    def record(self, name: str, event: str) -> None:
+        with self.lock:
+            self.events.append((name, event))
+
+
+def sleeping_node(name: str, inputs: tuple[str, ...], output: str, delay: float = 0.2) -> StageNode:
+    def run(values):
+        time.sleep(delay)
+        return f"{output}<-{','.join(str(values[item]) for item in inputs)}"
+
+    return StageNode(name=name, run=run, inputs=inputs, outputs=(output,))
+
+
+class StageGraphTests(unittest.TestCase):
+    def test_stages_run_in_declaration_order_once_their_inputs_exist(self):
+        graph = StageGraph(
+            [
+                sleeping_node("Join", ("left", "right"), "joined", delay=0.0),
+                sleeping_node("Left", ("seed",), "left", delay=0.0),
+                sleeping_node("Right", ("seed",), "right", delay=0.0),
+            ],
+            initial_inputs=("seed",),
+        )
+        hooks = RecordingHooks()
+
+        values = graph.run({"seed": "s"}, hooks.as_hooks())
+
+        self.assertEqual(values["joined"], "joined<-left<-s,right<-s")
+        self.assertEqual([name for name, event in hooks.events if event == "started"], ["Left", "Right", "Join"])
+
+    def test_conditional_stage_passes_value_through_without_logging(self):
+        graph = StageGraph(
+            [
+                StageNode(
+                    name="Maybe",
+                    run=lambda values: "replaced",
+                    inputs=("value",),
+                    outputs=("final",),
+                    condition=lambda values: values["value"] == "replace me",
+                    passthrough="value",
+                )
+            ],
+            initial_inputs=("value",),
+        )
+        hooks = RecordingHooks()
+
+        self.assertEqual(graph.run({"value": "keep"}, hooks.as_hooks())["final"], "keep")
+        self.assertEqual(hooks.events, [])
+        self.assertEqual(graph.run({"value": "replace me"}, hooks.as_hooks())["final"], "replaced")
+
+    def test_failure_reports_stage_payload_and_reraises(self):
+        def fail(values):
+            raise RuntimeError("boom")
+
+        graph = StageGraph(
+            [StageNode(name="Broken", run=fail, inputs=("seed",), outputs=("out",), payload=lambda values: {"seed": values["seed"]})],
+            initial_inputs=("seed",),
+        )
+        hooks = RecordingHooks()
+
+        with self.assertRaises(RuntimeError):
+            graph.run({"seed": 1}, hooks.as_hooks())
+        self.assertEqual(hooks.failures, [("Broken", "boom", {"seed": 1})])
+
+    def test_invalid_graphs_are_rejected(self):
+        with self.assertRaises(StageGraphError):
+            StageGraph([sleeping_node("A", ("missing",), "a")])
+        with self.assertRaises(StageGraphError):
+            StageGraph([sleeping_node("A", ("b",), "a"), sleeping_node("B", ("a",), "b")])
+        with self.assertRaises(StageGraphError):
+            StageGraph([sleeping_node("A", (), "a"), sleeping_node("B", (), "a")])
+
+
+class PipelineGraphTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_custom_stage_runs_with_pipeline_events(self):
+        character = FakeCharacter()
+        pipeline = TurnPipeline(character)
+        seen_replies: list[str] = []
+        pipeline.add_stage(StageNode(
+            name="ReplyAuditStage",
+            run=lambda values: seen_replies.append(values["response"].reply),
+            inputs=("response",),
+            outputs=("reply_audit",),
+            payload=lambda values: {"reply_length": len(values["response"].reply)},
+        ))
+
+        with self.assertLogs("workflow.pipeline", level="VERBOSE") as captured:
+            result = pipeline.run(TurnInput(prompt="Hello there"))
+
+        self.assertEqual(seen_replies, [result.response.reply])
+        self.assertIn("ReplyAuditStage completed successfully", "\n".join(captured.output))
+
+    def test_stages_run_on_the_calling_thread(self):
+        pipeline = TurnPipeline(FakeCharacter())
+        stage_threads: set[int] = set()
+        pipeline.add_stage(StageNode(
+            name="ContextAuditStage",
+            run=lambda values: stage_threads.add(threading.get_ident()),
+            inputs=("initial_context",),
+            outputs=("context_audit",),
+        ))
+
+        pipeline.run(TurnInput(prompt="Hello there"))
+
+        self.assertEqual(stage_threads, {threading.get_ident()})
+
+if __name__ == "__main__":
+    unittest.main()
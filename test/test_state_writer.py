@@ -0,0 +1,179 @@
+import unittest
+from threading import Event, Thread
+from types import SimpleNamespace
+
+from ai.settings import BUILT_IN_PROFILES
+from classes.Character import Character
+from classes.StateWriter import StateWriter
+from logger import configure_logging
+from models import Faction, MetadataCategory
+from workflow.models import StateUpdate
+
+KEY = ("factions", "Mira")
+
+
+class SlowDB:
+    """Records batched upserts; each one waits until `release` is set."""
+
+    def __init__(self):
+        self.messages = []
+        self.release = Event()
+        self.batches: list[list[tuple]] = []
+
+    def add_embeddings(self, entries):
+        self.release.wait(5)
+        self.batches.append(list(entries))
+
+
+class FailingDB:
+    def add_embeddings(self, entries):
+        raise RuntimeError("chroma is down")
+
+
+class StateWriterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def setUp(self):
+        self.writer = StateWriter()
+
+    def tearDown(self):
+        self.writer.shutdown()
+
+    def test_flush_waits_for_submitted_entries(self):
+        db = SlowDB()
+        self.writer.submit(KEY, db, [("a", "first", None), ("b", "second", None)])
+
+        self.assertFalse(self.writer.flush(KEY, timeout=0.05))
+        db.release.set()
+        self.assertTrue(self.writer.flush(KEY, timeout=5))
+
+        self.assertEqual([entry[0] for batch in db.batches for entry in batch], ["a", "b"])
+        self.assertEqual(self.writer.stats().written, 2)
+        self.assertEqual(self.writer.stats().pending, 0)
+
+    def test_queued_submits_for_one_key_share_a_batch(self):
+        db = SlowDB()
+        self.writer.submit(KEY, db, [("a", "first", None)])
+        self.writer.submit(KEY, db, [("b", "second", None)])
+        self.writer.submit(KEY, db, [("c", "third", None)])
+        db.release.set()
+
+        self.assertTrue(self.writer.flush(KEY, timeout=5))
+        self.assertLessEqual(len(db.batches), 2)
+        self.assertEqual(sorted(entry[0] for batch in db.batches for entry in batch), ["a", "b", "c"])
+
+    def test_failed_batch_is_counted_and_does_not_block_flush(self):
+        db = FailingDB()
+
+        with self.assertLogs("classes.StateWriter", level="ERROR"):
+            self.writer.submit(KEY, db, [("a", "first", None)])
+            self.assertTrue(self.writer.flush(KEY, timeout=5))
+
+        self.assertEqual(self.writer.stats().failed, 1)
+
+    def test_shutdown_drains_the_queue(self):
+        db = SlowDB()
+        db.release.set()
+        for index in range(20):
+            self.writer.submit(KEY, db, [(str(index), f"entry {index}", None)])
+
+        self.writer.shutdown()
+
+        self.assertEqual(sum(len(batch) for batch in db.batches), 20)
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(KEY, db, [("late", "late", None)])
+
+    def test_submit_blocked_on_a_full_queue_is_written_before_shutdown(self):
+        writer = StateWriter(max_queue=1)
+        db = SlowDB()
+        writer.submit(KEY, db, [("a", "first", None)])
+        writer.submit(KEY, db, [("b", "second", None)])
+        blocked_submit = Thread(target=lambda: writer.submit(KEY, db, [("c", "third", None)]))
+        blocked_submit.start()
+        stopper = Thread(target=writer.shutdown)
+        stopper.start()
+
+        db.release.set()
+        blocked_submit.join(5)
+        stopper.join(5)
+
+        self.assertEqual(sorted(entry[0] for batch in db.batches for entry in batch), ["a", "b", "c"])
+        self.assertEqual(writer.stats().pending, 0)
+
+
+class CharacterWriteBehindTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def create_character(self, writer: StateWriter) -> Character:
+        character = Character.__new__(Character)
+        character.name = "Mira"
+        character.id = "Mira1"
+        character.faction = Faction.WORLD
+        character.sentiment = "neutral"
+        character.db = SlowDB()
+        character.ai_settings = BUILT_IN_PROFILES["local"]
+        character.state_writer = writer
+        character.state_cache = None
+        character.pending_state_writes = []
+        return character
+
+    def test_turn_updates_are_written_as_one_batch_behind_the_reply(self):
+        writer = StateWriter()
+        self.addCleanup(writer.shutdown)
+        character = self.create_character(writer)
+
+        character.change_sentiment("happy", "The player helped.")
+        character.update_relationship(StateUpdate(changed=True, value="Trust improved."))
+        character.update_goals(StateUpdate(changed=True, value="Keep the player nearby."))
+        character.submit_state_writes()
+
+        self.assertEqual(character.db.batches, [])
+        character.db.release.set()
+        self.assertTrue(character.flush_state_writes())
+
+        self.assertEqual(len(character.db.batches), 1)
+        categories = [entry[2]["category"] for entry in character.db.batches[0]]
+        self.assertEqual(categories, [
+            MetadataCategory.SENTIMENT.value,
+            MetadataCategory.RELATIONS.value,
+            MetadataCategory.GOAL.value,
+        ])
+
+    def test_next_turn_waits_for_pending_writes(self):
+        writer = StateWriter()
+        self.addCleanup(writer.shutdown)
+        character = self.create_character(writer)
+        character.update_beliefs(StateUpdate(changed=True, value="The player is dependable."))
+        batches_seen_by_next_turn: list[int] = []
+
+        def run_turn(turn_input):
+            batches_seen_by_next_turn.append(len(character.db.batches))
+            return SimpleNamespace(terminal_update=None, response=SimpleNamespace(reply="Welcome back."))
+
+        character.initialize_message_loop_context = lambda: None
+        character.apply_turn_updates = lambda terminal_update: None
+        character.pipeline = SimpleNamespace(run=run_turn)
+        character.db.release.set()
+
+        self.assertEqual(character.prompt("Hello again"), "Welcome back.")
+        self.assertEqual(batches_seen_by_next_turn, [1])
+    def test_new_conversation_waits_for_the_previous_one(self):
+        writer = StateWriter()
+        self.addCleanup(writer.shutdown)
+        previous = self.create_character(writer)
+        current = self.create_character(writer)
+        previous.update_beliefs(StateUpdate(changed=True, value="The player is dependable."))
+        previous.submit_state_writes()
+
+        self.assertFalse(current.flush_state_writes(timeout=0.05))
+        previous.db.release.set()
+        self.assertTrue(current.flush_state_writes(timeout=5))
+        self.assertEqual(len(previous.db.batches), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
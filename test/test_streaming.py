@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from ai.http_pool import close_http_clients
+from ai.providers import OllamaChatProvider, OpenAICompatibleChatProvider, RoleProviderConfig
+from classes.Character import Character
+from classes.ChromaDBHelper import ChromaDBHelper
+from workflow import TurnExecutor
+
+
+class SseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        self.server.payloads.append(json.loads(self.rfile.read(length)))
+
+        events = [
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hello"}}]},
+            {"choices": [{"delta": {"content": ", traveller"}}]},
+        ]
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        encoded = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        return
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+class ProviderStreamingTests(unittest.TestCase):
+    def test_openai_compatible_parses_server_sent_events(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SseHandler)
+        server.payloads = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            provider = OpenAICompatibleChatProvider(RoleProviderConfig(
+                provider="openai_compatible",
+                model="stub-model",
+                base_url=f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions",
+            ))
+
+            deltas = list(provider.chat_stream(messages=[{"role": "user", "content": "hi"}]))
+        finally:
+            close_http_clients()
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(deltas, ["Hello", ", traveller"])
+        self.assertTrue(server.payloads[0]["stream"])
+
+    @patch("ai.providers.ollama.chat")
+    def test_ollama_requests_stream_and_yields_message_content(self, ollama_chat):
+        ollama_chat.return_value = iter([
+            {"message": {"role": "assistant", "content": "Hel"}},
+            {"message": {"role": "assistant", "content": "lo"}},
+            {"message": {"role": "assistant", "content": ""}, "done": True},
+        ])
+        provider = OllamaChatProvider(RoleProviderConfig(provider="ollama", model="mythomax"))
+
+        self.assertEqual(list(provider.chat_stream(messages=[{"role": "user", "content": "hi"}])), ["Hel", "lo"])
+        ollama_chat.assert_called_once_with(model="mythomax", messages=[{"role": "user", "content": "hi"}], stream=True)
+
+
+class ResponseStreamingTests(unittest.TestCase):
+    def test_generate_text_stream_forwards_deltas_and_records_reply(self):
+        helper = ChromaDBHelper.__new__(ChromaDBHelper)
+        helper.messages = [{"role": "system", "content": "You are Lyra."}]
+        helper.response_provider = MagicMock()
+        helper.response_provider.chat_stream.return_value = iter(["Well ", "met."])
+        received: list[str] = []
+
+        reply = helper.generate_text_stream("Greet the player.", on_delta=received.append, stage_name="Greeting")
+
+        self.assertEqual(reply, "Well met.")
+        self.assertEqual(received, ["Well ", "met."])
+        self.assertEqual(helper.messages[-1], {"role": "assistant", "content": "Well met."})
+        self.assertEqual(helper.messages[-2], {"role": "user", "content": "Greet the player."})
+
+    def test_stream_reply_sends_deltas_before_done(self):
+        character = Character.__new__(Character)
+        socket = RecordingSocket()
+        executor = TurnExecutor(max_workers=1)
+
+        def produce(prompt: str, on_delta):
+            for delta in ["The ", "ants ", "are restless."]:
+                on_delta(delta)
+            return "The ants are restless."
+
+        async def scenario():
+            return await character.stream_reply(socket, executor, produce, prompt="news?")
+
+        try:
+            reply = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(reply, "The ants are restless.")
+        self.assertEqual(socket.sent, [
+            {"event": "message_delta", "data": "The "},
+            {"event": "message_delta", "data": "ants "},
+            {"event": "message_delta", "data": "are restless."},
+            {"event": "message_done", "data": "The ants are restless."},
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
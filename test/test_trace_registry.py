@@ -0,0 +1,124 @@
+import os
+import tracemalloc
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from dotenv import load_dotenv
+
+import logger
+from logger import ConversationTrace, TraceRegistry, configure_logging, get_logger, get_trace_registry, get_trace_writer
+from metrics import process_resident_memory_bytes
+
+test_logger = get_logger(__name__)
+
+
+def make_trace(root_dir: Path, persist_enabled: bool = True) -> ConversationTrace:
+    return ConversationTrace(
+        root_dir=root_dir,
+        character_name="Mira",
+        profile="test-profile",
+        providers={},
+        persist_enabled=persist_enabled,
+    )
+
+
+class TraceRegistryTests(unittest.TestCase):
+    def test_finished_trace_is_closed_but_path_stays_available(self):
+        registry = TraceRegistry(max_active=4, max_finished=4)
+        with TemporaryDirectory() as temp_dir:
+            trace = make_trace(Path(temp_dir))
+            registry.add(trace)
+
+            registry.finish(trace.conversation_id)
+
+            self.assertTrue(trace.closed)
+            self.assertIsNone(registry.get(trace.conversation_id))
+            self.assertEqual(registry.path_for(trace.conversation_id), trace.path)
+            self.assertEqual(registry.stats().active, 0)
+
+    def test_oldest_active_trace_is_evicted_past_the_bound(self):
+        registry = TraceRegistry(max_active=2, max_finished=1)
+        traces = [make_trace(Path("unused"), persist_enabled=False) for _ in range(3)]
+
+        for trace in traces:
+            registry.add(trace)
+
+        self.assertTrue(traces[0].closed)
+        self.assertIsNone(registry.get(traces[0].conversation_id))
+        self.assertIs(registry.get(traces[2].conversation_id), traces[2])
+        self.assertEqual(registry.stats().evicted, 1)
+
+        registry.finish(traces[1].conversation_id)
+        registry.finish(traces[2].conversation_id)
+        self.assertEqual(registry.stats().finished, 1)
+        self.assertIsNone(registry.path_for(traces[1].conversation_id))
+
+
+    def test_limits_are_read_from_dotenv_loaded_by_configure_logging(self):
+        with TemporaryDirectory() as temp_dir:
+            env_path = Path(temp_dir) / ".env"
+            env_path.write_text("AIGAME_TRACE_MAX_ACTIVE=3\nAIGAME_TRACE_MAX_FINISHED=2\n", encoding="utf-8")
+            with (
+                patch.dict(os.environ, {}, clear=True),
+                patch.object(logger, "_configured", False),
+                patch.object(logger, "_trace_registry", None),
+                patch.object(logger, "load_dotenv", lambda: load_dotenv(env_path)),
+            ):
+                configure_logging()
+                registry = get_trace_registry()
+
+        self.assertEqual((registry.max_active, registry.max_finished), (3, 2))
+
+
+class TraceLifecycleSoakTests(unittest.TestCase):
+    CONVERSATIONS = 10_000
+    WARM_UP = 2_000
+
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def run_conversation(self, root_dir: Path) -> None:
+        token = test_logger.start_conversation_trace(
+            root_dir=root_dir,
+            character_name="Mira",
+            profile="test-profile",
+            providers={"response": "fake:model"},
+            persist_enabled=True,
+        )
+        try:
+            test_logger.conversation_event(stage_name="ResponseStage", event="generate_text", result={"reply": "Hello."})
+        finally:
+            test_logger.reset_conversation_id(token)
+
+    def test_memory_stays_flat_across_many_conversations(self):
+        registry = get_trace_registry()
+        active_before = registry.stats().active
+
+        with TemporaryDirectory() as temp_dir:
+            root_dir = Path(temp_dir)
+            for _ in range(self.WARM_UP):
+                self.run_conversation(root_dir)
+
+            tracemalloc.start()
+            try:
+                rss_before = process_resident_memory_bytes()
+                traced_before, _ = tracemalloc.get_traced_memory()
+                for _ in range(self.CONVERSATIONS - self.WARM_UP):
+                    self.run_conversation(root_dir)
+                traced_after, _ = tracemalloc.get_traced_memory()
+                rss_after = process_resident_memory_bytes()
+            finally:
+                tracemalloc.stop()
+
+        self.assertEqual(registry.stats().active, active_before)
+        self.assertLessEqual(registry.stats().finished, registry.max_finished)
+        self.assertEqual(get_trace_writer().stats().open_files, 0)
+        self.assertLess(traced_after - traced_before, 256 * 1024)
+        self.assertLess(rss_after - rss_before, 16 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
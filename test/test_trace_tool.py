@@ -0,0 +1,143 @@
+import json
+import unittest
+from pathlib import Path
+from typing import Callable
+from tempfile import TemporaryDirectory
+
+import trace_tool
+from logger import TRACE_BLOB_MIN_CHARS, configure_logging, get_logger
+from test.test_turn_pipeline import FakeCharacter
+from workflow import TurnInput, TurnPipeline
+
+test_logger = get_logger(__name__)
+
+
+def run_traced_turns(
+    root_dir: Path,
+    trace_format: str,
+    prompts: list[str],
+    create_character: Callable[[], FakeCharacter] = FakeCharacter,
+) -> Path:
+    token = test_logger.start_conversation_trace(
+        root_dir=root_dir,
+        character_name="Mira",
+        profile="test-profile",
+        providers={"response": "fake:model"},
+        persist_enabled=True,
+        trace_format=trace_format,
+    )
+    conversation_id = test_logger.get_conversation_id()
+    try:
+        pipeline = TurnPipeline(create_character())
+        for prompt in prompts:
+            pipeline.run(TurnInput(prompt=prompt))
+    finally:
+        test_logger.reset_conversation_id(token)
+
+    path = test_logger.get_conversation_trace_path(conversation_id)
+    assert path is not None
+    return path
+
+
+def create_spice_trader() -> FakeCharacter:
+    character = FakeCharacter()
+    character.pl_list = " ".join([
+        "Mira is a spice trader who has run the same stall in the lower market for twenty years.",
+        "She is warm with regulars, wary of strangers, and keeps careful accounts of every favour owed.",
+        "She lost her brother on the salt road and distrusts the caravan guild that sent him out.",
+        "She wants to expand her stall, pay off her debt to the moneylender, and learn who robbed the last caravan.",
+    ] * 3)
+    character.ali_chat = "\n".join([
+        "Player: What are you selling today?",
+        "Mira: Saffron from the coast, pepper from the hills, and advice for free if you buy something.",
+        "Player: Have you heard any news?",
+        "Mira: News costs more than pepper, traveler. Buy a pouch and we will see what I remember.",
+    ] * 3)
+    return character
+
+
+class JsonlTraceTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+
+    def test_repeated_long_strings_are_stored_once(self):
+        long_prompt = "Tell me everything about the salt road. " * 10
+        self.assertGreaterEqual(len(long_prompt), TRACE_BLOB_MIN_CHARS)
+
+        with TemporaryDirectory() as temp_dir:
+            path = run_traced_turns(Path(temp_dir), "jsonl", [long_prompt, long_prompt])
+            records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual(path.suffix, ".jsonl")
+        self.assertEqual(records[0]["type"], "header")
+        blob_hashes = [record["hash"] for record in records if record["type"] == "blob"]
+        self.assertEqual(len(blob_hashes), len(set(blob_hashes)))
+        self.assertNotIn(long_prompt, json.dumps([record for record in records if record["type"] == "event"]))
+
+    def test_jsonl_trace_is_a_fraction_of_the_text_trace(self):
+        prompts = [
+            "Good morning, Mira. What spices came in with the last caravan?",
+            "I heard the salt road is closed again. Do you know why?",
+            "How much for a pouch of saffron?",
+            "Your brother travelled with the guild, didn't he?",
+            "Who do you think robbed the caravan last week?",
+            "Can I help you pay off the moneylender somehow?",
+            "The guild master says you owe him money. Is that true?",
+            "What would it take for you to trust me?",
+            "I found a ledger near the old well. Does this handwriting look familiar?",
+            "Thank you for the pepper. I will come back tomorrow.",
+        ]
+        with TemporaryDirectory() as temp_dir:
+            text_size = run_traced_turns(Path(temp_dir), "text", prompts, create_spice_trader).stat().st_size
+            jsonl_size = run_traced_turns(Path(temp_dir), "jsonl", prompts, create_spice_trader).stat().st_size
+
+        # Each stage prompt repeats the character sections, which the JSONL trace stores once. Every event
+        # still has its own timestamp, stage and status, close to 40% of the file here, so the ratio stays
+        # below 10x however well prompts deduplicate (about 4.4x over these 10 turns).
+        self.assertGreaterEqual(text_size, 4 * jsonl_size)
+
+
+class TraceToolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging()
+        cls.temp_dir = TemporaryDirectory()
+        cls.path = run_traced_turns(Path(cls.temp_dir.name), "jsonl", ["Hello there " * 20, "Goodbye"])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def test_rebuilds_turn_with_prompts_inlined(self):
+        trace = trace_tool.load_trace(self.path)
+
+        turn = trace_tool.rebuild_turn(trace, 0)
+
+        self.assertEqual(len(trace_tool.split_turns(trace.events)), 2)
+        self.assertEqual(turn["character_name"], "Mira")
+        self.assertIn("ResponseStage", turn["timings_ms"])
+        self.assertIn("Hello there " * 20, json.dumps(turn["events"]))
+        self.assertNotIn("$blob", json.dumps(turn["events"]))
+        with self.assertRaises(IndexError):
+            trace_tool.rebuild_turn(trace, 5)
+
+    def test_filters_events_and_summarizes_stage_timings(self):
+        trace = trace_tool.load_trace(self.path)
+
+        completed = trace_tool.filter_events(trace.events, stage="PerceptionStage", event="stage_completed")
+        summary = trace_tool.summarize_timings(trace_tool.stage_timings(trace.events))
+
+        self.assertEqual(len(completed), 2)
+        self.assertEqual(summary["PerceptionStage"]["count"], 2)
+        self.assertGreaterEqual(summary["PerceptionStage"]["max_ms"], summary["PerceptionStage"]["p50_ms"])
+
+    def test_text_traces_are_rejected(self):
+        with TemporaryDirectory() as temp_dir:
+            path = run_traced_turns(Path(temp_dir), "text", ["Hello"])
+            with self.assertRaises(ValueError):
+                trace_tool.load_trace(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
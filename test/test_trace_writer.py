@@ -0,0 +1,161 @@
+import json
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from logger import ConversationTrace, TraceWriter
+
+
+class TraceWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "trace.txt"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def stall(self, writer: TraceWriter) -> threading.Event:
+        """Blocks the writer thread on its next event so later submissions pile up in the queue."""
+        gate = threading.Event()
+        started = threading.Event()
+
+        def blocked_render() -> str:
+            started.set()
+            gate.wait(5)
+            return "stalled\n"
+
+        writer.submit(self.path, blocked_render)
+        started.wait(5)
+        return gate
+
+    def test_renders_off_the_calling_thread_and_keeps_order(self):
+        writer = TraceWriter(batch_size=4)
+        render_threads: list[str] = []
+
+        def render(index: int) -> str:
+            render_threads.append(threading.current_thread().name)
+            return f"event {index}\n"
+
+        try:
+            for index in range(10):
+                writer.submit(self.path, lambda index=index: render(index))
+            self.assertTrue(writer.flush())
+
+            self.assertEqual(writer.stats().open_files, 1)
+            self.assertEqual(self.path.read_text(encoding="utf-8"), "".join(f"event {index}\n" for index in range(10)))
+            self.assertEqual(set(render_threads), {"conversation-trace-writer"})
+
+            self.assertTrue(writer.close_file(self.path))
+            self.assertEqual(writer.stats().open_files, 0)
+            self.assertEqual(writer.stats().written, 10)
+        finally:
+            writer.shutdown()
+
+    def test_close_without_wait_does_not_block_on_a_full_queue(self):
+        writer = TraceWriter(max_queue=1)
+        try:
+            gate = self.stall(writer)
+            writer.submit(self.path, lambda: "queued\n")
+
+            closer = threading.Thread(target=lambda: writer.close_file(self.path, wait=False))
+            closer.start()
+            closer.join(1)
+            self.assertFalse(closer.is_alive())
+
+            gate.set()
+            self.assertTrue(writer.flush())
+            self.assertEqual(writer.stats().open_files, 0)
+            self.assertEqual(self.path.read_text(encoding="utf-8"), "stalled\nqueued\n")
+        finally:
+            writer.shutdown()
+
+    def test_required_submit_without_wait_is_deferred_in_order(self):
+        writer = TraceWriter(max_queue=1)
+        try:
+            gate = self.stall(writer)
+            writer.submit(self.path, lambda: "queued\n")
+
+            def submit_from_event_loop() -> None:
+                writer.submit(self.path, lambda: "header\n", required=True, wait=False)
+                writer.submit(self.path, lambda: "event\n", wait=False)
+
+            submitter = threading.Thread(target=submit_from_event_loop)
+            submitter.start()
+            submitter.join(1)
+            self.assertFalse(submitter.is_alive())
+
+            gate.set()
+            self.assertTrue(writer.close_file(self.path))
+            self.assertEqual(self.path.read_text(encoding="utf-8"), "stalled\nqueued\nheader\nevent\n")
+        finally:
+            writer.shutdown()
+
+    def test_drop_policy_discards_events_but_keeps_required_ones(self):
+        writer = TraceWriter(max_queue=2, overflow="drop")
+        try:
+            gate = self.stall(writer)
+            for index in range(5):
+                writer.submit(self.path, lambda index=index: f"optional {index}\n")
+            gate.set()
+            writer.submit(self.path, lambda: "failure\n", required=True)
+            self.assertTrue(writer.flush())
+
+            content = self.path.read_text(encoding="utf-8")
+            self.assertEqual(writer.stats().dropped, 3)
+            self.assertIn("optional 0", content)
+            self.assertNotIn("optional 4", content)
+            self.assertTrue(content.endswith("failure\n"))
+        finally:
+            writer.shutdown()
+
+    def test_sample_policy_thins_events_once_queue_is_half_full(self):
+        writer = TraceWriter(max_queue=8, overflow="sample", sample_every=2)
+        try:
+            gate = self.stall(writer)
+            for index in range(8):
+                writer.submit(self.path, lambda index=index: f"event {index}\n")
+            gate.set()
+            self.assertTrue(writer.flush())
+
+            # Four events fill half the queue; of the next four, every second one is kept.
+            self.assertEqual(writer.stats().sampled_out, 2)
+            self.assertEqual(writer.stats().written, 7)
+        finally:
+            writer.shutdown()
+
+    def test_rejects_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            TraceWriter(overflow="spill")
+
+
+class ConversationTraceTests(unittest.TestCase):
+    def read_records(self, trace: ConversationTrace) -> list[dict]:
+        assert trace.path is not None
+        return [json.loads(line) for line in trace.path.read_text(encoding="utf-8").splitlines()]
+
+    def test_payloads_are_written_as_they_were_when_logged(self):
+        with TemporaryDirectory() as temp_dir:
+            trace = ConversationTrace(Path(temp_dir), "Mira", "test-profile", {}, persist_enabled=True, trace_format="jsonl")
+            payload = {"tool_calls": ["recall_memory"]}
+
+            trace.record_stage_event("GapAnalysisStage", "stage_completed", payload=payload)
+            payload["tool_calls"].append("recall_knowledge")
+            trace.close()
+            records = self.read_records(trace)
+
+        self.assertEqual([record["type"] for record in records], ["header", "event"])
+        self.assertEqual(records[1]["payload"], {"tool_calls": ["recall_memory"]})
+
+    def test_trace_without_events_still_writes_its_header(self):
+        with TemporaryDirectory() as temp_dir:
+            trace = ConversationTrace(Path(temp_dir), "Mira", "test-profile", {}, persist_enabled=True, trace_format="jsonl")
+            trace.close()
+            records = self.read_records(trace)
+
+        self.assertEqual(records[0]["conversation_id"], trace.conversation_id)
+        self.assertEqual(len(records), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
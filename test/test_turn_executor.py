@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import unittest
+
+from logger import configure_logging, get_logger
+from workflow.executor import TurnExecutor, TurnExecutorSaturatedError
+
+test_logger = get_logger(__name__)
+
+
+class TurnExecutorTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configure_logging("VERBOSE")
+
+    def test_run_executes_blocking_call_off_the_event_loop(self):
+        executor = TurnExecutor(max_workers=2)
+        loop_thread_ids = []
+
+        async def scenario():
+            loop_thread_ids.append(threading.get_ident())
+            return await executor.run(threading.get_ident)
+
+        try:
+            worker_thread_id = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        self.assertNotEqual(worker_thread_id, loop_thread_ids[0])
+        self.assertEqual(executor.stats().completed, 1)
+
+    def test_slow_turn_does_not_block_other_coroutines(self):
+        executor = TurnExecutor(max_workers=2)
+        release = threading.Event()
+        events = []
+
+        async def slow_turn():
+            await executor.run(release.wait, 5)
+            events.append("slow")
+
+        async def fast_turn():
+            await executor.run(lambda: None)
+            events.append("fast")
+            release.set()
+
+        async def scenario():
+            await asyncio.gather(slow_turn(), fast_turn())
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(events, ["fast", "slow"])
+
+    def test_concurrency_is_bounded_and_queue_depth_is_reported(self):
+        executor = TurnExecutor(max_workers=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_turn():
+            started.set()
+            release.wait(5)
+
+        try:
+            first = executor.submit(blocking_turn)
+            started.wait(5)
+            second = executor.submit(lambda: "done")
+            third = executor.submit(lambda: "done")
+
+            stats = executor.stats()
+            self.assertEqual(stats.active, 1)
+            self.assertEqual(stats.queued, 2)
+            self.assertEqual(stats.peak_queued, 2)
+
+            release.set()
+            first.result(5)
+            self.assertEqual(second.result(5), "done")
+            self.assertEqual(third.result(5), "done")
+        finally:
+            release.set()
+            executor.shutdown()
+
+        stats = executor.stats()
+        self.assertEqual(stats.active, 0)
+        self.assertEqual(stats.queued, 0)
+        self.assertEqual(stats.completed, 3)
+
+    def test_submit_rejects_work_when_queue_is_full(self):
+        executor = TurnExecutor(max_workers=1, max_queue_depth=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_turn():
+            started.set()
+            release.wait(5)
+
+        try:
+            executor.submit(blocking_turn)
+            started.wait(5)
+            executor.submit(lambda: None)
+
+            with self.assertRaises(TurnExecutorSaturatedError):
+                executor.submit(lambda: None)
+        finally:
+            release.set()
+            executor.shutdown()
+
+        self.assertEqual(executor.stats().rejected, 1)
+
+    def test_turns_of_admitted_conversations_are_not_rejected(self):
+        executor = TurnExecutor(max_workers=1, max_queue_depth=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_turn():
+            started.set()
+            release.wait(5)
+
+        async def next_turn_and_new_conversation():
+            turn = asyncio.ensure_future(executor.run(lambda: "reply"))
+            await asyncio.sleep(0)
+            with self.assertRaises(TurnExecutorSaturatedError):
+                await executor.admit(lambda: "character")
+            release.set()
+            return await turn
+
+        try:
+            executor.submit(blocking_turn)
+            started.wait(5)
+            executor.submit(lambda: None)
+
+            self.assertEqual(asyncio.run(next_turn_and_new_conversation()), "reply")
+        finally:
+            release.set()
+            executor.shutdown()
+
+        self.assertEqual(executor.stats().rejected, 1)
+
+    def test_failures_are_counted_and_reraised(self):
+        executor = TurnExecutor(max_workers=1)
+
+        def failing_turn():
+            raise RuntimeError("turn boom")
+
+        try:
+            with self.assertRaises(RuntimeError):
+                asyncio.run(executor.run(failing_turn))
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(executor.stats().failed, 1)
+
+    def test_conversation_id_follows_work_onto_worker_thread(self):
+        executor = TurnExecutor(max_workers=1)
+        token = test_logger.start_conversation_trace(
+            root_dir="unused",
+            character_name="Mira",
+            profile="test-profile",
+            providers={},
+            persist_enabled=False,
+        )
+        try:
+            expected = test_logger.get_conversation_id()
+            observed = executor.submit(test_logger.get_conversation_id).result(5)
+        finally:
+            test_logger.reset_conversation_id(token)
+            executor.shutdown()
+
+        self.assertIsNotNone(expected)
+        self.assertEqual(observed, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
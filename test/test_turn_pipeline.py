@@ -6,7 +6,9 @@ from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
 from ai import ChatCompletionResult
+from ai.settings import BUILT_IN_PROFILES
 from logger import configure_logging, get_logger
+from models import MetadataCategory
 from workflow.models import TurnInput
 from workflow import pipeline as workflow_pipeline
 from workflow.pipeline import TurnPipeline
@@ -52,10 +54,12 @@ class FakeAgent:
         self.strategy_tool_calls = []
         self.strategy_content: str | None = None
         self.prompts: list[str] = []
+        self.system_prompts: list[str | None] = []
 
     def run_prompt(self, **kwargs):
         prompt = kwargs.get("prompt", "")
         self.prompts.append(prompt)
+        self.system_prompts.append(kwargs.get("system_prompt"))
         stage_name = kwargs.get("stage_name", "PerceptionStage")
         if stage_name == "GapAnalysisStage":
             content = self.gap_content
@@ -175,12 +179,13 @@ class FakeDB:
         )
         return "retrieved lore"
 
-    def generate_text(self, prompt: str, stage_name: str = "ResponseStage") -> str:
+    def generate_text(self, prompt: str, stage_name: str = "ResponseStage", history_text: str | None = None) -> str:
         request_messages = list(self.messages)
         request_messages.append({"role": "user", "content": prompt})
 
         self.prompts.append(prompt)
-        self.messages = list(request_messages)
+        self.messages = list(self.messages)
+        self.messages.append({"role": "user", "content": history_text if history_text is not None else prompt})
         self.messages.append({"role": "assistant", "content": "npc reply"})
         test_logger.conversation_event(
             stage_name=stage_name,
@@ -209,6 +214,7 @@ class FakeCharacter:
         self.sentiment = "neutral"
         self.pl_list = "Helpful trader"
         self.ali_chat = "Welcome, traveler."
+        self.ai_settings = BUILT_IN_PROFILES["local"]
         self.agent = FakeAgent(
             tool_calls=tool_calls,
             gap_content=gap_content,
@@ -472,6 +478,43 @@ class TurnPipelineTests(unittest.TestCase):
         self.assertEqual(len(character.agent.prompts), 1)
         self.assertIn("Summarize only the immediate conversational state", character.agent.prompts[0])
 
+    def test_initial_context_durable_sections_are_reused_across_turns(self):
+        character = FakeCharacter()
+        pipeline = TurnPipeline(character)
+
+        pipeline.run(TurnInput(prompt="Hello there"))
+        pipeline.run(TurnInput(prompt="How is business?"))
+
+        self.assertEqual(character.db.stage_query_calls.get("InitialContextStage"), 2)
+
+    def test_initial_context_invalidation_rebuilds_only_dependent_sections(self):
+        character = FakeCharacter()
+        pipeline = TurnPipeline(character)
+        pipeline.initial_context_stage.run(TurnInput(prompt=""))
+
+        pipeline.initial_context_stage.invalidate(MetadataCategory.SENTIMENT)
+        pipeline.initial_context_stage.run(TurnInput(prompt=""))
+        self.assertEqual(character.db.stage_query_calls.get("InitialContextStage"), 3)
+
+        pipeline.initial_context_stage.invalidate()
+        pipeline.initial_context_stage.run(TurnInput(prompt=""))
+        self.assertEqual(character.db.stage_query_calls.get("InitialContextStage"), 5)
+
+    def test_initial_context_reads_live_sentiment_and_recent_turns(self):
+        character = FakeCharacter()
+        pipeline = TurnPipeline(character)
+        pipeline.initial_context_stage.run(TurnInput(prompt=""))
+
+        character.sentiment = "happy: The player paid well."
+        character.db.messages = [
+            {"role": "user", "content": "Here is your gold."},
+            {"role": "assistant", "content": "Much obliged."},
+        ]
+        initial_context = pipeline.initial_context_stage.run(TurnInput(prompt=""))
+
+        self.assertEqual(initial_context.sentiment, "happy: The player paid well.")
+        self.assertIn("Player: Here is your gold.", initial_context.recent_turns[0])
+
     def test_recent_conversation_state_flows_into_stage_prompts(self):
         character = FakeCharacter()
         character.db.messages = [
@@ -0,0 +1,179 @@
+import argparse
+import json
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+
+@dataclass
+class LoadedTrace:
+    header: dict[str, Any]
+    blobs: dict[str, Any] = field(default_factory=dict)
+    events: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    stage: str
+    status: str
+    duration_ms: float
+
+
+def load_trace(path: str | Path) -> LoadedTrace:
+    trace = LoadedTrace(header={})
+    with Path(path).open("r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip() == "":
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_number} is not a JSONL trace record; only JSONL traces are supported") from exc
+
+            record_type = record.get("type")
+            if record_type == "header":
+                trace.header = record
+            elif record_type == "blob":
+                trace.blobs[record["hash"]] = record["content"]
+            elif record_type == "event":
+                trace.events.append(record)
+    return trace
+
+
+def expand_blobs(value: Any, blobs: dict[str, Any]) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"$blob"}:
+            if value["$blob"] not in blobs:
+                return f"<missing blob {value['$blob']}>"
+            # Object blobs may reference smaller blobs stored before them.
+            return expand_blobs(blobs[value["$blob"]], blobs)
+        if set(value) == {"$parts"}:
+            return "\n\n".join(expand_blobs(part, blobs) for part in value["$parts"])
+        return {key: expand_blobs(item, blobs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_blobs(item, blobs) for item in value]
+    return value
+
+
+def filter_events(
+    events: Iterable[dict[str, Any]],
+    stage: str | None = None,
+    event: str | None = None,
+    status: str | None = None,
+) -> list[dict[str, Any]]:
+    return [
+        record for record in events
+        if (stage is None or record.get("stage") == stage)
+        and (event is None or record.get("event") == event)
+        and (status is None or record.get("status") == status)
+    ]
+
+
+def split_turns(events: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """Groups events into turns; each turn ends with the pipeline's final_response_output event."""
+    turns: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    for record in events:
+        current.append(record)
+        if record.get("stage") == "TurnPipeline" and record.get("event") == "final_response_output":
+            turns.append(current)
+            current = []
+    if len(current) > 0:
+        turns.append(current)
+    return turns
+
+
+def stage_timings(events: Iterable[dict[str, Any]]) -> list[StageTiming]:
+    """Pairs each stage_started event with the next completion or failure of the same stage."""
+    started: dict[str, list[datetime]] = {}
+    timings: list[StageTiming] = []
+    for record in events:
+        stage = record.get("stage", "")
+        name = record.get("event")
+        timestamp = datetime.fromisoformat(record["timestamp_utc"])
+        if name == "stage_started":
+            started.setdefault(stage, []).append(timestamp)
+        elif name in ("stage_completed", "stage_failed") and len(started.get(stage, [])) > 0:
+            began = started[stage].pop(0)
+            timings.append(StageTiming(
+                stage=stage,
+                status="ok" if name == "stage_completed" else "error",
+                duration_ms=(timestamp - began).total_seconds() * 1000,
+            ))
+    return timings
+
+
+def summarize_timings(timings: Iterable[StageTiming]) -> dict[str, dict[str, float]]:
+    durations: dict[str, list[float]] = {}
+    for timing in timings:
+        durations.setdefault(timing.stage, []).append(timing.duration_ms)
+
+    summary: dict[str, dict[str, float]] = {}
+    for stage, values in durations.items():
+        ordered = sorted(values)
+        summary[stage] = {
+            "count": len(ordered),
+            "mean_ms": round(statistics.fmean(ordered), 3),
+            "p50_ms": round(ordered[(len(ordered) - 1) // 2], 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+    return summary
+
+
+def rebuild_turn(trace: LoadedTrace, index: int) -> dict[str, Any]:
+    turns = split_turns(trace.events)
+    if index < 0 or index >= len(turns):
+        raise IndexError(f"Trace has {len(turns)} turns; turn {index} does not exist")
+
+    events = turns[index]
+    return {
+        "conversation_id": trace.header.get("conversation_id"),
+        "character_name": trace.header.get("character_name"),
+        "turn": index,
+        "timings_ms": {timing.stage: round(timing.duration_ms, 3) for timing in stage_timings(events)},
+        "events": [expand_blobs(record, trace.blobs) for record in events],
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect JSONL conversation traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    events_parser = commands.add_parser("events", help="Print matching events, one JSON object per line")
+    events_parser.add_argument("trace")
+    events_parser.add_argument("--stage")
+    events_parser.add_argument("--event")
+    events_parser.add_argument("--status")
+    events_parser.add_argument("--expand", action="store_true", help="Inline stored prompts and documents")
+
+    timings_parser = commands.add_parser("timings", help="Aggregate per-stage durations across traces")
+    timings_parser.add_argument("traces", nargs="+")
+
+    turn_parser = commands.add_parser("turn", help="Rebuild one turn with every prompt and response inlined")
+    turn_parser.add_argument("trace")
+    turn_parser.add_argument("index", type=int)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    if args.command == "events":
+        trace = load_trace(args.trace)
+        for record in filter_events(trace.events, stage=args.stage, event=args.event, status=args.status):
+            print(json.dumps(expand_blobs(record, trace.blobs) if args.expand else record, ensure_ascii=False))
+    elif args.command == "timings":
+        timings: list[StageTiming] = []
+        for path in args.traces:
+            timings.extend(stage_timings(load_trace(path).events))
+        print(json.dumps(summarize_timings(timings), indent=2))
+    elif args.command == "turn":
+        print(json.dumps(rebuild_turn(load_trace(args.trace), args.index), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
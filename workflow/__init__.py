@@ -1,3 +1,14 @@
+from workflow.executor import (
+    TurnExecutor,
+    TurnExecutorSaturatedError,
+    TurnExecutorStats,
+    configure_turn_executor,
+    fan_out,
+    get_turn_executor,
+    shutdown_turn_executor,
+    submit_fan_out,
+)
+from workflow.graph import StageGraph, StageGraphError, StageHooks, StageNode
 from workflow.pipeline import TurnPipeline
 from workflow.models import (
     TurnInput,
@@ -14,6 +25,18 @@ from workflow.models import (
 )
 
 __all__ = [
+    "TurnExecutor",
+    "TurnExecutorSaturatedError",
+    "TurnExecutorStats",
+    "configure_turn_executor",
+    "fan_out",
+    "get_turn_executor",
+    "shutdown_turn_executor",
+    "submit_fan_out",
+    "StageGraph",
+    "StageGraphError",
+    "StageHooks",
+    "StageNode",
     "TurnPipeline",
     "TurnInput",
     "InitialContext",
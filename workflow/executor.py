@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class TurnExecutorSaturatedError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class TurnExecutorStats:
+    max_workers: int
+    max_queue_depth: int
+    active: int
+    queued: int
+    peak_queued: int
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+
+
+class TurnExecutor:
+    """Runs blocking NPC work (pipeline turns, greetings, setup) on a bounded worker pool.
+
+    `max_queue_depth` is an admission limit: `admit` and `submit` reject work once that many items are
+    waiting, while `run`, used for the turns of conversations that were already admitted, always queues.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queue_depth: int = 0):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue_depth < 0:
+            raise ValueError("max_queue_depth must not be negative")
+
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="npc-turn")
+        self._lock = Lock()
+        self._active = 0
+        self._queued = 0
+        self._peak_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    async def admit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        future = self.submit(func, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        future = self._submit(func, args, kwargs, limited=False)
+        return await asyncio.wrap_future(future)
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        return self._submit(func, args, kwargs, limited=True)
+
+    def _submit(self, func: Callable[..., T], args: tuple[Any, ...], kwargs: dict[str, Any], limited: bool) -> Future:
+        with self._lock:
+            if limited and self.max_queue_depth > 0 and self._queued >= self.max_queue_depth:
+                self._rejected += 1
+                raise TurnExecutorSaturatedError(
+                    f"Turn queue is full ({self._queued} waiting, limit {self.max_queue_depth})"
+                )
+            self._queued += 1
+            self._submitted += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        # Copy the caller's context so the conversation trace id follows the work onto the worker thread.
+        context = contextvars.copy_context()
+        future = self._pool.submit(self._run_in_worker, context, func, args, kwargs)
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    def stats(self) -> TurnExecutorStats:
+        with self._lock:
+            return TurnExecutorStats(
+                max_workers=self.max_workers,
+                max_queue_depth=self.max_queue_depth,
+                active=self._active,
+                queued=self._queued,
+                peak_queued=self._peak_queued,
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                rejected=self._rejected,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run_in_worker(
+        self,
+        context: contextvars.Context,
+        func: Callable[..., T],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> T:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+
+        try:
+            result = context.run(func, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def _release_cancelled(self, future: Future) -> None:
+        # Work cancelled before a worker picked it up never reaches _run_in_worker.
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+
+_turn_executor: TurnExecutor | None = None
+_turn_executor_lock = Lock()
+_fan_out_pool: ThreadPoolExecutor | None = None
+DEFAULT_FAN_OUT_WORKERS = 16
+
+
+def _get_env_int(name: str, default: int) -> int:
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    return int(raw_value)
+
+
+def _create_turn_executor(max_workers: int | None, max_queue_depth: int | None) -> TurnExecutor:
+    resolved_workers = max_workers or _get_env_int("AIGAME_TURN_WORKERS", TurnExecutor.DEFAULT_MAX_WORKERS)
+    resolved_queue_depth = max_queue_depth if max_queue_depth is not None else _get_env_int("AIGAME_TURN_QUEUE_DEPTH", 0)
+    logger.info(
+        "Turn executor configured: max_workers=%s max_queue_depth=%s",
+        resolved_workers,
+        resolved_queue_depth,
+    )
+    return TurnExecutor(max_workers=resolved_workers, max_queue_depth=resolved_queue_depth)
+
+
+def configure_turn_executor(max_workers: int | None = None, max_queue_depth: int | None = None) -> TurnExecutor:
+    global _turn_executor
+    executor = _create_turn_executor(max_workers, max_queue_depth)
+
+    with _turn_executor_lock:
+        previous = _turn_executor
+        _turn_executor = executor
+
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+    return executor
+
+
+def get_turn_executor() -> TurnExecutor:
+    global _turn_executor
+    with _turn_executor_lock:
+        if _turn_executor is None:
+            _turn_executor = _create_turn_executor(None, None)
+        return _turn_executor
+
+
+def shutdown_turn_executor(wait: bool = True) -> None:
+    global _turn_executor, _fan_out_pool
+    with _turn_executor_lock:
+        executor = _turn_executor
+        _turn_executor = None
+        fan_out_pool = _fan_out_pool
+        _fan_out_pool = None
+
+    if executor is not None:
+        executor.shutdown(wait=wait)
+    if fan_out_pool is not None:
+        fan_out_pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _get_fan_out_pool() -> ThreadPoolExecutor:
+    global _fan_out_pool
+    with _turn_executor_lock:
+        if _fan_out_pool is None:
+            _fan_out_pool = ThreadPoolExecutor(
+                max_workers=_get_env_int("AIGAME_FAN_OUT_WORKERS", DEFAULT_FAN_OUT_WORKERS),
+                thread_name_prefix="npc-fan-out",
+            )
+        return _fan_out_pool
+
+
+def submit_fan_out(call: Callable[[], T]) -> Future:
+    """Schedules one call on the shared fan-out pool, carrying the caller's contextvars."""
+    return _get_fan_out_pool().submit(contextvars.copy_context().run, call)
+
+
+def fan_out(calls: dict[str, Callable[[], T]], timeout: float | None = None) -> dict[str, T]:
+    """Runs independent blocking calls concurrently and returns the results that finished within the timeout.
+
+    Calls run on a pool separate from the turn executor, so a turn worker can fan out without
+    waiting on its own queue. Keys missing from the result timed out; the first failure is re-raised.
+    """
+    futures = {key: submit_fan_out(call) for key, call in calls.items()}
+    done, not_done = wait(futures.values(), timeout=timeout)
+
+    for future in not_done:
+        future.cancel()
+
+    results: dict[str, T] = {}
+    for key, future in futures.items():
+        if future in done:
+            results[key] = future.result()
+
+    if len(not_done) > 0:
+        logger.warning(
+            "Fan-out deadline of %ss reached; %s of %s calls dropped: %s",
+            timeout,
+            len(not_done),
+            len(futures),
+            [key for key, future in futures.items() if future in not_done],
+        )
+
+    return results
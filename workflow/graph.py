@@ -0,0 +1,137 @@
+"""Dependency-ordered stage runner for TurnPipeline.
+
+Every built-in stage reads the output of the one before it, so there are no independent branches to
+overlap and nodes run one at a time on the calling thread. The graph is scaffolding for declaring stage
+inputs and outputs and for custom stages; concurrency within a turn happens inside the stages.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+StageValues = dict[str, Any]
+
+
+class StageGraphError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StageNode:
+    """One pipeline step: reads named values, runs, and publishes its result under one or more names.
+
+    A node with several outputs returns a tuple in the same order. When `condition` returns False the
+    node is skipped without logging and its single output is copied from the `passthrough` value.
+    """
+
+    name: str
+    run: Callable[[StageValues], Any]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    payload: Callable[[StageValues], Any] | None = None
+    summary: Callable[[Any], str] | None = None
+    trace_result: Callable[[Any], Any] | None = None
+    condition: Callable[[StageValues], bool] | None = None
+    passthrough: str | None = None
+
+
+@dataclass(frozen=True)
+class StageHooks:
+    on_start: Callable[[str, Any], None]
+    on_complete: Callable[[str, Any, str], None]
+    on_failure: Callable[[str, Exception, Any], None]
+    on_timing: Callable[[str, float, str], None] | None = None
+
+
+class StageGraph:
+    """Runs stage nodes one at a time, each as soon as its inputs exist, in the order they were declared."""
+
+    def __init__(self, nodes: Iterable[StageNode], initial_inputs: Iterable[str] = ()):
+        self.nodes = list(nodes)
+        self.initial_inputs = tuple(initial_inputs)
+        self._validate()
+
+    def with_node(self, node: StageNode) -> "StageGraph":
+        return StageGraph([*self.nodes, node], self.initial_inputs)
+
+    def run(self, values: StageValues, hooks: StageHooks) -> StageValues:
+        values = dict(values)
+        missing_inputs = [name for name in self.initial_inputs if name not in values]
+        if len(missing_inputs) > 0:
+            raise StageGraphError(f"Missing initial inputs: {missing_inputs}")
+
+        pending = list(self.nodes)
+        while len(pending) > 0:
+            node = next((node for node in pending if all(name in values for name in node.inputs)), None)
+            if node is None:
+                raise StageGraphError(f"Stages can never run: {[node.name for node in pending]}")
+            pending.remove(node)
+            self._publish(node, self._execute(node, values, hooks), values)
+
+        return values
+
+    def _execute(self, node: StageNode, values: StageValues, hooks: StageHooks) -> Any:
+        if node.condition is not None and not node.condition(values):
+            logger.debug("Skipping %s", node.name)
+            return values[node.passthrough] if node.passthrough is not None else None
+
+        payload = node.payload(values) if node.payload is not None else None
+        hooks.on_start(node.name, payload)
+        started_at = time.perf_counter()
+        try:
+            result = node.run(values)
+        except Exception as exc:
+            self._report_timing(hooks, node.name, started_at, "error")
+            hooks.on_failure(node.name, exc, payload)
+            raise
+
+        self._report_timing(hooks, node.name, started_at, "ok")
+
+        hooks.on_complete(
+            node.name,
+            node.trace_result(result) if node.trace_result is not None else result,
+            node.summary(result) if node.summary is not None else "",
+        )
+        return result
+
+    def _report_timing(self, hooks: StageHooks, name: str, started_at: float, status: str) -> None:
+        if hooks.on_timing is not None:
+            hooks.on_timing(name, time.perf_counter() - started_at, status)
+
+    def _publish(self, node: StageNode, result: Any, values: StageValues) -> None:
+        if len(node.outputs) == 1:
+            values[node.outputs[0]] = result
+            return
+
+        for name, value in zip(node.outputs, result):
+            values[name] = value
+
+    def _validate(self) -> None:
+        producers: dict[str, str] = {name: "<input>" for name in self.initial_inputs}
+        for node in self.nodes:
+            if node.condition is not None and (node.passthrough not in node.inputs or len(node.outputs) != 1):
+                raise StageGraphError(f"Conditional stage {node.name} needs a passthrough input and exactly one output")
+            for name in node.outputs:
+                if name in producers:
+                    raise StageGraphError(f"{node.name} and {producers[name]} both produce '{name}'")
+                producers[name] = node.name
+
+        for node in self.nodes:
+            unknown = [name for name in node.inputs if name not in producers]
+            if len(unknown) > 0:
+                raise StageGraphError(f"{node.name} depends on values nothing produces: {unknown}")
+
+        # Kahn's algorithm over value dependencies; anything left over sits on a cycle.
+        available = set(self.initial_inputs)
+        remaining = list(self.nodes)
+        while len(remaining) > 0:
+            runnable = [node for node in remaining if all(name in available for name in node.inputs)]
+            if len(runnable) == 0:
+                raise StageGraphError(f"Stage dependency cycle between {[node.name for node in remaining]}")
+            for node in runnable:
+                remaining.remove(node)
+                available.update(node.outputs)
@@ -1,9 +1,16 @@
+import time
+from typing import Callable
+
 from logger import get_logger
+from metrics import observe_stage_duration, observe_turn_duration
+from workflow.graph import StageGraph, StageHooks, StageNode, StageValues
 from workflow.models import TurnInput, TurnResult
+from workflow.policy import FastPathPolicy
 from workflow.stages import (
     AppraisalStage,
     GapAnalysisStage,
     InitialContextStage,
+    PerceptionGapStage,
     PerceptionStage,
     ResponseStage,
     RetrievalStage,
@@ -17,14 +24,17 @@ logger = get_logger(__name__)
 class TurnPipeline:
     def __init__(self, character):
         self.character = character
+        self.fast_path_policy = FastPathPolicy.for_character(character)
         self.initial_context_stage = InitialContextStage(character)
         self.perception_stage = PerceptionStage(character)
         self.gap_analysis_stage = GapAnalysisStage(character)
-        self.retrieval_stage = RetrievalStage(character)
+        self.perception_gap_stage = PerceptionGapStage(character)
+        self.retrieval_stage = RetrievalStage(character, fast_path_policy=self.fast_path_policy)
         self.appraisal_stage = AppraisalStage(character)
         self.strategy_stage = StrategyStage(character)
         self.response_stage = ResponseStage(character)
         self.terminal_update_stage = TerminalUpdateStage(character)
+        self.graph = StageGraph(self.build_stage_nodes(), initial_inputs=("turn_input", "on_delta"))
 
     def _log_stage_start(self, stage_name: str, payload) -> None:
         logger.verbose("%s started", stage_name)
@@ -52,144 +62,213 @@ class TurnPipeline:
             status="error",
         )
 
-    def run(self, turn_input: TurnInput) -> TurnResult:
-        stage_name = "InitialContextStage"
-        stage_payload = turn_input
-        try:
-            self._log_stage_start(stage_name, stage_payload)
-            initial_context = self.initial_context_stage.run(turn_input)
-            self._log_stage_completion(
-                stage_name,
-                initial_context,
-                f"relationship_summary={initial_context.relationship_summary != ''}, active_goals={len(initial_context.active_goals)}",
-            )
+    def uses_combined_perception(self) -> bool:
+        return self.character.ai_settings.perception_mode == "combined"
 
-            stage_name = "PerceptionStage"
-            stage_payload = {"prompt": turn_input.prompt}
-            self._log_stage_start(stage_name, stage_payload)
-            perception = self.perception_stage.run(turn_input, initial_context)
-            self._log_stage_completion(
-                stage_name,
-                perception,
-                f"tool_calls={len(perception.tool_calls)}, raw_prompt_length={len(perception.raw_prompt)}",
-            )
+    def build_perception_nodes(self) -> list[StageNode]:
+        if self.uses_combined_perception():
+            return [
+                StageNode(
+                    name="PerceptionGapStage",
+                    run=lambda values: self.perception_gap_stage.run(values["turn_input"], values["initial_context"]),
+                    inputs=("turn_input", "initial_context"),
+                    outputs=("perception", "gap_analysis"),
+                    payload=lambda values: {"prompt": values["turn_input"].prompt},
+                    summary=lambda result: f"{self._summarize_perception(result[0])}, gap_tool_calls={len(result[1].tool_calls)}",
+                    trace_result=lambda result: {"perception": result[0], "gap_analysis": result[1]},
+                ),
+            ]
 
-            stage_name = "GapAnalysisStage"
-            stage_payload = perception
-            self._log_stage_start(stage_name, stage_payload)
-            gap_analysis = self.gap_analysis_stage.run(perception)
-            self._log_stage_completion(
-                stage_name,
-                gap_analysis,
-                f"tool_calls={len(gap_analysis.tool_calls)}",
-            )
+        return [
+            StageNode(
+                name="PerceptionStage",
+                run=lambda values: self.perception_stage.run(values["turn_input"], values["initial_context"]),
+                inputs=("turn_input", "initial_context"),
+                outputs=("perception",),
+                payload=lambda values: {"prompt": values["turn_input"].prompt},
+                summary=self._summarize_perception,
+            ),
+            StageNode(
+                name="GapAnalysisStage",
+                run=lambda values: self.gap_analysis_stage.run(values["perception"]),
+                inputs=("perception",),
+                outputs=("gap_analysis",),
+                payload=lambda values: values["perception"],
+                summary=lambda gap_analysis: f"tool_calls={len(gap_analysis.tool_calls)}",
+            ),
+        ]
 
-            stage_name = "RetrievalStage.run"
-            stage_payload = gap_analysis
-            self._log_stage_start(stage_name, stage_payload)
-            retrieved_context = self.retrieval_stage.run(perception, gap_analysis)
-            self._log_stage_completion(
-                stage_name,
-                retrieved_context,
-                f"combined_context_length={len(retrieved_context.combined_context)}",
-            )
-
-            if len(gap_analysis.tool_calls) > 0:
-                stage_name = "PerceptionStage.reinterpret"
-                stage_payload = {
-                    "prompt": perception.raw_prompt,
-                    "retrieved_context_length": len(retrieved_context.combined_context),
-                }
-                self._log_stage_start(stage_name, stage_payload)
-                perception = self.perception_stage.run(
-                    turn_input,
-                    initial_context,
-                    retrieved_context=retrieved_context,
-                    stage_name=stage_name,
-                )
-                self._log_stage_completion(
-                    stage_name,
-                    perception,
-                    f"tool_calls={len(perception.tool_calls)}, raw_prompt_length={len(perception.raw_prompt)}",
-                )
-
-            stage_name = "AppraisalStage"
-            stage_payload = perception
-            self._log_stage_start(stage_name, stage_payload)
-            appraisal, emotion = self.appraisal_stage.run(initial_context, perception, retrieved_context)
-            self._log_stage_completion(
-                stage_name,
-                {"appraisal": appraisal, "emotion": emotion},
-                f"appraisal_relevance={appraisal.relevance}, emotion={emotion.primary}:{emotion.intensity}",
-            )
+    def build_stage_nodes(self) -> list[StageNode]:
+        # Nodes look stages up on self at call time, so a replaced or patched stage is picked up.
+        # Each built-in stage reads the one before it, so these nodes run as a chain.
+        return [
+            StageNode(
+                name="InitialContextStage",
+                run=lambda values: self.initial_context_stage.run(values["turn_input"]),
+                inputs=("turn_input",),
+                outputs=("initial_context",),
+                payload=lambda values: values["turn_input"],
+                summary=lambda initial_context: (
+                    f"relationship_summary={initial_context.relationship_summary != ''}, "
+                    f"active_goals={len(initial_context.active_goals)}"
+                ),
+            ),
+            *self.build_perception_nodes(),
+            StageNode(
+                name="RetrievalStage.run",
+                run=lambda values: self.retrieval_stage.run(values["perception"], values["gap_analysis"]),
+                inputs=("perception", "gap_analysis"),
+                outputs=("retrieved_context",),
+                payload=lambda values: values["gap_analysis"],
+                summary=lambda retrieved_context: f"combined_context_length={len(retrieved_context.combined_context)}",
+            ),
+            StageNode(
+                name="PerceptionStage.reinterpret",
+                run=lambda values: self.perception_stage.run(
+                    values["turn_input"],
+                    values["initial_context"],
+                    retrieved_context=values["retrieved_context"],
+                    stage_name="PerceptionStage.reinterpret",
+                ),
+                inputs=("turn_input", "initial_context", "perception", "gap_analysis", "retrieved_context"),
+                outputs=("final_perception",),
+                payload=lambda values: {
+                    "prompt": values["perception"].raw_prompt,
+                    "retrieved_context_length": len(values["retrieved_context"].combined_context),
+                },
+                summary=self._summarize_perception,
+                condition=lambda values: (
+                    len(values["gap_analysis"].tool_calls) > 0
+                    and self.fast_path_policy.should_reinterpret(values["perception"], values["retrieved_context"])
+                ),
+                passthrough="perception",
+            ),
+            StageNode(
+                name="AppraisalStage",
+                run=lambda values: self.appraisal_stage.run(
+                    values["initial_context"],
+                    values["final_perception"],
+                    values["retrieved_context"],
+                ),
+                inputs=("initial_context", "final_perception", "retrieved_context"),
+                outputs=("appraisal", "emotion"),
+                payload=lambda values: values["final_perception"],
+                summary=lambda result: f"appraisal_relevance={result[0].relevance}, emotion={result[1].primary}:{result[1].intensity}",
+                trace_result=lambda result: {"appraisal": result[0], "emotion": result[1]},
+            ),
+            StageNode(
+                name="StrategyStage",
+                run=lambda values: self.strategy_stage.run(
+                    values["initial_context"],
+                    values["final_perception"],
+                    values["retrieved_context"],
+                    values["appraisal"],
+                    values["emotion"],
+                ),
+                inputs=("initial_context", "final_perception", "retrieved_context", "appraisal", "emotion"),
+                outputs=("strategy",),
+                payload=lambda values: {
+                    "prompt": values["final_perception"].raw_prompt,
+                    "appraisal": values["appraisal"],
+                    "emotion": values["emotion"],
+                },
+                summary=lambda strategy: f"goal={strategy.conversation_goal}, actions={','.join(strategy.immediate_actions)}",
+            ),
+            StageNode(
+                name="ResponseStage",
+                run=self._run_response_stage,
+                inputs=("initial_context", "final_perception", "retrieved_context", "appraisal", "emotion", "strategy", "on_delta"),
+                outputs=("response",),
+                payload=lambda values: {"prompt": values["final_perception"].raw_prompt},
+                summary=lambda response: f"reply_length={len(response.reply)}",
+            ),
+            StageNode(
+                name="TerminalUpdateStage",
+                run=lambda values: self.terminal_update_stage.run(
+                    values["initial_context"],
+                    values["final_perception"],
+                    values["retrieved_context"],
+                    values["appraisal"],
+                    values["emotion"],
+                    values["strategy"],
+                    values["response"],
+                ),
+                inputs=("initial_context", "final_perception", "retrieved_context", "appraisal", "emotion", "strategy", "response"),
+                outputs=("terminal_update",),
+                payload=lambda values: values["response"],
+                summary=lambda terminal_update: (
+                    f"immediate_actions={','.join(terminal_update.immediate_actions)}, "
+                    f"store_memory={terminal_update.store_memory}"
+                ),
+            ),
+        ]
 
-            stage_name = "StrategyStage"
-            stage_payload = {"prompt": perception.raw_prompt, "appraisal": appraisal, "emotion": emotion}
-            self._log_stage_start(stage_name, stage_payload)
-            strategy = self.strategy_stage.run(initial_context, perception, retrieved_context, appraisal, emotion)
-            self._log_stage_completion(
-                stage_name,
-                strategy,
-                f"goal={strategy.conversation_goal}, actions={','.join(strategy.immediate_actions)}",
-            )
+    def add_stage(self, node: StageNode) -> None:
+        """Adds a custom stage; it runs once its inputs exist, after any earlier stage that is also ready."""
+        self.graph = self.graph.with_node(node)
 
-            stage_name = "ResponseStage"
-            stage_payload = {"prompt": perception.raw_prompt}
-            self._log_stage_start(stage_name, stage_payload)
-            response = self.response_stage.run(initial_context, perception, retrieved_context, appraisal, emotion, strategy)
-            self._log_stage_completion(
-                stage_name,
-                response,
-                f"reply_length={len(response.reply)}",
-            )
+    def _summarize_perception(self, perception) -> str:
+        return f"tool_calls={len(perception.tool_calls)}, raw_prompt_length={len(perception.raw_prompt)}"
 
-            stage_name = "TerminalUpdateStage"
-            stage_payload = response
-            self._log_stage_start(stage_name, stage_payload)
-            terminal_update = self.terminal_update_stage.run(
-                initial_context,
-                perception,
-                retrieved_context,
-                appraisal,
-                emotion,
-                strategy,
-                response,
-            )
-            self._log_stage_completion(
-                stage_name,
-                terminal_update,
-                f"immediate_actions={','.join(terminal_update.immediate_actions)}, store_memory={terminal_update.store_memory}",
-            )
+    def _run_response_stage(self, values: StageValues):
+        stage_args = (
+            values["initial_context"],
+            values["final_perception"],
+            values["retrieved_context"],
+            values["appraisal"],
+            values["emotion"],
+            values["strategy"],
+        )
+        if values["on_delta"] is None:
+            return self.response_stage.run(*stage_args)
+        return self.response_stage.run(*stage_args, on_delta=values["on_delta"])
 
-            logger.conversation_event(
-                stage_name="TurnPipeline",
-                event="final_response_output",
-                payload={
-                    "reply": response.reply,
-                    "external_actions": terminal_update.external_actions,
-                    "store_memory": terminal_update.store_memory,
-                },
-                result={
-                    "appraisal": appraisal,
-                    "emotion": emotion,
-                    "response": response,
-                    "terminal_update": terminal_update,
-                },
+    def run(self, turn_input: TurnInput, on_delta: Callable[[str], None] | None = None) -> TurnResult:
+        started_at = time.perf_counter()
+        try:
+            values = self.graph.run(
+                {"turn_input": turn_input, "on_delta": on_delta},
+                StageHooks(
+                    on_start=self._log_stage_start,
+                    on_complete=self._log_stage_completion,
+                    on_failure=self._log_stage_failure,
+                    on_timing=observe_stage_duration,
+                ),
             )
-        except Exception as exc:
-            self._log_stage_failure(stage_name, exc, stage_payload)
+        except Exception:
+            observe_turn_duration(time.perf_counter() - started_at, "error")
             raise
+        observe_turn_duration(time.perf_counter() - started_at, "ok")
+
+        response = values["response"]
+        terminal_update = values["terminal_update"]
+
+        logger.conversation_event(
+            stage_name="TurnPipeline",
+            event="final_response_output",
+            payload={
+                "reply": response.reply,
+                "external_actions": terminal_update.external_actions,
+                "store_memory": terminal_update.store_memory,
+            },
+            result={
+                "appraisal": values["appraisal"],
+                "emotion": values["emotion"],
+                "response": response,
+                "terminal_update": terminal_update,
+            },
+        )
 
         logger.debug("Turn pipeline completed for %s", self.character.name)
 
         return TurnResult(
-            initial_context=initial_context,
-            perception=perception,
-            gap_analysis=gap_analysis,
-            retrieved_context=retrieved_context,
-            appraisal=appraisal,
-            emotion=emotion,
-            strategy=strategy,
+            initial_context=values["initial_context"],
+            perception=values["final_perception"],
+            gap_analysis=values["gap_analysis"],
+            retrieved_context=values["retrieved_context"],
+            appraisal=values["appraisal"],
+            emotion=values["emotion"],
+            strategy=values["strategy"],
             response=response,
             terminal_update=terminal_update,
         )
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from threading import Lock
+
+from ai.settings import DEFAULT_FAST_PATH, FastPathConfig
+from logger import get_logger
+from workflow.models import PerceptionResult, RetrievedContext
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class FastPathStats:
+    reinterpret_run: int
+    reinterpret_skipped: int
+    summarize_run: int
+    summarize_skipped: int
+
+
+class FastPathCounters:
+    def __init__(self):
+        self._lock = Lock()
+        self._counts = {
+            "reinterpret_run": 0,
+            "reinterpret_skipped": 0,
+            "summarize_run": 0,
+            "summarize_skipped": 0,
+        }
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> FastPathStats:
+        with self._lock:
+            return FastPathStats(**self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+
+
+_fast_path_counters = FastPathCounters()
+
+
+def get_fast_path_counters() -> FastPathCounters:
+    return _fast_path_counters
+
+
+class FastPathPolicy:
+    """Decides per turn whether the optional reinterpretation and retrieval-summary LLM calls are worth running.
+
+    With the policy disabled both calls always run, matching the pipeline's original behaviour.
+    """
+
+    def __init__(self, config: FastPathConfig = DEFAULT_FAST_PATH, counters: FastPathCounters | None = None):
+        self.config = config
+        self.counters = counters or _fast_path_counters
+
+    @classmethod
+    def for_character(cls, character) -> "FastPathPolicy":
+        return cls(character.ai_settings.fast_path)
+
+    def should_reinterpret(self, perception: PerceptionResult, retrieved_context: RetrievedContext) -> bool:
+        decision = self._reinterpret_decision(perception, retrieved_context)
+        self.counters.record("reinterpret_run" if decision else "reinterpret_skipped")
+        return decision
+
+    def should_summarize(self, perception: PerceptionResult, raw_context: str) -> bool:
+        decision = self._summarize_decision(perception, raw_context)
+        self.counters.record("summarize_run" if decision else "summarize_skipped")
+        return decision
+
+    def _reinterpret_decision(self, perception: PerceptionResult, retrieved_context: RetrievedContext) -> bool:
+        if not self.config.enabled:
+            return True
+        if retrieved_context.combined_context == "no information":
+            logger.debug("Fast path: skipping reinterpretation, retrieval found nothing")
+            return False
+        if self._needs_careful_reading(perception):
+            return True
+        if perception.confidence < self.config.reinterpret_min_confidence:
+            return True
+        if len(retrieved_context.combined_context) > self.config.reinterpret_max_context_chars:
+            return True
+
+        logger.debug(
+            "Fast path: skipping reinterpretation (confidence=%s, context_chars=%s)",
+            perception.confidence,
+            len(retrieved_context.combined_context),
+        )
+        return False
+
+    def _summarize_decision(self, perception: PerceptionResult, raw_context: str) -> bool:
+        if not self.config.enabled:
+            return True
+        if perception.topic_sensitivity != "normal":
+            return True
+
+        snippet_count = len([line for line in raw_context.split("\n") if line.strip() != ""])
+        if len(raw_context) > self.config.summary_max_context_chars or snippet_count > self.config.summary_max_snippets:
+            return True
+
+        logger.debug("Fast path: using raw retrieved context (%s chars, %s snippets)", len(raw_context), snippet_count)
+        return False
+
+    def _needs_careful_reading(self, perception: PerceptionResult) -> bool:
+        return (
+            perception.is_ambiguous
+            or perception.threat_signal != "none"
+            or perception.manipulation_signal != "none"
+            or perception.topic_sensitivity != "normal"
+        )
@@ -2,6 +2,7 @@ from workflow.stages.base import LLMStage, Stage
 from workflow.stages.appraisal_stage import AppraisalStage
 from workflow.stages.gap_analysis_stage import GapAnalysisStage
 from workflow.stages.initial_context_stage import InitialContextStage
+from workflow.stages.perception_gap_stage import PerceptionGapStage
 from workflow.stages.perception_stage import PerceptionStage
 from workflow.stages.response_stage import ResponseStage
 from workflow.stages.retrieval_stage import RetrievalStage
@@ -14,6 +15,7 @@ __all__ = [
     "AppraisalStage",
     "GapAnalysisStage",
     "InitialContextStage",
+    "PerceptionGapStage",
     "PerceptionStage",
     "ResponseStage",
     "RetrievalStage",
@@ -17,7 +17,7 @@ class AppraisalStage(LLMStage):
     ) -> str:
         return format_prompt(
             "Evaluate what the final perceived player message means for this NPC, then derive the immediate emotional reaction. Do not generate dialogue or a response strategy.",
-            [
+            self.layout_sections([
                 ("Player input", perception.raw_prompt),
                 (
                     "Final perception",
@@ -73,7 +73,8 @@ class AppraisalStage(LLMStage):
                     ]),
                 ),
                 ("Expected result", "Return only valid JSON matching the shown structure. Do not return markdown, prose, explanations, or code fences."),
-            ],
+            ]),
+            budget=self.prompt_budget(initial_context),
         )
 
     def run(
@@ -87,6 +88,7 @@ class AppraisalStage(LLMStage):
         response = self.character.agent.run_prompt(
             prompt=stage_prompt,
             stage_name="AppraisalStage",
+            system_prompt=self.system_prompt(initial_context),
             payload={
                 "input_prompt": perception.raw_prompt,
                 "stage_prompt": stage_prompt,
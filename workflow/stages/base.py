@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from dataclasses import replace
+
+from ai import AISettings
+from ai.tokens import estimate_tokens
+from workflow.models import InitialContext
+from workflow.stages.prompting import PromptBudget, format_static_prefix, resolve_prompt_budget, without_static_sections
 
 
 class Stage(ABC):
@@ -7,6 +13,30 @@ class Stage(ABC):
 
 
 class LLMStage(Stage, ABC):
+    # Settings role of the model this stage's prompt is sent to; its max_prompt_tokens caps the prompt.
+    model_role = "decision_llm"
+
     @abstractmethod
     def get_prompt(self, *args, **kwargs) -> str:
         """Build the stage-owned prompt passed to the decision model."""
+
+    def settings(self) -> AISettings:
+        return self.character.ai_settings
+
+    def prompt_budget(self, initial_context: InitialContext | None = None) -> PromptBudget:
+        """Budget for the stage prompt; pass `initial_context` when the prompt is sent with the stable prefix."""
+        budget = resolve_prompt_budget(self.settings(), type(self).__name__, self.model_role)
+        prefix = self.system_prompt(initial_context) if initial_context is not None else None
+        if prefix is None:
+            return budget
+        return replace(budget, reserved_tokens=estimate_tokens(prefix))
+
+    def uses_stable_prefix(self) -> bool:
+        return self.settings().prompt_layout == "stable_prefix"
+
+    def layout_sections(self, sections: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """Leaves character data out of the stage prompt when it is sent as the shared system prefix."""
+        return without_static_sections(sections) if self.uses_stable_prefix() else sections
+
+    def system_prompt(self, initial_context: InitialContext) -> str | None:
+        return format_static_prefix(initial_context) if self.uses_stable_prefix() else None
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Callable
 
 from logger import get_logger
 from workflow.models import GapAnalysisResult, PerceptionResult
@@ -22,17 +22,10 @@ class GapAnalysisStage(LLMStage):
                 ("Manipulation signal", perception.manipulation_signal),
                 ("Topic sensitivity", perception.topic_sensitivity),
                 ("Perception-stage tool context", self.describe_tool_calls(perception.tool_calls)),
-                (
-                    "Tool usage rules",
-                    "\n".join([
-                        "If more context is needed, call the relevant retrieval tools directly.",
-                        "Tool calls should reflect the concrete context collection needed for downstream retrieval.",
-                        "Only call tools when retrieval is actually required.",
-                        "Only use tools that retrieve additional context such as memory, relationship history, knowledge, or social context.",
-                    ]),
-                ),
+                ("Tool usage rules", self.get_tool_usage_rules()),
                 ("Output rules", "No structured text output is required. The tool calls are the decision payload."),
             ],
+            budget=self.prompt_budget(),
         )
 
     def run(self, perception: PerceptionResult) -> GapAnalysisResult:
@@ -40,12 +33,7 @@ class GapAnalysisStage(LLMStage):
         stage_prompt = self.get_prompt(perception)
         response = self.character.agent.run_prompt(
             prompt=stage_prompt,
-            tools=[
-                self.recall_memory,
-                self.recall_relationship,
-                self.recall_knowledge,
-                self.evaluate_social_context,
-            ],
+            tools=self.get_tools(),
             stage_name="GapAnalysisStage",
             payload={
                 "input_prompt": perception.raw_prompt,
@@ -54,6 +42,22 @@ class GapAnalysisStage(LLMStage):
         )
         return GapAnalysisResult(tool_calls=list(response.tool_calls))
 
+    def get_tool_usage_rules(self) -> str:
+        return "\n".join([
+            "If more context is needed, call the relevant retrieval tools directly.",
+            "Tool calls should reflect the concrete context collection needed for downstream retrieval.",
+            "Only call tools when retrieval is actually required.",
+            "Only use tools that retrieve additional context such as memory, relationship history, knowledge, or social context.",
+        ])
+
+    def get_tools(self) -> list[Callable]:
+        return [
+            self.recall_memory,
+            self.recall_relationship,
+            self.recall_knowledge,
+            self.evaluate_social_context,
+        ]
+
     def describe_tool_calls(self, tool_calls: list[Any]) -> str:
         if len(tool_calls) == 0:
             return "No tool calls were proposed during perception."
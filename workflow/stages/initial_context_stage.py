@@ -1,5 +1,8 @@
+from typing import Any, Callable
+
 from logger import get_logger
 from models import MetadataCategory
+from workflow.executor import fan_out
 from workflow.models import InitialContext, TurnInput
 from workflow.stages.base import Stage
 
@@ -9,22 +12,95 @@ logger = get_logger(__name__)
 class InitialContextStage(Stage):
     MAX_RECENT_MESSAGES = 6
     RAW_RECENT_TURN_CHAR_LIMIT = 500
+    # Durable sections are cached for the conversation and only rebuilt once a write touches one of these categories.
+    CACHED_SECTION_CATEGORIES = {
+        "relationship_summary": {MetadataCategory.RELATIONS, MetadataCategory.SENTIMENT},
+        "active_goals": {MetadataCategory.GOAL, MetadataCategory.KNOWLEDGE},
+        "belief_state": {MetadataCategory.BELIEF},
+    }
+
+    def __init__(self, character):
+        super().__init__(character)
+        self.cached_sections: dict[str, Any] = {}
 
     def run(self, turn_input: TurnInput) -> InitialContext:
         logger.verbose("Building initial context for %s", self.character.name)
+        section_builders = {
+            "retrieved_sections": self.build_retrieved_sections,
+            "recent_turns": self.get_recent_turns,
+            "belief_state": lambda: list(self.get_cached_section("belief_state", self.get_belief_state)),
+        }
+        if all(section in self.cached_sections for section in self.CACHED_SECTION_CATEGORIES):
+            sections = {name: build() for name, build in section_builders.items()}
+        else:
+            # The vector-store lookups and the recent-turn summary do not depend on each other.
+            sections = fan_out(section_builders)
+        relationship_summary, active_goals = sections["retrieved_sections"]
+
         return InitialContext(
             character_name=self.character.name,
             situation=self.character.situation,
             sentiment=self.character.sentiment,
             character_definition=self.character.pl_list,
             example_dialogues=self.character.ali_chat,
-            relationship_summary=self.build_relationship_summary(),
-            active_goals=self.get_active_goals(),
-            recent_turns=self.get_recent_turns(),
-            belief_state=self.get_belief_state(),
+            relationship_summary=relationship_summary,
+            active_goals=active_goals,
+            recent_turns=sections["recent_turns"],
+            belief_state=sections["belief_state"],
         )
 
-    def build_relationship_summary(self) -> str:
+    def build_retrieved_sections(self) -> tuple[str, list[str]]:
+        self.prefetch_retrieved_sections()
+        return (
+            self.get_cached_section("relationship_summary", self.build_relationship_summary),
+            list(self.get_cached_section("active_goals", self.get_active_goals)),
+        )
+
+    def get_cached_section(self, section: str, build: Callable[[], Any]) -> Any:
+        if section not in self.cached_sections:
+            self.cached_sections[section] = build()
+        else:
+            logger.debug("Reusing cached %s for %s", section, self.character.name)
+        return self.cached_sections[section]
+
+    def invalidate(self, category: MetadataCategory | None = None) -> None:
+        if category is None:
+            self.cached_sections.clear()
+            return
+
+        for section, categories in self.CACHED_SECTION_CATEGORIES.items():
+            if category in categories:
+                self.cached_sections.pop(section, None)
+
+    def prefetch_retrieved_sections(self) -> None:
+        """Fills uncached vector-store sections with one batched query when the db supports it."""
+        if not hasattr(self.character.db, "query_text_many"):
+            return
+
+        pending: dict[str, tuple[str, dict[str, Any]]] = {}
+        if "relationship_summary" not in self.cached_sections:
+            pending["relationship_summary"] = self.get_relationship_query()
+        if "active_goals" not in self.cached_sections:
+            stored_goals = self.get_stored_goals()
+            if len(stored_goals) > 0:
+                self.cached_sections["active_goals"] = stored_goals
+            else:
+                pending["active_goals"] = self.get_goal_query()
+
+        if len(pending) < 2:
+            return
+
+        sections = list(pending)
+        texts = self.character.db.query_text_many(
+            prompts=[pending[section][0] for section in sections],
+            filters=[pending[section][1] for section in sections],
+            stage_name="InitialContextStage",
+        )
+        section_texts = dict(zip(sections, texts))
+        self.cached_sections["relationship_summary"] = self.format_relationship_summary(section_texts["relationship_summary"])
+        self.cached_sections["active_goals"] = self.format_goal_summary(section_texts["active_goals"])
+
+    def get_relationship_query(self) -> tuple[str, dict[str, Any]]:
         prompt = (
             f"What is {self.character.name}'s relationship to the player? "
             "Recall relevant relationship history, social context, and current sentiment."
@@ -35,22 +111,43 @@ class InitialContextStage(Stage):
                 self.character.get_sentiment_filter(),
             ]
         }
+        return prompt, filter_value
+
+    def build_relationship_summary(self) -> str:
+        prompt, filter_value = self.get_relationship_query()
         relation_summary = self.character.db.query_text(
             prompt=prompt,
             filter=filter_value,
             stage_name="InitialContextStage",
-        ).strip()
+        )
+        return self.format_relationship_summary(relation_summary)
+
+    def format_relationship_summary(self, relation_summary: str) -> str:
+        relation_summary = relation_summary.strip()
         if relation_summary == "":
             return ""
 
         return "Relationship to player:\n" + relation_summary
 
-    def get_active_goals(self) -> list[str]:
+    def get_stored_goals(self) -> list[str]:
         if hasattr(self.character, "get_character_documents"):
-            stored_goals = self.character.get_character_documents(MetadataCategory.GOAL)
-            if len(stored_goals) > 0:
-                return stored_goals
+            return self.character.get_character_documents(MetadataCategory.GOAL)
+        return []
+
+    def get_active_goals(self) -> list[str]:
+        stored_goals = self.get_stored_goals()
+        if len(stored_goals) > 0:
+            return stored_goals
+
+        prompt, filter_value = self.get_goal_query()
+        goal_summary = self.character.db.query_text(
+            prompt=prompt,
+            filter=filter_value,
+            stage_name="InitialContextStage",
+        )
+        return self.format_goal_summary(goal_summary)
 
+    def get_goal_query(self) -> tuple[str, dict[str, Any]]:
         prompt = (
             f"Summarize {self.character.name}'s core values, morality, short term goals, "
             "mid term goals, and long term goals based only on the retrieved character knowledge. "
@@ -69,11 +166,10 @@ class InitialContextStage(Stage):
                 },
             ]
         }
-        goal_summary = self.character.db.query_text(
-            prompt=prompt,
-            filter=filter_value,
-            stage_name="InitialContextStage",
-        ).strip()
+        return prompt, filter_value
+
+    def format_goal_summary(self, goal_summary: str) -> list[str]:
+        goal_summary = goal_summary.strip()
         if goal_summary == "":
             return []
 
@@ -0,0 +1,61 @@
+from logger import get_logger
+from workflow.models import GapAnalysisResult, InitialContext, PerceptionResult, TurnInput
+from workflow.stages.base import LLMStage
+from workflow.stages.gap_analysis_stage import GapAnalysisStage
+from workflow.stages.perception_stage import PerceptionStage
+from workflow.stages.prompting import format_prompt
+
+logger = get_logger(__name__)
+
+
+class PerceptionGapStage(LLMStage):
+    """Perception and gap analysis in one decision call: the perception JSON as content, retrieval as tool calls."""
+
+    def __init__(self, character):
+        super().__init__(character)
+        self.perception_stage = PerceptionStage(character)
+        self.gap_analysis_stage = GapAnalysisStage(character)
+
+    def get_prompt(self, turn_input: TurnInput, initial_context: InitialContext) -> str:
+        return format_prompt(
+            " ".join([
+                self.perception_stage.get_title(initial_context),
+                "In the same reply, decide whether the NPC still has knowledge gaps before answering and express any needed retrieval through the provided tools.",
+            ]),
+            self.layout_sections([
+                *self.perception_stage.get_sections(turn_input, initial_context),
+                ("Tool usage rules", self.gap_analysis_stage.get_tool_usage_rules()),
+                (
+                    "Output rules",
+                    "\n".join([
+                        "Return the perception JSON object as the message content.",
+                        "Retrieval decisions go in tool calls alongside that content, never inside the JSON.",
+                        "If no retrieval is needed, do not call any tools.",
+                    ]),
+                ),
+            ]),
+            budget=self.prompt_budget(initial_context),
+        )
+
+    def run(self, turn_input: TurnInput, initial_context: InitialContext) -> tuple[PerceptionResult, GapAnalysisResult]:
+        logger.verbose("Running combined perception and gap analysis for prompt length=%s", len(turn_input.prompt))
+        stage_prompt = self.get_prompt(turn_input, initial_context)
+        response = self.character.agent.run_prompt(
+            prompt=stage_prompt,
+            tools=self.gap_analysis_stage.get_tools(),
+            stage_name="PerceptionGapStage",
+            system_prompt=self.system_prompt(initial_context),
+            payload={
+                "input_prompt": turn_input.prompt,
+                "stage_prompt": stage_prompt,
+            },
+        )
+        gap_analysis = GapAnalysisResult(tool_calls=list(response.tool_calls))
+        parsed_response = self.character.agent.parse_output(response.content or "", fallback={})
+
+        if len(parsed_response) == 0:
+            # Some models return only tool calls when tools are offered; keep those and ask for perception alone.
+            logger.warning("Combined perception call returned no perception JSON; running perception separately")
+            return self.perception_stage.run(turn_input, initial_context), gap_analysis
+
+        return self.perception_stage.build_result(turn_input, stage_prompt, parsed_response), gap_analysis
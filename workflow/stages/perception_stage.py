@@ -14,49 +14,61 @@ class PerceptionStage(LLMStage):
         retrieved_context: RetrievedContext | None = None,
     ) -> str:
         return format_prompt(
-            f"You are simulating how the NPC {initial_context.character_name} perceives the player's latest message. Do not generate dialogue. Analyze the player's prompt from this NPC's perspective so downstream stages can act on that perception. Evaluate the message through this character's personality, knowledge, sentiment, and social awareness, and only infer signals this character would realistically notice or understand. Reflect on whether this NPC is perceptive enough to recognize subtle manipulation, threat, ambiguity, or emotional subtext rather than assuming perfect insight.",
-            [
-                ("Situation", initial_context.situation),
-                ("Current sentiment towards player", initial_context.sentiment),
-                ("Character definition", initial_context.character_definition),
-                ("Example dialogues", initial_context.example_dialogues),
-                (
-                    "Relevant relationship and goals",
-                    "\n".join([
-                        initial_context.relationship_summary,
-                        "Active goals: " + ", ".join(initial_context.active_goals) if len(initial_context.active_goals) > 0 else "",
-                    ]).strip(),
-                ),
-                (
-                    "Recent conversation state",
-                    "\n".join(initial_context.recent_turns),
-                ),
-                (
-                    "Decision rubric",
-                    "\n".join([
-                        "Analyze the player's message and infer player_intent as a concise description of what the player is trying to achieve, or unknown if it cannot be determined.",
-                        "Summarize what the NPC subjectively believes is happening in summary.",
-                        "Represent perceived_intent, perceived_attitude, relevant_topics, and target as compact arrays of labels.",
-                        "Set confidence from 0.0 to 1.0 based on how strongly the NPC can support this interpretation from the available stimulus and context.",
-                        "Analyze the player's message and infer player_emotion, defaulting to neutral when no strong emotional signal is present.",
-                        "Classify request_type with a concise category such as general, question, demand, negotiation, threat, social bid, or similar.",
-                        "Summarize the main subject of the player's message in topic.",
-                        "Set is_ambiguous to true only when the player's message is too unclear, underspecified, or contradictory for a confident interpretation.",
-                        "Set threat_signal to none unless the player expresses hostility, danger, intimidation, coercion, or violent intent.",
-                        "Set manipulation_signal to none unless the player appears deceptive, coercive, flattering strategically, guilt-inducing, or otherwise manipulative.",
-                        "Set topic_sensitivity to normal unless the topic is sensitive, secret, risky, personal, or delicate for this NPC.",
-                        "Return strictly valid JSON with exactly these fields: summary, perceived_intent, perceived_attitude, relevant_topics, target, confidence, player_intent, player_emotion, request_type, topic, is_ambiguous, threat_signal, manipulation_signal, topic_sensitivity.",
-                        'Do not return markdown, prose, explanations, or code fences. Output only the JSON object.',
-                    ]),
-                ),
-                ("Player input", turn_input.prompt),
-                (
-                    "Additional retrieved context",
-                    retrieved_context.combined_context if retrieved_context is not None else "",
-                ),
-            ],
+            self.get_title(initial_context),
+            self.layout_sections(self.get_sections(turn_input, initial_context, retrieved_context)),
+            budget=self.prompt_budget(initial_context),
         )
 
+    def get_title(self, initial_context: InitialContext) -> str:
+        return f"You are simulating how the NPC {initial_context.character_name} perceives the player's latest message. Do not generate dialogue. Analyze the player's prompt from this NPC's perspective so downstream stages can act on that perception. Evaluate the message through this character's personality, knowledge, sentiment, and social awareness, and only infer signals this character would realistically notice or understand. Reflect on whether this NPC is perceptive enough to recognize subtle manipulation, threat, ambiguity, or emotional subtext rather than assuming perfect insight."
+
+    def get_sections(
+        self,
+        turn_input: TurnInput,
+        initial_context: InitialContext,
+        retrieved_context: RetrievedContext | None = None,
+    ) -> list[tuple[str, str]]:
+        return [
+            ("Situation", initial_context.situation),
+            ("Current sentiment towards player", initial_context.sentiment),
+            ("Character definition", initial_context.character_definition),
+            ("Example dialogues", initial_context.example_dialogues),
+            (
+                "Relevant relationship and goals",
+                "\n".join([
+                    initial_context.relationship_summary,
+                    "Active goals: " + ", ".join(initial_context.active_goals) if len(initial_context.active_goals) > 0 else "",
+                ]).strip(),
+            ),
+            (
+                "Recent conversation state",
+                "\n".join(initial_context.recent_turns),
+            ),
+            (
+                "Decision rubric",
+                "\n".join([
+                    "Analyze the player's message and infer player_intent as a concise description of what the player is trying to achieve, or unknown if it cannot be determined.",
+                    "Summarize what the NPC subjectively believes is happening in summary.",
+                    "Represent perceived_intent, perceived_attitude, relevant_topics, and target as compact arrays of labels.",
+                    "Set confidence from 0.0 to 1.0 based on how strongly the NPC can support this interpretation from the available stimulus and context.",
+                    "Analyze the player's message and infer player_emotion, defaulting to neutral when no strong emotional signal is present.",
+                    "Classify request_type with a concise category such as general, question, demand, negotiation, threat, social bid, or similar.",
+                    "Summarize the main subject of the player's message in topic.",
+                    "Set is_ambiguous to true only when the player's message is too unclear, underspecified, or contradictory for a confident interpretation.",
+                    "Set threat_signal to none unless the player expresses hostility, danger, intimidation, coercion, or violent intent.",
+                    "Set manipulation_signal to none unless the player appears deceptive, coercive, flattering strategically, guilt-inducing, or otherwise manipulative.",
+                    "Set topic_sensitivity to normal unless the topic is sensitive, secret, risky, personal, or delicate for this NPC.",
+                    "Return strictly valid JSON with exactly these fields: summary, perceived_intent, perceived_attitude, relevant_topics, target, confidence, player_intent, player_emotion, request_type, topic, is_ambiguous, threat_signal, manipulation_signal, topic_sensitivity.",
+                    'Do not return markdown, prose, explanations, or code fences. Output only the JSON object.',
+                ]),
+            ),
+            ("Player input", turn_input.prompt),
+            (
+                "Additional retrieved context",
+                retrieved_context.combined_context if retrieved_context is not None else "",
+            ),
+        ]
+
     def run(
         self,
         turn_input: TurnInput,
@@ -69,6 +81,7 @@ class PerceptionStage(LLMStage):
         response = self.character.agent.run_prompt(
             prompt=stage_prompt,
             stage_name=stage_name,
+            system_prompt=self.system_prompt(initial_context),
             payload={
                 "input_prompt": turn_input.prompt,
                 "stage_prompt": stage_prompt,
@@ -76,7 +89,9 @@ class PerceptionStage(LLMStage):
             },
         )
         parsed_response = self.character.agent.parse_output(response.content, fallback={})
+        return self.build_result(turn_input, stage_prompt, parsed_response)
 
+    def build_result(self, turn_input: TurnInput, stage_prompt: str, parsed_response: dict) -> PerceptionResult:
         return PerceptionResult(
             raw_prompt=turn_input.prompt,
             stage_prompt=stage_prompt,
@@ -1,10 +1,132 @@
-def format_prompt(title: str, sections: list[tuple[str, str]]) -> str:
+from dataclasses import dataclass
+
+from ai.tokens import CHARS_PER_TOKEN, estimate_tokens
+from logger import get_logger
+from metrics import count_prompt_section_cut, observe_prompt_tokens
+from workflow.models import InitialContext
+
+logger = get_logger(__name__)
+
+# Sections cut first when a prompt is over budget. Sections not listed here (player input, stage
+# results, instructions) are what the stage is about and are never trimmed.
+SECTION_DROP_ORDER = (
+    "Example dialogues",
+    "Additional retrieved context",
+    "Retrieved context",
+    "Recent conversation state",
+    "Belief state",
+    "Relevant relationship and goals",
+    "Relationship summary",
+    "Persistent goals and motivations",
+    "Character definition",
+    "Situation",
+)
+MIN_SECTION_TOKENS = 32
+TRIM_MARKER = " [...]"
+# Per-character sections that move into the shared system prefix in the stable_prefix layout.
+STATIC_SECTIONS = ("Character definition", "Example dialogues", "Situation")
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    stage_name: str
+    max_tokens: int = 0
+    # Tokens already spent outside the stage prompt, e.g. the stable prefix sent as a system message.
+    reserved_tokens: int = 0
+
+    @property
+    def limited(self) -> bool:
+        return self.max_tokens > 0
+
+
+def resolve_prompt_budget(settings, stage_name: str, role: str) -> PromptBudget:
+    """Smallest nonzero limit of the per-stage setting and the prompt limit of the model the stage calls."""
+    limits = [
+        settings.prompt_budget.max_tokens_for(stage_name),
+        getattr(settings, role).max_prompt_tokens,
+    ]
+    positive_limits = [limit for limit in limits if limit > 0]
+    return PromptBudget(stage_name=stage_name, max_tokens=min(positive_limits) if len(positive_limits) > 0 else 0)
+
+
+def format_static_prefix(initial_context: InitialContext) -> str:
+    """Character reference sent ahead of every stage prompt; it must not depend on the stage or the turn."""
+    return format_prompt(
+        f"Character reference for the NPC {initial_context.character_name}. Every task that follows is about this character.",
+        [
+            ("Character definition", initial_context.character_definition),
+            ("Example dialogues", initial_context.example_dialogues),
+            ("Situation", initial_context.situation),
+        ],
+    )
+
+
+def without_static_sections(sections: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    return [(heading, content) for heading, content in sections if heading not in STATIC_SECTIONS]
+
+
+def format_prompt(title: str, sections: list[tuple[str, str]], budget: PromptBudget | None = None) -> str:
     parts = [title.strip()]
+    kept = [(heading, content.strip()) for heading, content in sections if content.strip() != ""]
 
-    for heading, content in sections:
-        text = content.strip()
-        if text == "":
-            continue
-        parts.append(f"{heading}:\n{text}")
+    if budget is not None:
+        if budget.limited:
+            kept = _fit_sections(parts[0], kept, budget)
+        observe_prompt_tokens(budget.stage_name, _estimate_prompt_tokens(parts[0], kept) + budget.reserved_tokens)
+
+    for heading, text in kept:
+        parts.append(_render_section(heading, text))
 
     return "\n\n".join(parts)
+
+
+def _render_section(heading: str, text: str) -> str:
+    return f"{heading}:\n{text}"
+
+
+def _estimate_prompt_tokens(title: str, sections: list[tuple[str, str]]) -> int:
+    return estimate_tokens("\n\n".join([title, *(_render_section(heading, text) for heading, text in sections)]))
+
+
+def _fit_sections(title: str, sections: list[tuple[str, str]], budget: PromptBudget) -> list[tuple[str, str]]:
+    sections = list(sections)
+    for heading in SECTION_DROP_ORDER:
+        overflow = _estimate_prompt_tokens(title, sections) + budget.reserved_tokens - budget.max_tokens
+        if overflow <= 0:
+            return sections
+
+        index = next((i for i, (name, _) in enumerate(sections) if name == heading), None)
+        if index is None:
+            continue
+
+        text = sections[index][1]
+        remaining_tokens = estimate_tokens(text) - overflow - estimate_tokens(TRIM_MARKER)
+        if remaining_tokens >= MIN_SECTION_TOKENS:
+            sections[index] = (heading, _trim_text(text, remaining_tokens))
+            count_prompt_section_cut(budget.stage_name, heading, "trimmed")
+        else:
+            sections.pop(index)
+            count_prompt_section_cut(budget.stage_name, heading, "dropped")
+
+    final_tokens = _estimate_prompt_tokens(title, sections) + budget.reserved_tokens
+    if final_tokens > budget.max_tokens:
+        logger.warning(
+            "%s prompt is still %s estimated tokens after cutting optional sections (budget %s)",
+            budget.stage_name,
+            final_tokens,
+            budget.max_tokens,
+        )
+    return sections
+
+
+def _trim_text(text: str, max_tokens: int) -> str:
+    """Keeps the head of the text, cut back to the last line or word boundary that fits."""
+    # Estimates round up, so staying one token under keeps the trimmed text within budget.
+    limit = max(0, (max_tokens - 1) * CHARS_PER_TOKEN)
+    head = text[:limit]
+    boundary = head.rfind("\n")
+    if boundary < limit // 2:
+        boundary = head.rfind(" ")
+    if boundary > 0:
+        head = head[:boundary]
+    return head.rstrip() + TRIM_MARKER
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from logger import get_logger
 from workflow.models import AppraisalResult, EmotionResult, InitialContext, PerceptionResult, ResponseResult, RetrievedContext, StrategyResult
 from workflow.stages.base import LLMStage
@@ -7,6 +9,8 @@ logger = get_logger(__name__)
 
 
 class ResponseStage(LLMStage):
+    model_role = "response_llm"
+
     def get_turn_prompt(
         self,
         initial_context: InitialContext,
@@ -56,6 +60,7 @@ class ResponseStage(LLMStage):
                     ]),
                 ),
             ],
+            budget=self.prompt_budget(),
         )
 
     def get_prompt(
@@ -77,13 +82,23 @@ class ResponseStage(LLMStage):
         appraisal: AppraisalResult,
         emotion: EmotionResult,
         strategy: StrategyResult,
+        on_delta: Callable[[str], None] | None = None,
     ) -> ResponseResult:
         turn_prompt = self.get_turn_prompt(initial_context, perception, retrieved_context, appraisal, emotion, strategy)
 
         logger.verbose("Response stage assembled turn prompt")
         logger.debug("Turn prompt: %s", turn_prompt)
 
-        response = self.character.db.generate_text(turn_prompt, stage_name="ResponseStage")
+        # The history keeps only what the player said; the stage prompt is rebuilt every turn anyway.
+        if on_delta is not None and hasattr(self.character.db, "generate_text_stream"):
+            response = self.character.db.generate_text_stream(
+                turn_prompt,
+                on_delta=on_delta,
+                stage_name="ResponseStage",
+                history_text=perception.raw_prompt,
+            )
+        else:
+            response = self.character.db.generate_text(turn_prompt, stage_name="ResponseStage", history_text=perception.raw_prompt)
 
         return ResponseResult(
             reply=response,
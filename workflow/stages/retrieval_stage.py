@@ -1,5 +1,7 @@
 from logger import get_logger
+from workflow.executor import fan_out
 from workflow.models import GapAnalysisResult, PerceptionResult, RetrievedContext
+from workflow.policy import FastPathPolicy
 from workflow.stages.base import LLMStage
 from workflow.stages.prompting import format_prompt
 
@@ -7,6 +9,20 @@ logger = get_logger(__name__)
 
 
 class RetrievalStage(LLMStage):
+    # Tool queries for one turn run concurrently; any still pending after this many seconds count as "no information".
+    QUERY_DEADLINE_SECONDS = 10.0
+    CONTEXT_ORDER = ["recall_memory", "recall_relationship", "recall_knowledge", "evaluate_social_context"]
+    TOOL_INSTRUCTIONS = {
+        "recall_memory": "Recall prior memories or past events that help the NPC answer the player's message.",
+        "recall_relationship": "Recall relationship history, trust, sentiment, and shared context with the player.",
+        "recall_knowledge": "Recall world knowledge, faction knowledge, or topic-specific knowledge relevant to the player's message.",
+        "evaluate_social_context": "Recall social context that affects how the NPC should interpret or answer the player's message.",
+    }
+
+    def __init__(self, character, fast_path_policy: FastPathPolicy | None = None):
+        super().__init__(character)
+        self.fast_path_policy = fast_path_policy or FastPathPolicy.for_character(character)
+
     def get_prompt(self, perception: PerceptionResult, gap_analysis: GapAnalysisResult) -> str:
         return format_prompt(
             "Gather the contextual knowledge the NPC should consult before composing a reply by executing the retrieval-oriented decisions produced during gap analysis.",
@@ -16,27 +32,37 @@ class RetrievalStage(LLMStage):
                 ("Gap-analysis tool calls", str([tool_call.function.arguments for tool_call in gap_analysis.tool_calls])),
                 ("Expected result", "The retrieved context needed for the NPC's response."),
             ],
+            budget=self.prompt_budget(),
         )
 
     def run(self, perception: PerceptionResult, gap_analysis: GapAnalysisResult) -> RetrievedContext:
         logger.verbose("Running retrieval stage with %s gap-analysis tool calls", len(gap_analysis.tool_calls))
-        memory_context = "no information"
-        relationship_context = "no information"
-        knowledge_context = "no information"
-        social_context = "no information"
-
+        tool_handlers = {
+            "recall_memory": self.recall_memory,
+            "recall_relationship": self.recall_relationship,
+            "recall_knowledge": self.recall_knowledge,
+            "evaluate_social_context": self.evaluate_social_context,
+        }
+
+        # A repeated tool call replaces the earlier one, as it did when the calls ran one after another.
+        tool_arguments_by_name: dict[str, dict] = {}
         for tool_call in gap_analysis.tool_calls:
-            tool_name = tool_call.function.name
-            tool_arguments = tool_call.function.arguments
-
-            if tool_name == "recall_memory":
-                memory_context = self.recall_memory(perception, tool_arguments)
-            elif tool_name == "recall_relationship":
-                relationship_context = self.recall_relationship(perception, tool_arguments)
-            elif tool_name == "recall_knowledge":
-                knowledge_context = self.recall_knowledge(perception, tool_arguments)
-            elif tool_name == "evaluate_social_context":
-                social_context = self.evaluate_social_context(perception, tool_arguments)
+            if tool_call.function.name in tool_handlers:
+                tool_arguments_by_name[tool_call.function.name] = tool_call.function.arguments
+
+        if len(tool_arguments_by_name) > 1 and hasattr(self.character.db, "query_text_many"):
+            results = self.query_tools_batched(perception, tool_arguments_by_name)
+        else:
+            results = fan_out(
+                {
+                    tool_name: (lambda handler=tool_handlers[tool_name], arguments=tool_arguments: handler(perception, arguments))
+                    for tool_name, tool_arguments in tool_arguments_by_name.items()
+                },
+                timeout=self.QUERY_DEADLINE_SECONDS,
+            )
+        memory_context, relationship_context, knowledge_context, social_context = [
+            results.get(tool_name, "no information") for tool_name in self.CONTEXT_ORDER
+        ]
 
         combined_parts = [
             text for text in [
@@ -58,50 +84,49 @@ class RetrievalStage(LLMStage):
             social_context=social_context,
         )
 
+    def query_tools_batched(self, perception: PerceptionResult, tool_arguments_by_name: dict[str, dict]) -> dict[str, str]:
+        """Sends every tool prompt through one embedding batch and one collection query under the same deadline."""
+        tool_names = list(tool_arguments_by_name)
+        prompts = [
+            self.build_tool_prompt(self.TOOL_INSTRUCTIONS[tool_name], perception, tool_arguments_by_name[tool_name])
+            for tool_name in tool_names
+        ]
+        batch = fan_out(
+            {"batch": lambda: self.character.db.query_text_many(prompts=prompts, stage_name="RetrievalStage.run")},
+            timeout=self.QUERY_DEADLINE_SECONDS,
+        )
+        if "batch" not in batch:
+            return {}
+
+        return {
+            tool_name: text.strip() or "no information"
+            for tool_name, text in zip(tool_names, batch["batch"])
+        }
+
     # TODO: adjust tag based filtering for db queries for all helper functions
     def recall_memory(self, perception: PerceptionResult, tool_arguments: dict) -> str:
-        return self.character.db.query_text(
-            prompt=self.build_tool_prompt(
-                "Recall prior memories or past events that help the NPC answer the player's message.",
-                perception,
-                tool_arguments,
-            ),
-            stage_name="RetrievalStage.run",
-        ).strip() or "no information"
+        return self.query_tool("recall_memory", perception, tool_arguments)
 
     def recall_relationship(self, perception: PerceptionResult, tool_arguments: dict) -> str:
-        return self.character.db.query_text(
-            prompt=self.build_tool_prompt(
-                "Recall relationship history, trust, sentiment, and shared context with the player.",
-                perception,
-                tool_arguments,
-            ),
-            stage_name="RetrievalStage.run",
-        ).strip() or "no information"
+        return self.query_tool("recall_relationship", perception, tool_arguments)
 
     def recall_knowledge(self, perception: PerceptionResult, tool_arguments: dict) -> str:
-        return self.character.db.query_text(
-            prompt=self.build_tool_prompt(
-                "Recall world knowledge, faction knowledge, or topic-specific knowledge relevant to the player's message.",
-                perception,
-                tool_arguments,
-            ),
-            stage_name="RetrievalStage.run",
-        ).strip() or "no information"
+        return self.query_tool("recall_knowledge", perception, tool_arguments)
 
     def evaluate_social_context(self, perception: PerceptionResult, tool_arguments: dict) -> str:
+        return self.query_tool("evaluate_social_context", perception, tool_arguments)
+
+    def query_tool(self, tool_name: str, perception: PerceptionResult, tool_arguments: dict) -> str:
         return self.character.db.query_text(
-            prompt=self.build_tool_prompt(
-                "Recall social context that affects how the NPC should interpret or answer the player's message.",
-                perception,
-                tool_arguments,
-            ),
+            prompt=self.build_tool_prompt(self.TOOL_INSTRUCTIONS[tool_name], perception, tool_arguments),
             stage_name="RetrievalStage.run",
         ).strip() or "no information"
 
     def summarize_retrieved_context(self, perception: PerceptionResult, raw_context: str) -> str:
         if raw_context == "no information":
             return raw_context
+        if not self.fast_path_policy.should_summarize(perception, raw_context):
+            return raw_context
 
         response = self.character.agent.run_prompt(
             prompt=self.build_summary_prompt(perception, raw_context),
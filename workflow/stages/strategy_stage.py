@@ -100,6 +100,7 @@ class StrategyStage(LLMStage):
                 ),
                 ("Expected result", "Return valid JSON matching the shown structure. Keep the textual fields concise, and use tools only to express immediate_actions."),
             ],
+            budget=self.prompt_budget(),
         )
 
     def run(
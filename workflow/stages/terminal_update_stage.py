@@ -38,6 +38,7 @@ class TerminalUpdateStage(LLMStage):
                 ("Strategy", f"actions={', '.join(strategy.immediate_actions)}, new_sentiment={strategy.new_sentiment}"),
                 ("Expected result", "Terminal updates covering sentiment, relationship changes, belief updates, goal updates, memory storage, and external actions."),
             ],
+            budget=self.prompt_budget(),
         )
 
     def run(